@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Score an hourly discovery batch record by record from concurrent callers,
+with and without the MicroBatcher in front of the model.
+Usage: python benchmarks/bench_batching.py --videos 20000 --callers 32 --max-batch-size 256
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(__file__))
+from common import train_demo_artifacts
+from youtube_first_hour.batching import MicroBatcher
+from youtube_first_hour.serving import FirstHourPredictor
+from youtube_first_hour.synthetic import synthetic_videos
+
+
+def run_callers(score_one, records, n_callers):
+    """Each caller scores its share of the records one request at a time"""
+    latencies = []
+
+    def caller(share):
+        for record in share:
+            start = time.perf_counter()
+            score_one(record)
+            latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=caller, args=(records[i::n_callers],)) for i in range(n_callers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, np.array(latencies) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-batching benchmark")
+    parser.add_argument("--videos", type=int, default=20_000, help="Videos in the hourly batch")
+    parser.add_argument("--callers", type=int, default=32, help="Concurrent callers")
+    parser.add_argument("--max-batch-size", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--workdir", default="bench_data/serving")
+    args = parser.parse_args()
+
+    paths = train_demo_artifacts(args.workdir)
+    predictor = FirstHourPredictor.load(paths['model'], paths['tables'])
+    records = synthetic_videos(args.videos, seed=2).to_dict('records')
+
+    print(f"videos: {args.videos}, callers: {args.callers}")
+    print(f"{'mode':>14} {'seconds':>8} {'videos/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    one_by_one = lambda record: predictor.predict_array([record])
+    seconds, ms = run_callers(one_by_one, records, args.callers)
+    print(f"{'one by one':>14} {seconds:>8.2f} {args.videos / seconds:>10,.0f} "
+          f"{np.percentile(ms, 50):>8.2f} {np.percentile(ms, 99):>8.2f}")
+
+    with MicroBatcher(predictor.predict_array, args.max_batch_size, args.max_wait_ms) as batcher:
+        seconds, ms = run_callers(lambda record: batcher.submit(record).result(), records, args.callers)
+        metrics = batcher.metrics.snapshot()
+    print(f"{'micro-batched':>14} {seconds:>8.2f} {args.videos / seconds:>10,.0f} "
+          f"{np.percentile(ms, 50):>8.2f} {np.percentile(ms, 99):>8.2f}")
+    metrics['batch_size'].pop('histogram')
+    print(json.dumps(metrics, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Scoring-worker cold start and per-worker memory: pickled model + npz tables
+(+ scaler) versus the memory-mapped artifact bundle, with N workers alive at once.
+Usage: python benchmarks/bench_bundle.py --workers 8
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import psutil
+
+sys.path.insert(0, os.path.dirname(__file__))
+from common import train_demo_artifacts
+from youtube_first_hour.synthetic import synthetic_videos
+
+
+def worker(kind: str, paths: dict) -> None:
+    """Child-process entry point: load the artifacts, score once, then stay alive until stdin closes"""
+    from youtube_first_hour.artifacts import load_bundle
+    from youtube_first_hour.serving import FirstHourPredictor
+
+    if kind == 'pickle':
+        predictor = FirstHourPredictor.load(paths['model'], paths['tables'], paths.get('scaler'))
+    else:
+        predictor = load_bundle(paths['bundle'])
+    predictor.predict(synthetic_videos(1, seed=4).to_dict('records'))
+    print("ready", flush=True)
+    sys.stdin.readline()
+
+
+def start_workers(kind: str, paths: dict, n_workers: int):
+    """Start the workers together; returns per-worker seconds-to-ready and memory"""
+    cmd = [sys.executable, __file__, "--worker", kind, "--paths", json.dumps(paths)]
+    start = time.perf_counter()
+    procs = [subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+             for _ in range(n_workers)]
+    ready = []
+    for proc in procs:
+        assert proc.stdout.readline().strip() == "ready"
+        ready.append(time.perf_counter() - start)
+    memory = [psutil.Process(proc.pid).memory_full_info() for proc in procs]
+    for proc in procs:
+        proc.stdin.close()
+        proc.wait()
+    return ready, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Artifact bundle cold start and memory benchmark")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--workdir", default="bench_data/serving")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--paths", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, json.loads(args.paths))
+        return
+
+    import joblib
+    from youtube_first_hour.artifacts import save_bundle
+    from youtube_first_hour.data import metadata_path
+    from youtube_first_hour.features import YouTubeFeatureEngineer
+    from youtube_first_hour.model_training import export_tree_arrays
+
+    paths = train_demo_artifacts(args.workdir)
+    paths['bundle'] = os.path.join(args.workdir, 'bundle')
+    with open(metadata_path(paths['model'])) as f:
+        metadata = json.load(f)
+    ensemble = export_tree_arrays(joblib.load(paths['model']), metadata['feature_columns'])
+    save_bundle(paths['bundle'], ensemble, metadata, YouTubeFeatureEngineer.load(paths['tables']))
+
+    print(f"workers: {args.workers}")
+    print(f"{'artifacts':>10} {'ready p50 s':>12} {'all ready s':>12} {'RSS MB':>8} {'PSS MB':>8} {'USS MB':>8}")
+    for kind in ('pickle', 'bundle'):
+        ready, memory = start_workers(kind, paths, args.workers)
+        mb = lambda attr: np.mean([getattr(m, attr) for m in memory]) / 1e6
+        print(f"{kind:>10} {np.median(ready):>12.2f} {max(ready):>12.2f} "
+              f"{mb('rss'):>8.1f} {mb('pss'):>8.1f} {mb('uss'):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Raw-data memory and channel groupby speed: default read (object strings,
+float64 counts) versus the compact dtype plan of schema.py.
+Usage: python benchmarks/bench_dtypes.py --rows 2000000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+import common  # noqa: F401  (puts src/ on sys.path)
+from youtube_first_hour.synthetic import SyntheticVideoGenerator
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact dtype plan benchmark")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--workdir", default="bench_data")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    import pandas as pd
+    from youtube_first_hour.data import load_raw_data, memory_report
+    from youtube_first_hour.features import GroupStatsAccumulator, YouTubeFeatureEngineer
+
+    os.makedirs(args.workdir, exist_ok=True)
+    path = os.path.join(args.workdir, f"raw_{args.rows}.csv")
+    if not os.path.exists(path):
+        for i, chunk in enumerate(SyntheticVideoGenerator().iter_chunks(args.rows)):
+            chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+
+    frames = {}
+    for name, compact in [('default', False), ('compact', True)]:
+        start = time.perf_counter()
+        frames[name] = load_raw_data(path, compact=compact)
+        print(f"load ({name}): {time.perf_counter() - start:.2f}s")
+
+    pd.set_option('display.width', 120)
+    print(memory_report(frames['default'], frames['compact']).round(1).to_string())
+
+    engineer = YouTubeFeatureEngineer()
+    print(f"\n{'frame':>8} {'channel groupby s':>18} {'group stats s':>14}")
+    for name, df in frames.items():
+        df = engineer._create_target_variables(df)
+        groupby = best_of(lambda: df.groupby('channel_id', observed=True)[GroupStatsAccumulator.TARGETS].mean(),
+                          args.repeat)
+        stats = best_of(lambda: GroupStatsAccumulator().update(df), args.repeat)
+        print(f"{name:>8} {groupby:>18.3f} {stats:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+/export-csv loading: the old buffered download (response.content, write,
+read_csv) against the streamed loaders of data_loader.py, served by a
+local HTTP server from a synthetic export of the given size.
+Usage: python benchmarks/bench_export_download.py --gb 2 --gzip
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import zlib
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(__file__))
+from common import peak_rss_mb, run_isolated
+from youtube_first_hour.synthetic import SyntheticVideoGenerator, synthetic_videos
+
+METHODS = ['buffered', 'download', 'stream', 'parquet']
+
+
+def write_export(gb: float, workdir: str) -> None:
+    """Child-process entry point: synthetic export of about `gb` GB, written chunk by chunk"""
+    bytes_per_row = len(synthetic_videos(10_000).to_csv(index=False)) / 10_000
+    n_rows = int(gb * 1e9 / bytes_per_row)
+    path = os.path.join(workdir, f"export_{n_rows}.csv")
+    if not os.path.exists(path):
+        for i, chunk in enumerate(SyntheticVideoGenerator().iter_chunks(n_rows)):
+            chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+    print(json.dumps({'path': path}))
+
+
+def make_handler(path: str, gzip: bool):
+    class ExportHandler(SimpleHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if not gzip:
+                # Plain file with Content-Length; enough for a one-shot download
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/csv')
+                self.send_header('Content-Length', str(os.path.getsize(path)))
+                self.end_headers()
+                with open(path, 'rb') as f:
+                    shutil.copyfileobj(f, self.wfile, 1024 * 1024)
+                return
+            # Compressed on the fly and sent in chunked transfer encoding
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/csv')
+            self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            compressor = zlib.compressobj(1, zlib.DEFLATED, 31)
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    self._chunk(compressor.compress(block))
+            self._chunk(compressor.flush())
+            self.wfile.write(b'0\r\n\r\n')
+
+        def _chunk(self, data: bytes):
+            if data:
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+    return ExportHandler
+
+
+def load_once(method: str, url: str, workdir: str):
+    """Child-process entry point: load the export one way and report time and peak RSS"""
+    import pandas as pd
+    import requests
+    from youtube_first_hour.data_loader import download_export, export_to_parquet, stream_export
+
+    out = os.path.join(workdir, f"latest_{method}")
+    start = time.perf_counter()
+    if method == 'buffered':
+        response = requests.get(url)
+        with open(f"{out}.csv", 'wb') as f:
+            f.write(response.content)
+        rows = len(pd.read_csv(f"{out}.csv"))
+    elif method == 'download':
+        download_export(url, f"{out}.csv")
+        rows = None
+    elif method == 'stream':
+        rows = sum(len(chunk) for chunk in stream_export(url))
+    else:
+        export_to_parquet(url, f"{out}.parquet")
+        import pyarrow.parquet as pq
+        rows = pq.ParquetFile(f"{out}.parquet").metadata.num_rows
+    print(json.dumps({'seconds': time.perf_counter() - start, 'peak_rss_mb': peak_rss_mb(), 'rows': rows}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Buffered vs streamed export download benchmark")
+    parser.add_argument("--gb", type=float, default=2.0, help="Size of the synthetic export")
+    parser.add_argument("--gzip", action="store_true", help="Serve the export with gzip content encoding")
+    parser.add_argument("--methods", nargs="+", default=METHODS, choices=METHODS)
+    parser.add_argument("--workdir", default="bench_data")
+    parser.add_argument("--load", help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    parser.add_argument("--write", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.write:
+        write_export(args.gb, args.workdir)
+        return
+    if args.load:
+        load_once(args.load, args.url, args.workdir)
+        return
+
+    os.makedirs(args.workdir, exist_ok=True)
+    # Generated in a child too: peak RSS carries over to the children this process starts
+    path = run_isolated(__file__, ["--write", "--gb", str(args.gb), "--workdir", args.workdir])['path']
+    size_mb = os.path.getsize(path) / 1e6
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(path, args.gzip))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/export-csv"
+
+    print(f"export: {size_mb:.0f} MB{' (gzip)' if args.gzip else ''}")
+    print(f"{'method':>10} {'seconds':>9} {'MB/s':>8} {'peak RSS MB':>12}")
+    try:
+        for method in args.methods:
+            for suffix in ('.csv', '.parquet', '.csv.meta.json', '.parquet.meta.json'):
+                # Drop earlier outputs so If-Modified-Since never short-circuits a run
+                stale = os.path.join(args.workdir, f"latest_{method}{suffix}")
+                if os.path.exists(stale):
+                    os.remove(stale)
+            stats = run_isolated(__file__, ["--load", method, "--url", url, "--workdir", args.workdir])
+            print(f"{method:>10} {stats['seconds']:>9.2f} {size_mb / stats['seconds']:>8.1f} "
+                  f"{stats['peak_rss_mb']:>12.0f}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Compare MultiOutputRegressor (one booster per target) with native multi-target boosters:
+fit time, predict latency and validation MAE.
+Usage: python benchmarks/bench_multi_target.py --rows 200000 --n-estimators 300
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.metrics import mean_absolute_error
+from sklearn.model_selection import train_test_split
+
+sys.path.insert(0, os.path.dirname(__file__))
+from common import prepared_training_data
+from youtube_first_hour.model_training import QuantileModelTrainer
+
+TARGETS = ['like_count_initial', 'like_count_final', 'view_count_initial', 'view_count_final']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-target training benchmark")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--n-estimators", type=int, default=300)
+    parser.add_argument("--max-depth", type=int, default=6)
+    parser.add_argument("--latency-samples", type=int, default=200)
+    args = parser.parse_args()
+
+    X, y = prepared_training_data(args.rows, TARGETS)
+    X_train, X_valid, y_train, y_valid = train_test_split(X, y, test_size=0.2, random_state=42)
+    params = dict(n_estimators=args.n_estimators, max_depth=args.max_depth, learning_rate=0.1,
+                  random_state=42, n_jobs=-1)
+
+    print(f"train rows: {len(X_train)}, features: {X.shape[1]}, trees per target: {args.n_estimators}")
+    print(f"{'mode':>22} {'fit s':>8} {'batch-1 p50 ms':>15} {'batch-1 p99 ms':>15} "
+          f"{'full batch s':>13} {'MAE':>10}")
+    for strategy in QuantileModelTrainer.MULTI_STRATEGIES:
+        model = QuantileModelTrainer(TARGETS, multi_strategy=strategy).build_model(params)
+
+        start = time.perf_counter()
+        model.fit(X_train, np.log1p(y_train))
+        fit_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        preds = np.expm1(model.predict(X_valid))
+        batch_seconds = time.perf_counter() - start
+
+        latencies = []
+        for i in range(min(args.latency_samples, len(X_valid))):
+            row = X_valid.iloc[i:i + 1]
+            start = time.perf_counter()
+            model.predict(row)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        mae = mean_absolute_error(y_valid, preds)
+        print(f"{strategy or 'MultiOutputRegressor':>22} {fit_seconds:>8.2f} "
+              f"{np.percentile(latencies, 50):>15.2f} {np.percentile(latencies, 99):>15.2f} "
+              f"{batch_seconds:>13.3f} {mae:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
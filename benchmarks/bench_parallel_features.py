@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Scaling of ParallelFeatureEngineer against the serial
+YouTubeFeatureEngineer.process_all_features, checking the outputs match exactly.
+Usage: python benchmarks/bench_parallel_features.py --rows 2000000 --workers 1 2 4 8 16
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(__file__))
+import common  # noqa: F401  (puts src/ on sys.path)
+from youtube_first_hour.features import YouTubeFeatureEngineer
+from youtube_first_hour.parallel_features import ParallelFeatureEngineer
+from youtube_first_hour.synthetic import synthetic_videos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel feature engineering scaling benchmark")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--channel-history", action="store_true")
+    args = parser.parse_args()
+
+    df = synthetic_videos(args.rows)
+    # Integer counts, as the API returns them: partial category sums then add up exactly
+    for col in ['view_count_final', 'like_count_final']:
+        df[col] = np.floor(df[col])
+    print(f"rows: {len(df):,}  cpus: {os.cpu_count()}  channel history: {args.channel_history}")
+
+    start = time.perf_counter()
+    serial = YouTubeFeatureEngineer().process_all_features(df, channel_history=args.channel_history)
+    serial_seconds = time.perf_counter() - start
+    print(f"{'workers':>8} {'seconds':>9} {'speedup':>8}")
+    print(f"{'serial':>8} {serial_seconds:>9.2f} {1.0:>8.2f}")
+
+    for n_workers in args.workers:
+        start = time.perf_counter()
+        parallel = ParallelFeatureEngineer(n_workers).process_all_features(df, channel_history=args.channel_history)
+        seconds = time.perf_counter() - start
+        pd.testing.assert_frame_equal(parallel, serial, check_exact=True)
+        print(f"{n_workers:>8} {seconds:>9.2f} {serial_seconds / seconds:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
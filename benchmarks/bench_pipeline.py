@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+End-to-end pipeline benchmark on seeded synthetic data (synthetic.py):
+process_youtube_data, YouTubePreprocessor.preprocess,
+QuantileModelTrainer.prepare_features and model prediction, each at every
+size, each in a fresh process so its peak RSS is its own.
+
+Every run is appended to a JSON-lines history; stages slower or larger
+than the stored baseline by more than the tolerances are flagged and the
+script exits with status 1. --update-baseline stores this run as the
+baseline (baselines are per machine: keep them out of shared history).
+Usage: python benchmarks/bench_pipeline.py --rows 10000 1000000 20000000
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+from common import peak_rss_mb, run_isolated
+
+STAGES = ['features', 'preprocess', 'prepare_features', 'predict']
+TARGETS = ['like_count_initial', 'like_count_final', 'view_count_initial', 'view_count_final']
+RESULTS = os.path.join(os.path.dirname(__file__), "results")
+
+
+def _path(workdir: str, rows: int, seed: int, name: str) -> str:
+    return os.path.join(workdir, f"pipeline_{rows}_seed{seed}", f"{name}.parquet")
+
+
+def _model_path(workdir: str, seed: int) -> str:
+    return os.path.join(workdir, f"pipeline_model_seed{seed}.joblib")
+
+
+def generate(rows: int, workdir: str, seed: int) -> None:
+    """Child-process entry point: raw synthetic rows, written chunk by chunk, and the model predict uses"""
+    from youtube_first_hour.synthetic import SyntheticVideoGenerator
+    path = _path(workdir, rows, seed, 'raw')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with contextlib.redirect_stdout(sys.stderr):
+        if not os.path.exists(path):
+            SyntheticVideoGenerator(seed).write(path, rows)
+        train_model(workdir, seed)
+    print(json.dumps({'path': path}))
+
+
+def train_model(workdir: str, seed: int) -> None:
+    """A small model on separate synthetic rows, so predict has something to score with"""
+    from youtube_first_hour.features import YouTubeFeatureEngineer
+    from youtube_first_hour.model_training import QuantileModelTrainer
+    from youtube_first_hour.preprocessing import YouTubePreprocessor
+    from youtube_first_hour.synthetic import synthetic_videos
+
+    path = _model_path(workdir, seed)
+    if not os.path.exists(path):
+        df = YouTubePreprocessor().preprocess(
+            YouTubeFeatureEngineer().process_all_features(synthetic_videos(20_000, seed=seed + 1)))
+        trainer = QuantileModelTrainer(TARGETS)
+        with contextlib.chdir(workdir):
+            df = trainer.remove_outliers(trainer.prepare_features(df))
+        trainer.fit(df.drop(columns=TARGETS), df[TARGETS],
+                    {'n_estimators': 200, 'max_depth': 6, 'learning_rate': 0.1, 'random_state': 42})
+        trainer.save(path)
+
+
+def run_stage(stage: str, rows: int, workdir: str, seed: int) -> None:
+    """Child-process entry point: one stage on the previous stage's output; only the stage is timed"""
+    from youtube_first_hour.data import load_table, save_processed_data
+    from youtube_first_hour.features import process_youtube_data
+    from youtube_first_hour.model_training import QuantileModelTrainer
+    from youtube_first_hour.preprocessing import YouTubePreprocessor
+
+    with contextlib.redirect_stdout(sys.stderr):
+        if stage == 'features':
+            start = time.perf_counter()
+            process_youtube_data(_path(workdir, rows, seed, 'raw'), _path(workdir, rows, seed, 'features'))
+            seconds = time.perf_counter() - start
+        elif stage == 'preprocess':
+            df = load_table(_path(workdir, rows, seed, 'features'))
+            start = time.perf_counter()
+            df = YouTubePreprocessor().preprocess(df, copy=False)
+            seconds = time.perf_counter() - start
+            save_processed_data(df, _path(workdir, rows, seed, 'preprocessed'))
+        elif stage == 'prepare_features':
+            df = load_table(_path(workdir, rows, seed, 'preprocessed'))
+            start = time.perf_counter()
+            # prepare_features writes country_encoding.json to the working directory
+            with contextlib.chdir(workdir):
+                df = QuantileModelTrainer(TARGETS).prepare_features(df)
+            seconds = time.perf_counter() - start
+            save_processed_data(df, _path(workdir, rows, seed, 'prepared'))
+        else:
+            import joblib
+            from youtube_first_hour.data import metadata_path
+            model_path = _model_path(workdir, seed)
+            with open(metadata_path(model_path)) as f:
+                feature_columns = json.load(f)['feature_columns']
+            X = load_table(_path(workdir, rows, seed, 'prepared'), columns=feature_columns)
+            model = joblib.load(model_path)
+            start = time.perf_counter()
+            model.predict(X[feature_columns])
+            seconds = time.perf_counter() - start
+    print(json.dumps({'seconds': seconds, 'peak_rss_mb': peak_rss_mb()}))
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def regressions(record: dict, baseline: dict, time_tolerance: float, rss_tolerance: float) -> list:
+    """What got worse than the baseline record of the same stage and size"""
+    if baseline is None:
+        return []
+    found = []
+    # Sub-second timings are noisy: allow 50 ms on top of the relative tolerance
+    if record['seconds'] > baseline['seconds'] * (1 + time_tolerance) + 0.05:
+        found.append(f"time {record['seconds'] / baseline['seconds']:.2f}x")
+    if record['peak_rss_mb'] > baseline['peak_rss_mb'] * (1 + rss_tolerance):
+        found.append(f"peak RSS {record['peak_rss_mb'] / baseline['peak_rss_mb']:.2f}x")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark with regression tracking")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000, 20_000_000])
+    parser.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default="bench_data")
+    parser.add_argument("--history", default=os.path.join(RESULTS, "pipeline_history.jsonl"))
+    parser.add_argument("--baseline", default=os.path.join(RESULTS, "pipeline_baseline.json"))
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--time-tolerance", type=float, default=0.15, help="Allowed relative slowdown")
+    parser.add_argument("--rss-tolerance", type=float, default=0.10, help="Allowed relative peak RSS growth")
+    parser.add_argument("--stage", help=argparse.SUPPRESS)
+    parser.add_argument("--generate", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.generate:
+        generate(args.generate, args.workdir, args.seed)
+        return
+    if args.stage:
+        run_stage(args.stage, args.rows[0], args.workdir, args.seed)
+        return
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    run = {'run': time.strftime('%Y-%m-%dT%H:%M:%S'), 'commit': git_commit(), 'cpus': os.cpu_count(),
+           'python': platform.python_version(), 'seed': args.seed}
+    records, flagged = [], []
+
+    print(f"{'rows':>11} {'stage':>17} {'seconds':>9} {'rows/s':>12} {'peak RSS MB':>12}  vs baseline")
+    for rows in args.rows:
+        run_isolated(__file__, ["--generate", str(rows), "--workdir", args.workdir, "--seed", str(args.seed)])
+        for stage in args.stages:
+            try:
+                stats = run_isolated(__file__, ["--stage", stage, "--rows", str(rows),
+                                                "--workdir", args.workdir, "--seed", str(args.seed)])
+            except subprocess.CalledProcessError as err:
+                # Usually out of memory; later stages need this one's output
+                reason = (err.stderr or '').strip().splitlines()[-1:] or [f"exit status {err.returncode}"]
+                print(f"{rows:>11,} {stage:>17} failed: {reason[0]}")
+                break
+            record = {**run, 'stage': stage, 'rows': rows, 'seconds': stats['seconds'],
+                      'rows_per_second': rows / stats['seconds'], 'peak_rss_mb': stats['peak_rss_mb']}
+            records.append(record)
+            found = regressions(record, baseline.get(f"{stage}@{rows}"), args.time_tolerance, args.rss_tolerance)
+            note = ("REGRESSION: " + ", ".join(found)) if found else ("ok" if f"{stage}@{rows}" in baseline else "-")
+            if found:
+                flagged.append(f"{stage}@{rows}")
+            print(f"{rows:>11,} {stage:>17} {record['seconds']:>9.2f} {record['rows_per_second']:>12,.0f} "
+                  f"{record['peak_rss_mb']:>12.0f}  {note}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+    with open(args.history, 'a') as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    print(f"History: {len(records)} records appended to {args.history}")
+    if args.update_baseline:
+        baseline.update({f"{r['stage']}@{r['rows']}": r for r in records})
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+    if flagged:
+        print(f"Regressions against {args.baseline}: {', '.join(flagged)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
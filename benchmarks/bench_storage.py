@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Compare CSV and columnar (Parquet) load time and peak RSS between pipeline stages.
+Usage: python benchmarks/bench_storage.py --rows 1000000 10000000 50000000 --workdir /tmp/yt_bench
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+from common import peak_rss_mb, run_isolated
+from youtube_first_hour.synthetic import SyntheticVideoGenerator
+
+PROJECTED_COLUMNS = ['channel_id', 'category_id', 'view_count_initial', 'view_count_final']
+
+
+def write_files(n_rows: int, workdir: str):
+    """Write the same synthetic rows as CSV and Parquet, chunk by chunk"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from youtube_first_hour.data import to_columnar_dtypes
+
+    csv_path = os.path.join(workdir, f"raw_{n_rows}.csv")
+    parquet_path = os.path.join(workdir, f"raw_{n_rows}.parquet")
+    if os.path.exists(csv_path) and os.path.exists(parquet_path):
+        return csv_path, parquet_path
+
+    writer = None
+    for i, chunk in enumerate(SyntheticVideoGenerator().iter_chunks(n_rows)):
+        chunk.to_csv(csv_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        table = pa.Table.from_pandas(to_columnar_dtypes(chunk), preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(parquet_path, table.schema)
+        # Per-chunk dictionaries differ; unify them against the first chunk's schema
+        writer.write_table(table.cast(writer.schema))
+    writer.close()
+    return csv_path, parquet_path
+
+
+def load_once(path: str, columns):
+    """Child-process entry point: load one file and report time and peak RSS"""
+    from youtube_first_hour.data import load_raw_data
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    df = load_raw_data(path, columns=columns)
+    seconds = time.perf_counter() - start
+    print(json.dumps({
+        'seconds': seconds,
+        'peak_rss_mb': peak_rss_mb(),
+        'rss_delta_mb': peak_rss_mb() - rss_before,
+        'rows_loaded': len(df),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV vs columnar load benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000, 50_000_000])
+    parser.add_argument("--workdir", default="bench_data")
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    parser.add_argument("--load", help=argparse.SUPPRESS)
+    parser.add_argument("--columns", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.load:
+        load_once(args.load, args.columns.split(",") if args.columns else None)
+        return
+
+    os.makedirs(args.workdir, exist_ok=True)
+    results = []
+    print(f"{'rows':>12} {'format':>8} {'columns':>8} {'seconds':>9} {'peak RSS MB':>12} {'size MB':>9}")
+    for n_rows in args.rows:
+        paths = write_files(n_rows, args.workdir)
+        for path in paths:
+            fmt = os.path.splitext(path)[1].lstrip('.')
+            for columns in (None, PROJECTED_COLUMNS):
+                child_args = ["--load", path]
+                if columns:
+                    child_args += ["--columns", ",".join(columns)]
+                stats = run_isolated(__file__, child_args)
+                row = dict(rows=n_rows, format=fmt, columns='all' if columns is None else len(columns),
+                           size_mb=os.path.getsize(path) / 1e6, **stats)
+                results.append(row)
+                print(f"{n_rows:>12} {fmt:>8} {row['columns']:>8} {row['seconds']:>9.2f} "
+                      f"{row['peak_rss_mb']:>12.0f} {row['size_mb']:>9.0f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: shared integer time features vs the previous string round-trip.
+Usage: python benchmarks/bench_time_features.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(__file__))
+import common  # noqa: F401  (puts src/ on sys.path)
+from youtube_first_hour.synthetic import synthetic_videos
+from youtube_first_hour.time_features import time_components
+
+
+def previous_code(df: pd.DataFrame) -> pd.DataFrame:
+    """Timestamp handling as _extract_time_features, prepare_features and add_logged_hours did it"""
+    published_at = pd.to_datetime(df['published_at'])
+    out = pd.DataFrame({
+        'published_day_of_week': published_at.dt.day_name(),
+        'published_time': published_at.dt.strftime('%H:%M:%S'),
+    })
+    published_time = pd.to_datetime(out['published_time'], format='%H:%M:%S', errors='coerce')
+    out['published_hour'] = published_time.dt.hour
+    out['published_minute'] = published_time.dt.minute
+    for col in ['logged_at_initial', 'logged_at_final']:
+        out[f'{col}_hour'] = pd.to_datetime(df[col], errors='coerce').dt.hour.fillna(0).astype(int)
+    return out
+
+
+def shared_module(df: pd.DataFrame) -> pd.DataFrame:
+    """The same features through time_features.time_components"""
+    parts = time_components(df['published_at'])
+    out = pd.DataFrame({
+        'published_day_of_week': parts['weekday'],
+        'published_hour': parts['hour'],
+        'published_minute': parts['minute'],
+    })
+    for col in ['logged_at_initial', 'logged_at_final']:
+        out[f'{col}_hour'] = time_components(df[col])['hour']
+    return out
+
+
+def best_of(fn, df, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(df)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time feature parsing microbenchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = synthetic_videos(args.rows)
+    old_seconds, old = best_of(previous_code, df, args.repeat)
+    new_seconds, new = best_of(shared_module, df, args.repeat)
+
+    for col in ['published_hour', 'published_minute', 'logged_at_initial_hour', 'logged_at_final_hour']:
+        assert (old[col].to_numpy() == new[col].to_numpy()).all(), col
+
+    print(f"rows: {args.rows}")
+    print(f"previous string round-trip: {old_seconds:.3f}s ({args.rows / old_seconds:,.0f} rows/s)")
+    print(f"shared time_features:       {new_seconds:.3f}s ({args.rows / new_seconds:,.0f} rows/s)")
+    print(f"speedup: {old_seconds / new_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
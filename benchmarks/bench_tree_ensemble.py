@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Compiled tree arrays vs the pickled MultiOutputRegressor: batch-1 latency,
+batch-10k throughput and cold start (fresh interpreter: imports + load + first predict).
+Usage: python benchmarks/bench_tree_ensemble.py --repeat 500
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(__file__))
+from common import run_isolated, train_demo_artifacts
+
+
+def cold_start(kind: str, path: str, n_features: int) -> None:
+    """Child-process entry point: time from a bare interpreter to the first prediction"""
+    start = time.perf_counter()
+    X = np.zeros((1, n_features), dtype=np.float32)
+    if kind == 'pickle':
+        import joblib
+        model = joblib.load(path)
+        model.predict(X)
+    else:
+        from youtube_first_hour.tree_ensemble import TreeEnsemble
+        TreeEnsemble.load(path).predict(X)
+    print(json.dumps({'seconds': time.perf_counter() - start, 'xgboost_imported': 'xgboost' in sys.modules}))
+
+
+def latency_ms(fn, X, repeat):
+    fn(X)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(X)
+        times.append(time.perf_counter() - start)
+    return np.array(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tree-array inference benchmark")
+    parser.add_argument("--workdir", default="bench_data/serving")
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--batch-rows", type=int, default=10_000)
+    parser.add_argument("--cold-start", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cold_start:
+        cold_start(args.cold_start[0], args.cold_start[1], int(args.cold_start[2]))
+        return
+
+    import joblib
+    from youtube_first_hour.model_training import export_tree_arrays
+    from youtube_first_hour.serving import FirstHourPredictor
+    from youtube_first_hour.synthetic import synthetic_videos
+
+    paths = train_demo_artifacts(args.workdir)
+    model = joblib.load(paths['model'])
+    ensemble = export_tree_arrays(model)
+    trees_path = os.path.join(args.workdir, 'trees.npz')
+    ensemble.save(trees_path)
+
+    predictor = FirstHourPredictor.load(paths['model'], paths['tables'])
+    X = predictor.features(synthetic_videos(args.batch_rows, seed=3).to_dict('records'))
+    boosters = predictor.boosters
+    inplace = lambda X: np.column_stack([b.inplace_predict(X) for b in boosters])
+
+    diff = np.abs(ensemble.predict(X) - model.predict(X)).max()
+    print(f"trees: {len(ensemble.roots)}, depth: {ensemble.depth}, max |diff| vs xgboost: {diff:.2e}")
+
+    print(f"{'engine':>22} {'b1 p50 ms':>10} {'b1 p99 ms':>10} {f'b{args.batch_rows} ms':>10} {'rows/s':>12}")
+    for name, fn in [("MultiOutputRegressor", model.predict), ("booster inplace", inplace),
+                     ("tree arrays", ensemble.predict)]:
+        single = latency_ms(fn, X[:1], args.repeat)
+        batch = latency_ms(fn, X, 5)
+        print(f"{name:>22} {np.percentile(single, 50):>10.3f} {np.percentile(single, 99):>10.3f} "
+              f"{batch.min():>10.1f} {len(X) / batch.min() * 1000:>12,.0f}")
+
+    for kind, path in [('pickle', paths['model']), ('arrays', trees_path)]:
+        stats = run_isolated(__file__, ["--cold-start", kind, path, str(X.shape[1])])
+        print(f"cold start ({kind}): {stats['seconds']:.3f}s, xgboost imported: {stats['xgboost_imported']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Shared helpers for the benchmark scripts"""
+import json
+import os
+import resource
+import subprocess
+import sys
+from typing import Dict, List
+
+SRC = os.path.join(os.path.dirname(__file__), "..", "src")
+sys.path.insert(0, SRC)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def run_isolated(script: str, args: List[str]) -> Dict:
+    """Run a benchmark step in a fresh interpreter so its peak RSS is its own"""
+    out = subprocess.run([sys.executable, script, *args], check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def prepared_training_data(n_rows: int, target_columns: List[str], seed: int = 0):
+    """Synthetic rows run through feature engineering, preprocessing and prepare_features"""
+    import contextlib
+    import tempfile
+    from youtube_first_hour.features import YouTubeFeatureEngineer
+    from youtube_first_hour.model_training import QuantileModelTrainer
+    from youtube_first_hour.preprocessing import YouTubePreprocessor
+    from youtube_first_hour.synthetic import synthetic_videos
+
+    df = YouTubeFeatureEngineer().process_all_features(synthetic_videos(n_rows, seed=seed))
+    df = YouTubePreprocessor().preprocess(df)
+    trainer = QuantileModelTrainer(target_columns)
+    # prepare_features writes country_encoding.json to the working directory
+    with tempfile.TemporaryDirectory() as tmp, contextlib.chdir(tmp):
+        df = trainer.remove_outliers(trainer.prepare_features(df))
+    return df.drop(columns=target_columns), df[target_columns]
+
+
+def train_demo_artifacts(workdir: str, n_rows: int = 20_000, n_estimators: int = 300,
+                         target_columns: List[str] = None, seed: int = 0) -> Dict[str, str]:
+    """
+    Train and save a model plus lookup tables on synthetic rows, so serving
+    benchmarks have artifacts to load. Returns their paths.
+    """
+    import contextlib
+    from youtube_first_hour.features import YouTubeFeatureEngineer
+    from youtube_first_hour.model_training import QuantileModelTrainer
+    from youtube_first_hour.preprocessing import YouTubePreprocessor
+    from youtube_first_hour.synthetic import synthetic_videos
+
+    target_columns = target_columns or ['like_count_initial', 'like_count_final',
+                                        'view_count_initial', 'view_count_final']
+    os.makedirs(workdir, exist_ok=True)
+    paths = {'model': os.path.join(workdir, 'model.joblib'), 'tables': os.path.join(workdir, 'tables.npz')}
+    if all(os.path.exists(p) for p in paths.values()):
+        return paths
+
+    fe = YouTubeFeatureEngineer()
+    df = YouTubePreprocessor().preprocess(fe.process_all_features(synthetic_videos(n_rows, seed=seed)))
+    trainer = QuantileModelTrainer(target_columns)
+    with contextlib.chdir(workdir):
+        df = trainer.remove_outliers(trainer.prepare_features(df))
+    trainer.fit(df.drop(columns=target_columns), df[target_columns],
+                {'n_estimators': n_estimators, 'max_depth': 6, 'learning_rate': 0.1, 'random_state': 42})
+    trainer.save(paths['model'])
+    fe.save(paths['tables'])
+    return paths
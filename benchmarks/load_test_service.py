@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Load test for the prediction service: latency percentiles and throughput.
+Starts scripts/serve_model.py in its own process (with demo artifacts trained
+on synthetic rows unless --model/--tables are given), or targets a running
+service with --url / --unix-socket.
+Usage: python benchmarks/load_test_service.py --requests 5000 --concurrency 4 --batch-size 1
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(__file__))
+from common import train_demo_artifacts
+from youtube_first_hour.synthetic import synthetic_videos
+
+SERVE_SCRIPT = os.path.join(os.path.dirname(__file__), "..", "scripts", "serve_model.py")
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str):
+        super().__init__("localhost")
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.unix_path)
+
+
+def connect(args):
+    if args.unix_socket:
+        return UnixHTTPConnection(args.unix_socket)
+    host, port = args.url.split("//")[-1].rstrip("/").split(":")
+    return http.client.HTTPConnection(host, int(port))
+
+
+def wait_until_healthy(args, timeout: float = 60.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = connect(args)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("Service did not become healthy")
+
+
+def client(args, bodies, latencies, server_ms, start_barrier):
+    """One keep-alive connection sending its share of the requests back to back"""
+    conn = connect(args)
+    headers = {"Content-Type": "application/json"}
+    start_barrier.wait()
+    for body in bodies:
+        start = time.perf_counter()
+        conn.request("POST", "/predict", body, headers)
+        response = conn.getresponse()
+        payload = json.loads(response.read())
+        latencies.append(time.perf_counter() - start)
+        if response.status != 200:
+            raise RuntimeError(payload)
+        server_ms.append(payload["latency_ms"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prediction service load test")
+    parser.add_argument("--url", help="Target a running service, e.g. http://127.0.0.1:8080")
+    parser.add_argument("--unix-socket", help="Target (or start) the service on this Unix socket")
+    parser.add_argument("--model", help="Model to serve when starting the service")
+    parser.add_argument("--tables", help="Lookup tables to serve when starting the service")
+    parser.add_argument("--workdir", default="bench_data/serving", help="Where demo artifacts are trained")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=1, help="Records per request")
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--max-batch-size", type=int, default=0,
+                        help="Start the service with micro-batching of concurrent requests")
+    args = parser.parse_args()
+
+    server = None
+    if not args.url and not (args.unix_socket and os.path.exists(args.unix_socket)):
+        if not args.model:
+            paths = train_demo_artifacts(args.workdir)
+            args.model, args.tables = paths['model'], paths['tables']
+        cmd = [sys.executable, SERVE_SCRIPT, "--model", args.model, "--tables", args.tables,
+               "--max-batch-size", str(args.max_batch_size)]
+        if args.unix_socket:
+            cmd += ["--unix-socket", args.unix_socket]
+        else:
+            port = 18080
+            cmd += ["--port", str(port)]
+            args.url = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+
+    try:
+        wait_until_healthy(args)
+        records = synthetic_videos(args.batch_size * 100, seed=1).to_dict('records')
+        bodies = [json.dumps(records[i % 100 * args.batch_size:(i % 100 + 1) * args.batch_size]
+                             if args.batch_size > 1 else records[i % 100])
+                  for i in range(args.requests)]
+
+        # Warm up one connection (imports, first predict) before measuring
+        client(args, bodies[:args.warmup], [], [], threading.Barrier(1))
+
+        latencies, server_ms = [], []
+        barrier = threading.Barrier(args.concurrency + 1)
+        threads = [threading.Thread(target=client, args=(args, bodies[i::args.concurrency],
+                                                         latencies, server_ms, barrier))
+                   for i in range(args.concurrency)]
+        for t in threads:
+            t.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    ms = np.array(latencies) * 1000
+    print(f"requests: {len(ms)}, concurrency: {args.concurrency}, batch size: {args.batch_size}")
+    print(f"throughput: {len(ms) / elapsed:,.0f} requests/s, {len(ms) * args.batch_size / elapsed:,.0f} videos/s")
+    print(f"{'':>12} {'p50':>8} {'p90':>8} {'p99':>8} {'p99.9':>8} {'max':>8}  (ms)")
+    for name, values in [("round trip", ms), ("in service", np.array(server_ms))]:
+        p = np.percentile(values, [50, 90, 99, 99.9])
+        print(f"{name:>12} {p[0]:>8.3f} {p[1]:>8.3f} {p[2]:>8.3f} {p[3]:>8.3f} {values.max():>8.3f}")
+    if args.batch_size > 1:
+        print(f"per video p99: {np.percentile(ms, 99) / args.batch_size:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
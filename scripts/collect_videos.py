@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from youtube_first_hour.collector import AsyncHTTPClient, YouTubeCollector, run_hourly
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect hourly initial/final snapshot pairs from the YouTube Data API.")
+    parser.add_argument("--api-key", default=os.environ.get("YOUTUBE_API_KEY"), help="Defaults to $YOUTUBE_API_KEY")
+    parser.add_argument("--regions", nargs="+", default=["US", "GB", "IN"], help="regionCode values to search")
+    parser.add_argument("--categories", nargs="+", default=["10", "20", "22", "24"], help="videoCategoryId values")
+    parser.add_argument("--out-dir", "-o", default="data/raw")
+    parser.add_argument("--runs", type=int, help="Number of hourly windows to collect (default: run forever)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight at once")
+    args = parser.parse_args()
+    if not args.api_key:
+        parser.error("--api-key or YOUTUBE_API_KEY is required")
+
+    async def run():
+        client = AsyncHTTPClient(max_connections=args.concurrency)
+        try:
+            await run_hourly(YouTubeCollector(args.api_key, client), args.out_dir,
+                             args.regions, args.categories, runs=args.runs)
+        finally:
+            await client.close()
+
+    asyncio.run(run())
+    print(f"✅ Snapshots written to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
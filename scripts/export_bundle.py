@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Convert a trained model and its lookup tables into a memory-mapped artifact bundle.
+Usage:
+  python scripts/export_bundle.py --model artifacts/xgb_model.pkl --tables artifacts/feature_tables.npz \
+      --output artifacts/bundle
+"""
+import argparse
+import json
+import os
+import sys
+
+import joblib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from youtube_first_hour.artifacts import save_bundle
+from youtube_first_hour.data import metadata_path
+from youtube_first_hour.features import YouTubeFeatureEngineer
+from youtube_first_hour.model_training import export_tree_arrays
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a versioned, memory-mappable artifact bundle")
+    parser.add_argument("--model", "-m", required=True, help="Model saved by train_model.py (metadata JSON next to it)")
+    parser.add_argument("--tables", "-t", required=True,
+                        help="Lookup tables saved by run_feature_engineering.py --tables-output")
+    parser.add_argument("--scaler", help="scaler.pkl, only if the model was trained on scaled features")
+    parser.add_argument("--output", "-o", required=True, help="Bundle directory")
+    args = parser.parse_args()
+
+    with open(metadata_path(args.model)) as f:
+        metadata = json.load(f)
+    scaler = joblib.load(args.scaler) if args.scaler else None
+    ensemble = export_tree_arrays(joblib.load(args.model), metadata['feature_columns'])
+    manifest = save_bundle(args.output, ensemble, metadata, YouTubeFeatureEngineer.load(args.tables), scaler)
+    size_mb = os.path.getsize(os.path.join(args.output, manifest['data_file'])) / 1e6
+    print(f"✅ Bundle written to {args.output} ({len(manifest['arrays'])} arrays, {size_mb:.1f} MB, "
+          f"schema {manifest['schema_hash'][:12]})")
+
+
+if __name__ == "__main__":
+    main()
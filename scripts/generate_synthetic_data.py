@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Write seeded synthetic raw data in the VideoData schema (Zipfian channels,
+heavy-tailed views, 40 countries) for tests and benchmarks.
+Usage: python scripts/generate_synthetic_data.py --rows 1000000 --output data/synthetic.parquet
+"""
+import argparse
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from youtube_first_hour.synthetic import SyntheticVideoGenerator
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic raw YouTube data")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--output", "-o", default="data/synthetic.csv", help="CSV or .parquet path")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--channels", type=int, default=100_000)
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    if os.path.dirname(args.output):
+        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    SyntheticVideoGenerator(args.seed, n_channels=args.channels).write(args.output, args.rows, args.chunk_rows)
+    print(f"✅ Synthetic data saved: {args.output}")
+
+if __name__ == "__main__":
+    main()
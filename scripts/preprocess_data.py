@@ -2,27 +2,39 @@
 import argparse
 import os
 import sys
-import pandas as pd
-
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from youtube_first_hour.data import load_table, save_processed_data, table_columns
+from youtube_first_hour.instrumentation import add_trace_arguments, traced_run
 from youtube_first_hour.preprocessing import YouTubePreprocessor
+from youtube_first_hour.stage_cache import StageCache
 
 def main():
     parser = argparse.ArgumentParser(description="Run preprocessing pipeline on feature-engineered data")
-    parser.add_argument("--input", "-i", required=True, help="Path to feature-engineered CSV")
-    parser.add_argument("--output", "-o", required=True, help="Path to save preprocessed CSV")
+    parser.add_argument("--input", "-i", required=True, help="Path to feature-engineered CSV or Parquet/Arrow file")
+    parser.add_argument("--output", "-o", required=True, help="Path to save preprocessed data (.csv, .parquet or .feather)")
     parser.add_argument("--scale", action="store_true", help="Apply StandardScaler to numeric columns")
+    parser.add_argument("--keep-tags", action="store_true", help="Keep the raw tags column for sparse tag features")
+    parser.add_argument("--cache-dir", default="artifacts/stage_cache", help="Cache of stage outputs")
+    parser.add_argument("--no-cache", action="store_true", help="Always recompute")
+    add_trace_arguments(parser)
 
     args = parser.parse_args()
+    with traced_run(args, 'preprocess_data'):
+        run(args)
 
-    df = pd.read_csv(args.input)
+def run(args):
     prep = YouTubePreprocessor()
-    df_proc = prep.preprocess(df, scaling=args.scale)
+    # Read only the columns that survive preprocessing; the frame is ours, so no copies
+    unwanted = prep.unwanted_columns(args.keep_tags)
+    df = load_table(args.input, columns=prep.input_columns(table_columns(args.input), unwanted))
+    if args.no_cache:
+        df_proc = prep.preprocess(df, scaling=args.scale, copy=False, keep_tags=args.keep_tags)
+    else:
+        df_proc = StageCache(args.cache_dir).run(prep, 'preprocess', df, scaling=args.scale, copy=False,
+                                                 keep_tags=args.keep_tags)
 
     os.makedirs(os.path.dirname(args.output), exist_ok=True)
-    df_proc.to_csv(args.output, index=False)
-
-    print(f"[Preprocessing] Saved processed data to {args.output}")
+    save_processed_data(df_proc, args.output)
 
 if __name__ == "__main__":
     main()
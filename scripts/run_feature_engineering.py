@@ -5,36 +5,71 @@ Run both feature engineering (Notebook 1 logic) and preprocessing (Notebook 2 lo
 import argparse
 import os
 import sys
-import pandas as pd
-
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from youtube_first_hour.data import load_table, save_processed_data
 from youtube_first_hour.features import YouTubeFeatureEngineer
+from youtube_first_hour.instrumentation import add_trace_arguments, traced_run
+from youtube_first_hour.parallel_features import ParallelFeatureEngineer
 from youtube_first_hour.preprocessing import YouTubePreprocessor
+from youtube_first_hour.stage_cache import StageCache
 
 def main():
     parser = argparse.ArgumentParser(description="Run complete pipeline")
-    parser.add_argument("--input", "-i", required=True, help="Path to raw or feature-engineered CSV")
-    parser.add_argument("--feature-output", "-fo", default="data/feature_engineered.csv")
-    parser.add_argument("--preprocessed-output", "-po", default="data/preprocessed.csv")
+    parser.add_argument("--input", "-i", required=True, help="Path to raw or feature-engineered CSV/Parquet")
+    parser.add_argument("--feature-output", "-fo", default="data/feature_engineered.csv",
+                        help="Use a .parquet or .feather extension to keep typed columns")
+    parser.add_argument("--preprocessed-output", "-po", default="data/preprocessed.csv",
+                        help="Use a .parquet or .feather extension to keep typed columns")
+    parser.add_argument("--tables-output", help="Save the fitted category/channel lookup tables (.npz) for serving")
     parser.add_argument("--skip-feature-engineering", action="store_true")
+    parser.add_argument("--channel-history", action="store_true",
+                        help="Add point-in-time channel features (last N videos / 7 days / 24 hours); "
+                             "models trained on them cannot be served by FirstHourPredictor")
+    parser.add_argument("--n-workers", type=int, default=1,
+                        help="Partition feature engineering by channel across this many processes")
     parser.add_argument("--scale", action="store_true")
+    parser.add_argument("--keep-tags", action="store_true", help="Keep the raw tags column for sparse tag features")
+    parser.add_argument("--cache-dir", default="artifacts/stage_cache", help="Cache of stage outputs")
+    parser.add_argument("--no-cache", action="store_true", help="Always recompute every stage")
+    add_trace_arguments(parser)
     args = parser.parse_args()
 
-    df = pd.read_csv(args.input)
+    with traced_run(args, 'run_feature_engineering'):
+        run(args)
+
+def run(args):
+    df = load_table(args.input)
+    cache = None if args.no_cache else StageCache(args.cache_dir)
 
     if not args.skip_feature_engineering:
         fe = YouTubeFeatureEngineer()
-        df = fe.process_all_features(df)
-        os.makedirs(os.path.dirname(args.feature_output), exist_ok=True)
-        df.to_csv(args.feature_output, index=False)
+        # The loaded frame is ours: add features to it and preprocess without copies
+        if args.n_workers > 1:
+            parallel = ParallelFeatureEngineer(args.n_workers)
+            df = parallel.process_all_features(df, channel_history=args.channel_history)
+            fe = parallel.engineer
+        elif cache:
+            df = cache.run(fe, 'process_all_features', df, copy=False, channel_history=args.channel_history)
+        else:
+            df = fe.process_all_features(df, copy=False, channel_history=args.channel_history)
+        if args.tables_output:
+            os.makedirs(os.path.dirname(args.tables_output) or '.', exist_ok=True)
+            fe.save(args.tables_output)
+            print(f"✅ Lookup tables saved: {args.tables_output}")
+        os.makedirs(os.path.dirname(args.feature_output) or '.', exist_ok=True)
+        save_processed_data(df, args.feature_output)
         print(f"✅ Feature engineering complete: {args.feature_output}")
     else:
         print("⏩ Skipping feature engineering.")
 
     prep = YouTubePreprocessor()
-    df_preprocessed = prep.preprocess(df, scaling=args.scale)
-    os.makedirs(os.path.dirname(args.preprocessed_output), exist_ok=True)
-    df_preprocessed.to_csv(args.preprocessed_output, index=False)
+    if cache:
+        df_preprocessed = cache.run(prep, 'preprocess', df, scaling=args.scale, copy=False,
+                                    keep_tags=args.keep_tags)
+    else:
+        df_preprocessed = prep.preprocess(df, scaling=args.scale, copy=False, keep_tags=args.keep_tags)
+    os.makedirs(os.path.dirname(args.preprocessed_output) or '.', exist_ok=True)
+    save_processed_data(df_preprocessed, args.preprocessed_output)
     print(f"✅ Preprocessing complete: {args.preprocessed_output}")
     print("Final shape:", df_preprocessed.shape)
 
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Serve first-hour forecasts over HTTP (TCP or a Unix socket).
+Usage:
+  python scripts/serve_model.py --model artifacts/xgb_model.pkl --tables artifacts/feature_tables.npz
+  python scripts/serve_model.py --bundle artifacts/bundle
+  curl -X POST localhost:8080/predict -d @video.json
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from youtube_first_hour.artifacts import load_bundle
+from youtube_first_hour.batching import MicroBatcher
+from youtube_first_hour.serving import FirstHourPredictor, make_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Low-latency prediction service for raw VideoData records")
+    parser.add_argument("--model", "-m", help="Model saved by train_model.py (metadata JSON next to it)")
+    parser.add_argument("--tables", "-t", help="Lookup tables saved by run_feature_engineering.py --tables-output")
+    parser.add_argument("--bundle", "-b", help="Memory-mapped bundle from export_bundle.py (replaces --model/--tables/--scaler)")
+    parser.add_argument("--scaler", help="scaler.pkl, only if the model was trained on scaled features")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--unix-socket", help="Listen on this Unix socket path instead of host:port")
+    parser.add_argument("--threads", type=int, default=1, help="XGBoost threads per prediction")
+    parser.add_argument("--max-batch-size", type=int, default=0,
+                        help="Merge concurrent requests into batches of up to this many records (0: off)")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0,
+                        help="Longest a record waits for its batch to fill")
+    args = parser.parse_args()
+
+    if args.bundle:
+        predictor = load_bundle(args.bundle, n_threads=args.threads)
+    elif args.model and args.tables:
+        predictor = FirstHourPredictor.load(args.model, args.tables, args.scaler, n_threads=args.threads)
+    else:
+        parser.error("either --bundle or both --model and --tables are required")
+    batcher = None
+    if args.max_batch_size > 0:
+        batcher = MicroBatcher(predictor.predict_array, args.max_batch_size, args.max_wait_ms)
+    server = make_server(predictor, args.host, args.port, args.unix_socket, batcher)
+    where = args.unix_socket or f"http://{args.host}:{server.server_address[1]}"
+    print(f"Serving {predictor.target_columns} on {where}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if batcher is not None:
+            batcher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,12 +5,29 @@ import sys
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
+from youtube_first_hour.instrumentation import add_trace_arguments, traced_run
 from youtube_first_hour.model_training import train_model_from_csv
+from youtube_first_hour.stage_cache import StageCache
+from youtube_first_hour.tag_features import TagFeatureBuilder
 
 def main():
     parser = argparse.ArgumentParser(description="Train XGBoost MultiOutputRegressor with Optuna tuning.")
-    parser.add_argument("--input", "-i", required=True, help="Path to preprocessed CSV")
+    parser.add_argument("--input", "-i", required=True, help="Path to preprocessed CSV or Parquet/Arrow file")
     parser.add_argument("--output", "-o", default="artifacts/xgb_model.pkl", help="Where to save trained model")
+    parser.add_argument("--n-trials", type=int, default=10,
+                        help="Finished Optuna trials to reach (a resumed study counts earlier trials)")
+    parser.add_argument("--timeout", type=float, help="Wall-clock tuning budget in seconds")
+    parser.add_argument("--n-workers", type=int, default=1, help="Worker processes running trials in parallel")
+    parser.add_argument("--storage", help="Optuna storage URL, e.g. sqlite:///artifacts/study.db (resumable)")
+    parser.add_argument("--study-name", default="XGBoost_Optimization")
+    # multi_output_tree (vector leaves) is left out: its models cannot be exported as tree arrays
+    parser.add_argument("--multi-strategy", choices=["one_output_per_tree"],
+                        help="Train one native multi-target booster instead of one booster per target")
+    parser.add_argument("--cache-dir", default="artifacts/stage_cache", help="Cache of prepared features")
+    parser.add_argument("--no-cache", action="store_true", help="Always recompute the prepared features")
+    parser.add_argument("--tag-features", type=int, metavar="MAX_TAGS",
+                        help="Add sparse indicators of the MAX_TAGS most frequent tags (needs --keep-tags preprocessing)")
+    add_trace_arguments(parser)
     args = parser.parse_args()
 
     target_columns = [
@@ -21,7 +38,23 @@ def main():
     ]
 
     os.makedirs(os.path.dirname(args.output), exist_ok=True)
-    train_model_from_csv(args.input, target_columns, args.output)
+    storage = args.storage
+    if storage is None and args.n_workers > 1:
+        storage = f"sqlite:///{os.path.splitext(args.output)[0]}_study.db"
+        print(f"Using shared study storage {storage}")
+
+    with traced_run(args, 'train_model'):
+        train_model_from_csv(
+            args.input, target_columns, args.output,
+            multi_strategy=args.multi_strategy,
+            cache=None if args.no_cache else StageCache(args.cache_dir),
+            tag_features=TagFeatureBuilder(max_tags=args.tag_features) if args.tag_features else None,
+            n_trials=args.n_trials,
+            timeout=args.timeout,
+            n_workers=args.n_workers,
+            storage=storage,
+            study_name=args.study_name
+        )
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import sys
+
+import joblib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from youtube_first_hour.data import load_table
+from youtube_first_hour.model_training import QuantileModelTrainer
+from youtube_first_hour.segment_training import MODEL_FAMILIES, QuantileSegments, SegmentTrainer, ZScoreSegments
+
+TARGET_COLUMNS = ['like_count_initial', 'like_count_final', 'view_count_initial', 'view_count_final']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune one model per segment and family, save the routed ensemble.")
+    parser.add_argument("--input", "-i", required=True, help="Path to preprocessed CSV or Parquet/Arrow file")
+    parser.add_argument("--output", "-o", default="artifacts/segmented_model.joblib")
+    parser.add_argument("--rule", choices=["quantile", "zscore"], default="quantile")
+    parser.add_argument("--column", default="view_count_final", help="Column split into quantiles")
+    parser.add_argument("--z-threshold", type=float, default=1.0, help="z-score separating normal from outlier rows")
+    parser.add_argument("--families", nargs="+", default=["xgboost"], choices=list(MODEL_FAMILIES))
+    parser.add_argument("--n-trials", type=int, default=10, help="Optuna trials per segment and family")
+    parser.add_argument("--n-workers", type=int, default=1, help="Jobs running in parallel processes")
+    args = parser.parse_args()
+
+    rule = (QuantileSegments(args.column) if args.rule == "quantile"
+            else ZScoreSegments(TARGET_COLUMNS, threshold=args.z_threshold))
+    trainer = QuantileModelTrainer(TARGET_COLUMNS)
+    df = trainer.remove_outliers(trainer.prepare_features(load_table(args.input)))
+
+    ensemble = SegmentTrainer(TARGET_COLUMNS, rule, args.families, args.n_workers, args.n_trials).fit(df)
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    joblib.dump(ensemble, args.output)
+    print(f"✅ Segmented ensemble saved at {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from youtube_first_hour.blending import StackingTrainer
+from youtube_first_hour.data import load_table
+from youtube_first_hour.model_training import QuantileModelTrainer
+
+TARGET_COLUMNS = ['like_count_initial', 'like_count_final', 'view_count_initial', 'view_count_final']
+
+DEFAULT_LEARNERS = {
+    'xgboost': ('xgboost', {'n_estimators': 1000, 'learning_rate': 0.05, 'max_depth': 8, 'random_state': 42}),
+    'random_forest': ('random_forest', {'n_estimators': 300, 'min_samples_leaf': 2, 'random_state': 42}),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stack base learners with a linear meta-model on OOF predictions.")
+    parser.add_argument("--input", "-i", required=True, help="Path to preprocessed CSV or Parquet/Arrow file")
+    parser.add_argument("--output", "-o", default="artifacts/stacked_model.joblib")
+    parser.add_argument("--learners", help='JSON file {"name": ["family", {params}]}; default xgboost + random_forest')
+    parser.add_argument("--cache-dir", default="artifacts/oof_cache", help="Cached OOF predictions and base fits")
+    parser.add_argument("--n-folds", type=int, default=5)
+    parser.add_argument("--n-workers", type=int, default=1, help="Fold fits running in parallel processes")
+    parser.add_argument("--export-trees", help="Also save the compiled stack as TreeEnsemble .npz (xgboost learners only)")
+    args = parser.parse_args()
+
+    learners = DEFAULT_LEARNERS
+    if args.learners:
+        with open(args.learners) as f:
+            learners = {name: tuple(spec) for name, spec in json.load(f).items()}
+
+    trainer = QuantileModelTrainer(TARGET_COLUMNS)
+    df = trainer.remove_outliers(trainer.prepare_features(load_table(args.input)))
+    X, y = df.drop(columns=TARGET_COLUMNS), df[TARGET_COLUMNS]
+
+    stacking = StackingTrainer(TARGET_COLUMNS, learners, args.cache_dir, args.n_folds, args.n_workers)
+    trainer.feature_columns = list(X.columns)
+    trainer.model = stacking.fit(X, y)
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    trainer.save(args.output)
+    print(f"✅ Stacked model saved at {args.output}")
+    if args.export_trees:
+        trainer.export_trees(args.export_trees)
+        print(f"✅ Compiled stack saved at {args.export_trees}")
+
+
+if __name__ == "__main__":
+    main()
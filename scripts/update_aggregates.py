@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Maintain the incremental channel/category aggregate store.
+Usage:
+  python scripts/update_aggregates.py update --store data/aggregates.sqlite --input data/hour.csv
+  python scripts/update_aggregates.py rebuild --store data/aggregates.sqlite --input data/raw.csv
+"""
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from youtube_first_hour.aggregate_store import AggregateStore
+from youtube_first_hour.features import READ_CSV_KWARGS, accumulate_group_statistics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Update or rebuild the channel/category aggregate store")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    update = subparsers.add_parser("update", help="Merge one hourly batch into the store")
+    update.add_argument("--store", "-s", required=True, help="Path to the SQLite aggregate store")
+    update.add_argument("--input", "-i", required=True, help="CSV with the new hour of videos")
+    update.add_argument("--batch-id", help="Unique id of the batch (defaults to the input file name)")
+
+    rebuild = subparsers.add_parser("rebuild", help="Check the store against a full recompute")
+    rebuild.add_argument("--store", "-s", required=True, help="Path to the SQLite aggregate store")
+    rebuild.add_argument("--input", "-i", required=True, help="CSV with the full history")
+    rebuild.add_argument("--chunksize", type=int, default=100_000)
+    rebuild.add_argument("--replace", action="store_true",
+                         help="Overwrite the store with the recompute and compact it")
+
+    args = parser.parse_args()
+
+    with AggregateStore(args.store) as store:
+        if args.command == "update":
+            batch = pd.read_csv(args.input, **READ_CSV_KWARGS)
+            batch_id = args.batch_id or os.path.basename(args.input)
+            if store.update(batch, batch_id):
+                print(f"[Aggregates] Merged {len(batch)} rows from batch {batch_id}")
+            return
+
+        stats, _ = accumulate_group_statistics(args.input, args.chunksize)
+        report = store.verify(stats)
+        print(f"[Aggregates] Mismatches against full recompute: {report}")
+        if args.replace:
+            store.rebuild(stats)
+            print(f"[Aggregates] Store rebuilt from {stats.rows} rows and compacted")
+        elif any(report.values()):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
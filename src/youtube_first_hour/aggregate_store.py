@@ -0,0 +1,208 @@
+# src/youtube_first_hour/aggregate_store.py
+
+import sqlite3
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .features import GroupStatsAccumulator, YouTubeFeatureEngineer
+
+# SQLite caps the number of bound parameters per statement
+_MAX_PARAMS = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS category_stats (
+    category_id REAL PRIMARY KEY,
+    view_sum REAL NOT NULL, view_count INTEGER NOT NULL,
+    like_sum REAL NOT NULL, like_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS channel_stats (
+    channel_id TEXT PRIMARY KEY,
+    view_sum REAL NOT NULL, view_count INTEGER NOT NULL,
+    like_sum REAL NOT NULL, like_count INTEGER NOT NULL,
+    first_subscriber_count REAL
+);
+CREATE TABLE IF NOT EXISTS batches (
+    batch_id TEXT PRIMARY KEY,
+    rows INTEGER NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+"""
+
+_INSERT = """
+INSERT INTO {table} ({key}, view_sum, view_count, like_sum, like_count{extra_cols})
+VALUES (?, ?, ?, ?, ?{extra_params})
+"""
+
+_UPSERT = _INSERT + """ON CONFLICT({key}) DO UPDATE SET
+    view_sum = view_sum + excluded.view_sum,
+    view_count = view_count + excluded.view_count,
+    like_sum = like_sum + excluded.like_sum,
+    like_count = like_count + excluded.like_count{extra_update}
+"""
+
+
+class AggregateStore:
+    """
+    Persistent running aggregates behind the category and channel features.
+    Stores, per category_id and channel_id:
+    - Running sum and count of view/like differences
+    - First-seen channel subscriber count
+    Each hourly batch is merged in with an upsert, so an update costs time
+    proportional to the batch and not to the whole history.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "AggregateStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def has_batch(self, batch_id: str) -> bool:
+        row = self.conn.execute("SELECT 1 FROM batches WHERE batch_id = ?", (batch_id,)).fetchone()
+        return row is not None
+
+    def update(self, batch: pd.DataFrame, batch_id: str) -> bool:
+        """
+        Merge one batch of raw rows (with final counts) into the store.
+        Returns False, without changing anything, if batch_id was already ingested.
+        """
+        if self.has_batch(batch_id):
+            print(f"[AggregateStore] Batch {batch_id} already ingested, skipping")
+            return False
+
+        stats = GroupStatsAccumulator()
+        stats.update(YouTubeFeatureEngineer()._create_target_variables(batch.copy()))
+        with self.conn:
+            self._write(stats, upsert=True)
+            self.conn.execute(
+                "INSERT INTO batches VALUES (?, ?, ?)",
+                (batch_id, len(batch), datetime.now(timezone.utc).isoformat())
+            )
+        return True
+
+    def _write(self, stats: GroupStatsAccumulator, upsert: bool) -> None:
+        if stats.category_sums is None:
+            return
+        statement = _UPSERT if upsert else _INSERT
+
+        categories = self._rows(stats.category_sums, stats.category_counts)
+        self.conn.executemany(
+            statement.format(table='category_stats', key='category_id',
+                             extra_cols='', extra_params='', extra_update=''),
+            [(float(key), *values) for key, *values in categories]
+        )
+
+        first_subs = stats.channel_first_subs.reindex(stats.channel_sums.index)
+        channels = self._rows(stats.channel_sums, stats.channel_counts)
+        self.conn.executemany(
+            statement.format(table='channel_stats', key='channel_id',
+                             extra_cols=', first_subscriber_count', extra_params=', ?',
+                             extra_update=(',\n    first_subscriber_count = COALESCE('
+                                           'first_subscriber_count, excluded.first_subscriber_count)')),
+            [(str(key), *values, None if pd.isna(subs) else float(subs))
+             for (key, *values), subs in zip(channels, first_subs)]
+        )
+
+    @staticmethod
+    def _rows(sums: pd.DataFrame, counts: pd.DataFrame) -> List[tuple]:
+        return list(zip(
+            sums.index,
+            sums['view_count_difference'].astype(float), counts['view_count_difference'].astype(int),
+            sums['like_count_difference'].astype(float), counts['like_count_difference'].astype(int),
+        ))
+
+    def load_statistics(self, channel_ids: Optional[Iterable] = None) -> GroupStatsAccumulator:
+        """
+        Read the store back as a GroupStatsAccumulator.
+        All categories are always read (there are only a few dozen); pass
+        channel_ids to read just the channels a batch needs.
+        """
+        categories = pd.read_sql_query("SELECT * FROM category_stats", self.conn, index_col='category_id')
+        if channel_ids is None:
+            channels = pd.read_sql_query("SELECT * FROM channel_stats", self.conn, index_col='channel_id')
+        else:
+            keys = [str(key) for key in pd.unique(pd.Series(list(channel_ids)).dropna())]
+            parts = [
+                pd.read_sql_query(
+                    "SELECT * FROM channel_stats WHERE channel_id IN ({})".format(
+                        ', '.join('?' * len(keys[i:i + _MAX_PARAMS]))),
+                    self.conn, params=keys[i:i + _MAX_PARAMS], index_col='channel_id'
+                )
+                for i in range(0, len(keys), _MAX_PARAMS)
+            ]
+            channels = pd.concat(parts) if parts else pd.read_sql_query(
+                "SELECT * FROM channel_stats WHERE 0", self.conn, index_col='channel_id')
+
+        stats = GroupStatsAccumulator()
+        stats.category_sums, stats.category_counts = self._split(categories)
+        stats.channel_sums, stats.channel_counts = self._split(channels)
+        stats.channel_first_subs = channels['first_subscriber_count'].astype(float)
+        stats.rows = self.conn.execute("SELECT COALESCE(SUM(rows), 0) FROM batches").fetchone()[0]
+        return stats
+
+    @staticmethod
+    def _split(frame: pd.DataFrame):
+        sums = pd.DataFrame({'view_count_difference': frame['view_sum'].astype(float),
+                             'like_count_difference': frame['like_sum'].astype(float)})
+        counts = pd.DataFrame({'view_count_difference': frame['view_count'].astype(int),
+                               'like_count_difference': frame['like_count'].astype(int)})
+        return sums, counts
+
+    def feature_engineer(self, batch: Optional[pd.DataFrame] = None) -> YouTubeFeatureEngineer:
+        """Feature engineer fitted from the store, limited to the channels of `batch` if given"""
+        channel_ids = None if batch is None else batch['channel_id']
+        engineer = YouTubeFeatureEngineer()
+        engineer.set_group_statistics(self.load_statistics(channel_ids))
+        return engineer
+
+    def verify(self, stats: GroupStatsAccumulator, rtol: float = 1e-9) -> Dict[str, int]:
+        """
+        Compare the store with statistics recomputed from the full history.
+        Returns the number of mismatching keys per table (0 everywhere means consistent).
+        """
+        stored = self.load_statistics()
+        report = {}
+        for name, (sums, counts), (ref_sums, ref_counts) in [
+            ('categories', (stored.category_sums, stored.category_counts),
+             (stats.category_sums, stats.category_counts)),
+            ('channels', (stored.channel_sums, stored.channel_counts),
+             (stats.channel_sums, stats.channel_counts)),
+        ]:
+            if name == 'channels':
+                ref_sums = ref_sums.rename(index=str)
+                ref_counts = ref_counts.rename(index=str)
+            keys = sums.index.union(ref_sums.index)
+            close = np.isclose(sums.reindex(keys).to_numpy(dtype=float),
+                               ref_sums.reindex(keys).to_numpy(dtype=float), rtol=rtol)
+            mismatched = ~close.all(axis=1)
+            mismatched |= (counts.reindex(keys).to_numpy(dtype=float)
+                           != ref_counts.reindex(keys).to_numpy(dtype=float)).any(axis=1)
+            report[name] = int(mismatched.sum())
+
+        first = stored.channel_first_subs
+        ref_first = stats.channel_first_subs.rename(index=str).reindex(first.index)
+        report['first_subscriber_count'] = int((~np.isclose(first, ref_first, equal_nan=True)).sum())
+        return report
+
+    def rebuild(self, stats: GroupStatsAccumulator) -> None:
+        """
+        Replace the aggregates with statistics recomputed from the full history
+        and compact the database file. The ingested batch log is kept, so
+        hours already covered by the recompute are still not merged twice.
+        """
+        with self.conn:
+            self.conn.execute("DELETE FROM category_stats")
+            self.conn.execute("DELETE FROM channel_stats")
+            self._write(stats, upsert=False)
+        self.conn.execute("VACUUM")
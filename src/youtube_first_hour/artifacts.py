@@ -0,0 +1,159 @@
+# src/youtube_first_hour/artifacts.py
+
+import dataclasses
+import hashlib
+import json
+import mmap
+import os
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .features import YouTubeFeatureEngineer
+from .schema import VideoData
+from .serving import FirstHourPredictor
+from .tree_ensemble import TreeEnsemble
+
+BUNDLE_FORMAT = "youtube-first-hour-bundle"
+BUNDLE_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+DATA_FILE = "arrays.bin"
+# Every array starts on a cache-line boundary of the data file
+ALIGNMENT = 64
+
+
+def schema_hash(input_fields, feature_columns, target_columns, arrays: Dict[str, Dict[str, Any]]) -> str:
+    """Hash of everything a scoring worker relies on: record fields, feature order and array layout"""
+    schema = {
+        'version': BUNDLE_VERSION,
+        'input_fields': list(input_fields),
+        'feature_columns': list(feature_columns),
+        'target_columns': list(target_columns),
+        'arrays': {name: [spec['dtype'], spec['shape']] for name, spec in sorted(arrays.items())},
+    }
+    return hashlib.sha256(json.dumps(schema, sort_keys=True).encode()).hexdigest()
+
+
+def save_bundle(directory: str, ensemble: TreeEnsemble, metadata: Dict[str, Any],
+                feature_engineer: YouTubeFeatureEngineer, scaler=None) -> Dict[str, Any]:
+    """
+    Write a versioned artifact bundle: one binary file of aligned raw arrays
+    (tree arrays, lookup tables, label-encoder vocabularies, country codes,
+    tag vocabulary and statistics, scaler vectors) and a JSON manifest with their layout, the feature order
+    and a schema hash. Returns the manifest.
+    """
+    arrays: Dict[str, np.ndarray] = {}
+    arrays.update({f'tree__{name}': value for name, value in ensemble.to_arrays().items()})
+    arrays.update({f'lookup__{name}': value for name, value in feature_engineer.to_arrays().items()})
+    for col, classes in metadata.get('label_encoders', {}).items():
+        arrays[f'vocab__{col}'] = np.asarray(classes)
+    country = metadata.get('country_encoding', {})
+    arrays['country__keys'] = np.asarray(list(country), dtype=str)
+    arrays['country__codes'] = np.asarray(list(country.values()), dtype=np.int64)
+    tags = metadata.get('tag_features')
+    if tags:
+        arrays['tags__vocabulary'] = np.asarray(tags['vocabulary'], dtype=str)
+        if tags['tag_means'] is not None:
+            arrays['tags__global_mean'] = np.asarray(tags['global_mean'], dtype=np.float64)
+            arrays['tags__tag_means'] = np.asarray(tags['tag_means'], dtype=np.float64).reshape(
+                len(tags['vocabulary']), len(tags['target_columns']))
+    if scaler is not None:
+        arrays['scaler__columns'] = np.asarray(scaler.feature_names_in_, dtype=str)
+        arrays['scaler__mean'] = np.asarray(scaler.mean_, dtype=np.float64)
+        arrays['scaler__scale'] = np.asarray(scaler.scale_, dtype=np.float64)
+
+    os.makedirs(directory, exist_ok=True)
+    layout: Dict[str, Dict[str, Any]] = {}
+    with open(os.path.join(directory, DATA_FILE), "wb") as f:
+        for name, value in arrays.items():
+            value = np.asarray(value, order="C")
+            if value.dtype.hasobject:
+                raise TypeError(f"Array {name} holds Python objects and cannot be memory-mapped")
+            f.write(b"\0" * (-f.tell() % ALIGNMENT))
+            layout[name] = {'offset': f.tell(), 'dtype': value.dtype.str, 'shape': list(value.shape)}
+            f.write(value.tobytes())
+
+    input_fields = [field.name for field in dataclasses.fields(VideoData)]
+    manifest = {
+        'format': BUNDLE_FORMAT,
+        'version': BUNDLE_VERSION,
+        'schema_hash': schema_hash(input_fields, metadata['feature_columns'],
+                                   metadata['target_columns'], layout),
+        'input_fields': input_fields,
+        'feature_columns': list(metadata['feature_columns']),
+        'target_columns': list(metadata['target_columns']),
+        'multi_strategy': metadata.get('multi_strategy'),
+        # Arrays hold the tag vocabulary and statistics; these are the rest of TagFeatureBuilder.metadata
+        'tag_features': {'target_columns': tags['target_columns'], 'smoothing': tags['smoothing']} if tags else None,
+        'data_file': DATA_FILE,
+        'arrays': layout,
+    }
+    with open(os.path.join(directory, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def read_manifest(directory: str) -> Dict[str, Any]:
+    """Load and validate a bundle manifest against this code's format and VideoData schema"""
+    with open(os.path.join(directory, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != BUNDLE_FORMAT or manifest.get('version') != BUNDLE_VERSION:
+        raise ValueError(f"Unsupported bundle {manifest.get('format')} v{manifest.get('version')}, "
+                         f"expected {BUNDLE_FORMAT} v{BUNDLE_VERSION}")
+    input_fields = [field.name for field in dataclasses.fields(VideoData)]
+    expected = schema_hash(input_fields, manifest['feature_columns'],
+                           manifest['target_columns'], manifest['arrays'])
+    if manifest['schema_hash'] != expected:
+        raise ValueError("Bundle schema hash does not match: it was built for a different "
+                         "VideoData schema or its manifest was edited")
+    return manifest
+
+
+def map_arrays(directory: str, manifest: Optional[Dict[str, Any]] = None) -> Dict[str, np.ndarray]:
+    """
+    Read-only arrays backed by one shared memory mapping of the data file.
+    Pages are loaded lazily and shared through the page cache by every
+    process that maps the same bundle.
+    """
+    manifest = manifest or read_manifest(directory)
+    with open(os.path.join(directory, manifest['data_file']), "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+    arrays = {}
+    for name, spec in manifest['arrays'].items():
+        arrays[name] = np.ndarray(tuple(spec['shape']), dtype=np.dtype(spec['dtype']),
+                                  buffer=buffer, offset=spec['offset'])
+    return arrays
+
+
+def load_bundle(directory: str, n_threads: int = 1) -> FirstHourPredictor:
+    """FirstHourPredictor over a memory-mapped bundle written by `save_bundle`"""
+    manifest = read_manifest(directory)
+    arrays = map_arrays(directory, manifest)
+
+    def group(prefix: str) -> Dict[str, np.ndarray]:
+        return {name[len(prefix):]: value for name, value in arrays.items() if name.startswith(prefix)}
+
+    ensemble = TreeEnsemble(**group('tree__'))
+    country = group('country__')
+    metadata = {
+        'target_columns': manifest['target_columns'],
+        'feature_columns': manifest['feature_columns'],
+        'multi_strategy': manifest['multi_strategy'],
+        'label_encoders': {col: classes.tolist() for col, classes in group('vocab__').items()},
+        'country_encoding': dict(zip(country['keys'].tolist(), country['codes'].tolist())),
+    }
+    if manifest.get('tag_features'):
+        tags = group('tags__')
+        metadata['tag_features'] = {
+            **manifest['tag_features'],
+            'vocabulary': tags['vocabulary'].tolist(),
+            'global_mean': tags.get('global_mean'),
+            'tag_means': tags.get('tag_means'),
+        }
+    predictor = FirstHourPredictor(ensemble, metadata, YouTubeFeatureEngineer.from_arrays(group('lookup__')),
+                                   n_threads=n_threads)
+    scaler = group('scaler__')
+    if scaler:
+        predictor.set_scaling(scaler['columns'].tolist(), scaler['mean'], scaler['scale'])
+    return predictor
@@ -0,0 +1,163 @@
+# src/youtube_first_hour/batching.py
+
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+
+_STOP = object()
+
+
+class BatchMetrics:
+    """Batch size distribution, queue wait and predict time of a MicroBatcher"""
+
+    def __init__(self, window: int = 10_000):
+        self._lock = threading.Lock()
+        self.batch_sizes: Counter = Counter()
+        self.requests = 0
+        self.batches = 0
+        # Most recent samples only, so a long-running service stays bounded
+        self.queue_wait_ms: deque = deque(maxlen=window)
+        self.predict_ms: deque = deque(maxlen=window)
+
+    def record(self, size: int, waits_ms: List[float], predict_ms: float) -> None:
+        with self._lock:
+            self.batch_sizes[size] += 1
+            self.requests += size
+            self.batches += 1
+            self.queue_wait_ms.extend(waits_ms)
+            self.predict_ms.append(predict_ms)
+
+    @staticmethod
+    def _percentiles(samples) -> Dict[str, float]:
+        values = np.fromiter(samples, dtype=float)
+        if not len(values):
+            return {}
+        p50, p90, p99 = np.percentile(values, [50, 90, 99]).tolist()
+        return {'p50': p50, 'p90': p90, 'p99': p99, 'max': float(values.max())}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-ready summary of everything recorded so far"""
+        with self._lock:
+            sizes = np.repeat(list(self.batch_sizes), list(self.batch_sizes.values()))
+            return {
+                'requests': self.requests,
+                'batches': self.batches,
+                'mean_batch_size': self.requests / self.batches if self.batches else 0.0,
+                'batch_size': {**self._percentiles(sizes),
+                               'histogram': {str(k): v for k, v in sorted(self.batch_sizes.items())}},
+                'queue_wait_ms': self._percentiles(list(self.queue_wait_ms)),
+                'predict_ms': self._percentiles(list(self.predict_ms)),
+            }
+
+
+class MicroBatcher:
+    """
+    Collects scoring requests from many callers into batches and runs one
+    vectorised `predict_fn` call per batch.
+    A batch is dispatched when it holds max_batch_size records or when its
+    oldest record has waited max_wait_ms, whichever comes first.
+    `predict_fn` takes a list of records and returns one row per record.
+    """
+
+    def __init__(self, predict_fn: Callable[[List[Any]], np.ndarray],
+                 max_batch_size: int = 256, max_wait_ms: float = 2.0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.metrics = BatchMetrics()
+        self._queue: queue.Queue = queue.Queue()
+        self._closed = False
+        # Held from the closed check to the put, so nothing is queued after _STOP
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, record: Any) -> Future:
+        """Queue one record; the future resolves to its prediction row"""
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._queue.put((record, future, time.perf_counter()))
+        return future
+
+    def predict(self, records: Sequence[Any]) -> np.ndarray:
+        """Blocking helper: queue every record and wait for all their rows"""
+        futures = [self.submit(record) for record in records]
+        return np.stack([future.result() for future in futures])
+
+    def close(self) -> None:
+        """Finish the queued requests and stop the batching thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = item[2] + self.max_wait
+            while len(batch) < self.max_batch_size:
+                try:
+                    # Past the deadline, still take whatever is already queued
+                    item = self._queue.get(timeout=max(0.0, deadline - time.perf_counter()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            # Cancelled requests are dropped; the others can no longer be cancelled
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            try:
+                self._dispatch(batch)
+            except Exception as e:
+                # Nothing a batch does may end the batching thread
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _dispatch(self, batch: List[tuple]) -> None:
+        if not batch:
+            return
+        start = time.perf_counter()
+        records = [record for record, _, _ in batch]
+        try:
+            preds = self.predict_fn(records)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+            else:
+                # Score one by one so a bad record only fails its own caller
+                for one in batch:
+                    self._dispatch([one])
+            return
+        finished = time.perf_counter()
+        if len(preds) != len(batch):
+            error = ValueError(f"predict_fn returned {len(preds)} rows for {len(batch)} records")
+            for _, future, _ in batch:
+                future.set_exception(error)
+            return
+        for i, (_, future, _) in enumerate(batch):
+            future.set_result(preds[i])
+        self.metrics.record(len(batch), [(start - queued) * 1000 for _, _, queued in batch],
+                            (finished - start) * 1000)
@@ -0,0 +1,160 @@
+# src/youtube_first_hour/blending.py
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.model_selection import KFold
+from sklearn.multioutput import MultiOutputRegressor
+import xgboost as xgb
+
+from .data import frame_fingerprint
+from .model_training import export_tree_arrays
+from .tree_ensemble import TreeEnsemble
+
+
+def make_estimator(family: str, params: Dict[str, Any], n_jobs: int = 1):
+    """
+    Unfitted multi-target base learner; lightgbm and catboost are optional imports.
+    n_jobs replaces any thread count in params, so parallel fits don't oversubscribe the cores.
+    """
+    if family == 'xgboost':
+        return MultiOutputRegressor(xgb.XGBRegressor(**{**params, 'n_jobs': n_jobs}))
+    if family == 'random_forest':
+        return RandomForestRegressor(**{**params, 'n_jobs': n_jobs})
+    if family == 'lightgbm':
+        from lightgbm import LGBMRegressor
+        return MultiOutputRegressor(LGBMRegressor(**{'verbose': -1, **params, 'n_jobs': n_jobs}))
+    if family == 'catboost':
+        from catboost import CatBoostRegressor
+        return MultiOutputRegressor(CatBoostRegressor(**{'verbose': 0, **params, 'thread_count': n_jobs}))
+    raise ValueError(f"Unknown model family {family!r}")
+
+
+def _fit_predict(family: str, params: Dict[str, Any], n_jobs: int, X_fit, y_fit, X_pred):
+    """Fit one base learner (in a worker process); returns its predictions on X_pred, or the model."""
+    model = make_estimator(family, params, n_jobs)
+    model.fit(X_fit, y_fit)
+    return model if X_pred is None else model.predict(X_pred)
+
+
+class StackedModel:
+    """
+    Base learners blended per target by linear weights, all on log1p scale:
+    pred[:, t] = intercept[t] + sum_i weights[i, t] * learner_i[:, t].
+    """
+
+    def __init__(self, learners: Dict[str, Any], families: Dict[str, str],
+                 weights: np.ndarray, intercept: np.ndarray):
+        self.learners = learners
+        self.families = families
+        self.weights = weights
+        self.intercept = intercept
+
+    def predict(self, X) -> np.ndarray:
+        base = np.stack([model.predict(X) for model in self.learners.values()])
+        return np.einsum('lnt,lt->nt', base, self.weights) + self.intercept
+
+    def to_tree_ensemble(self) -> TreeEnsemble:
+        """Whole stack as one TreeEnsemble (xgboost learners only): one traversal per batch."""
+        unsupported = [name for name, family in self.families.items() if family != 'xgboost']
+        if unsupported:
+            raise ValueError(f"Only xgboost learners can be compiled, not {unsupported}")
+        ensembles = [export_tree_arrays(model) for model in self.learners.values()]
+        return TreeEnsemble.blend(ensembles, self.weights, self.intercept)
+
+
+class StackingTrainer:
+    """
+    K-fold stacking: out-of-fold predictions of every base learner train a
+    linear meta-model per target. OOF predictions and full-data fits are
+    cached in cache_dir under a key of (data fingerprint, family, params,
+    folds), so changing one learner's params only retrains that learner.
+    learners: {name: (family, params)}, family one of xgboost,
+    random_forest, lightgbm, catboost.
+    """
+
+    def __init__(self, target_columns: List[str], learners: Dict[str, Tuple[str, Dict[str, Any]]],
+                 cache_dir: str = "artifacts/oof_cache", n_folds: int = 5, n_workers: int = 1):
+        self.target_columns = target_columns
+        self.learners = learners
+        self.cache_dir = cache_dir
+        self.n_folds = n_folds
+        self.n_workers = n_workers
+        self.computed: List[str] = []
+
+    def cache_key(self, fingerprint: str, name: str) -> str:
+        family, params = self.learners[name]
+        payload = {'data': fingerprint, 'family': family, 'params': params,
+                   'n_folds': self.n_folds, 'seed': 42}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:20]
+
+    def _paths(self, name: str, key: str) -> Tuple[str, str]:
+        stem = os.path.join(self.cache_dir, f"{name}_{key}")
+        return f"{stem}_oof.npy", f"{stem}_model.joblib"
+
+    def _run(self, jobs: List[Tuple]) -> List[Any]:
+        """Run _fit_predict jobs inline or in a process pool with per-job thread caps."""
+        if self.n_workers <= 1:
+            return [_fit_predict(*job) for job in jobs]
+        with ProcessPoolExecutor(max_workers=self.n_workers) as pool:
+            return list(pool.map(_fit_predict, *zip(*jobs)))
+
+    def base_predictions(self, X: pd.DataFrame, y: pd.DataFrame) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+        """OOF predictions (rows x targets, log scale) and full-data fits of every learner."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fingerprint = frame_fingerprint(X, y)
+        y_log = np.log1p(y.to_numpy(dtype=float))
+        folds = list(KFold(self.n_folds, shuffle=True, random_state=42).split(X))
+        n_jobs = max(1, (os.cpu_count() or 1) // self.n_workers)
+
+        oof, models, missing = {}, {}, []
+        for name in self.learners:
+            oof_path, model_path = self._paths(name, self.cache_key(fingerprint, name))
+            if os.path.exists(oof_path) and os.path.exists(model_path):
+                print(f"[Stacking] {name}: cached OOF predictions")
+                oof[name] = np.load(oof_path)
+                models[name] = joblib.load(model_path)
+            else:
+                missing.append(name)
+
+        # One job per (learner, fold) plus one full-data fit per learner
+        jobs = []
+        for name in missing:
+            family, params = self.learners[name]
+            for train_idx, valid_idx in folds:
+                jobs.append((family, params, n_jobs, X.iloc[train_idx], y_log[train_idx], X.iloc[valid_idx]))
+            jobs.append((family, params, n_jobs, X, y_log, None))
+        results = iter(self._run(jobs))
+
+        self.computed = missing
+        for name in missing:
+            preds = np.empty_like(y_log)
+            for _, valid_idx in folds:
+                preds[valid_idx] = next(results)
+            oof[name], models[name] = preds, next(results)
+            oof_path, model_path = self._paths(name, self.cache_key(fingerprint, name))
+            np.save(oof_path, preds)
+            joblib.dump(models[name], model_path)
+            print(f"[Stacking] {name}: OOF predictions computed and cached")
+        return oof, models
+
+    def fit(self, X: pd.DataFrame, y: pd.DataFrame) -> StackedModel:
+        oof, models = self.base_predictions(X, y)
+        names = list(self.learners)
+        y_log = np.log1p(y.to_numpy(dtype=float))
+        weights = np.empty((len(names), len(self.target_columns)))
+        intercept = np.empty(len(self.target_columns))
+        for t, col in enumerate(self.target_columns):
+            meta = LinearRegression().fit(np.column_stack([oof[name][:, t] for name in names]), y_log[:, t])
+            weights[:, t], intercept[t] = meta.coef_, meta.intercept_
+            print(f"[Stacking] {col} weights: " + ", ".join(f"{n}={w:.3f}" for n, w in zip(names, meta.coef_)))
+        return StackedModel({name: models[name] for name in names},
+                            {name: self.learners[name][0] for name in names}, weights, intercept)
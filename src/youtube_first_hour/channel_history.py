@@ -0,0 +1,138 @@
+# src/youtube_first_hour/channel_history.py
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .time_features import epoch_seconds
+
+# Name prefixes of the columns channel_history_features adds
+HISTORY_PREFIXES = ('channel_prior_videos', 'channel_mean_lift_', 'channel_videos_')
+
+
+class WindowedAggregator:
+    """
+    Point-in-time aggregates of a value over each row's earlier rows in the
+    same group: the rows of its group with a strictly earlier timestamp.
+
+    Rows are sorted once by (group, time). Every window is then a
+    contiguous range [start, end) of the sorted arrays, found by binary
+    search on a combined (group, time) key, and its sum and count are
+    differences of prefix sums, so each feature is O(n log n) overall
+    with no per-row filtering. Value sums restart at every group, so a
+    row's features are bit-for-bit independent of rows after it. Rows with
+    the same timestamp never see each other; "last n" breaks ties between
+    earlier rows by input order. Rows with a missing group or time get NaN
+    features and contribute to no window.
+
+    `value_times` is when each value became known, if later than the row's
+    time (a lift measured at the final snapshot, an hour after publishing).
+    Value windows then hold the rows whose value was known strictly before
+    the row's time, and "last n" / "last seconds" count in that order.
+    """
+
+    def __init__(self, groups: pd.Series, times: pd.Series, values: Optional[pd.Series] = None,
+                 value_times: Optional[pd.Series] = None):
+        seconds, valid_time = epoch_seconds(times)
+        codes = pd.factorize(groups)[0].astype(np.int64)
+        self.usable = (codes >= 0) & valid_time
+        self.n_rows = len(codes)
+
+        rows = np.flatnonzero(self.usable)
+        order = rows[np.lexsort((seconds[rows], codes[rows]))]
+        self.order = order
+        sorted_codes, self.times = codes[order], seconds[order]
+
+        entry_codes = entry_times = np.empty(0, dtype=np.int64)
+        if values is not None:
+            known, valid_known = (seconds, valid_time) if value_times is None else epoch_seconds(value_times)
+            entries = np.flatnonzero((codes >= 0) & valid_known)
+            entries = entries[np.lexsort((known[entries], codes[entries]))]
+            entry_codes, entry_times = codes[entries], known[entries]
+
+        # One monotone key per (group, time): groups occupy disjoint key ranges
+        all_times = np.concatenate([self.times, entry_times])
+        t0 = all_times.min() if len(all_times) else 0
+        self.stride = int(all_times.max() - t0) + 1 if len(all_times) else 1
+        self.keys = sorted_codes * self.stride + (self.times - t0)
+        self.group_start = np.searchsorted(sorted_codes, sorted_codes, side='left')
+        # Exclusive end of each row's history: first row of its group at or after its time
+        self.end = np.searchsorted(self.keys, self.keys, side='left')
+
+        self.value_sums = self.value_counts = None
+        if values is not None:
+            # The same windows over the values, in the order they became known
+            self.value_keys = entry_codes * self.stride + (entry_times - t0)
+            self.value_group_start = np.searchsorted(entry_codes, sorted_codes, side='left')
+            self.value_end = np.searchsorted(self.value_keys, self.keys, side='left')
+            v = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)[entries]
+            present = ~np.isnan(v)
+            # Inclusive running sums within each group; counts are exact, so one global prefix
+            self.value_sums = pd.Series(np.where(present, v, 0.0)).groupby(entry_codes).cumsum().to_numpy()
+            self.value_counts = np.concatenate([[0], np.cumsum(present)])
+
+    def _scatter(self, sorted_values: np.ndarray) -> np.ndarray:
+        """Back to the input row order, NaN for rows outside every group"""
+        out = np.full(self.n_rows, np.nan)
+        out[self.order] = sorted_values
+        return out
+
+    @staticmethod
+    def _window_start(keys: np.ndarray, group_start: np.ndarray, end: np.ndarray,
+                      query_keys: np.ndarray, seconds: Optional[float], last_n: Optional[int]) -> np.ndarray:
+        start = group_start
+        if seconds is not None:
+            start = np.maximum(start, np.searchsorted(keys, query_keys - int(seconds), side='left'))
+        if last_n is not None:
+            start = np.maximum(start, end - last_n)
+        return start
+
+    def _group_prefix(self, stop: np.ndarray) -> np.ndarray:
+        """Sum of values from each row's group start up to (excluding) `stop`"""
+        if not len(stop):
+            return np.zeros(0)
+        return np.where(stop > self.value_group_start, self.value_sums[np.maximum(stop - 1, 0)], 0.0)
+
+    def count(self, seconds: Optional[float] = None, last_n: Optional[int] = None) -> np.ndarray:
+        """Earlier rows of the group, optionally within `seconds` before the row or its last `last_n`"""
+        start = self._window_start(self.keys, self.group_start, self.end, self.keys, seconds, last_n)
+        return self._scatter((self.end - start).astype(np.float64))
+
+    def mean(self, seconds: Optional[float] = None, last_n: Optional[int] = None) -> np.ndarray:
+        """Mean value of the same window over the known values (missing values skipped; NaN for an empty window)"""
+        if self.value_sums is None:
+            raise ValueError("mean needs the aggregator to be built with values")
+        end = self.value_end
+        start = self._window_start(self.value_keys, self.value_group_start, end, self.keys, seconds, last_n)
+        counts = self.value_counts[end] - self.value_counts[start]
+        sums = self._group_prefix(end) - self._group_prefix(start)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._scatter(np.where(counts > 0, sums / counts, np.nan))
+
+
+def channel_history_features(df: pd.DataFrame, value_column: str = 'view_count_difference',
+                             known_column: Optional[str] = 'logged_at_final',
+                             last_n: Sequence[int] = (5, 20), days: Sequence[int] = (7,),
+                             count_hours: Sequence[int] = (24,)) -> Dict[str, np.ndarray]:
+    """
+    Point-in-time channel history of every video, from the channel's videos
+    published strictly before it:
+    - channel_prior_videos: all earlier videos
+    - channel_mean_lift_last_{n}: mean `value_column` over the last n videos
+    - channel_mean_lift_{d}d: mean `value_column` over the last d days
+    - channel_videos_{h}h: videos published in the last h hours
+    `value_column` is only known at `known_column` (the final snapshot), so
+    the lift means only see the videos whose final snapshot was taken before
+    the video was published; None treats it as known at publishing.
+    """
+    history = WindowedAggregator(df['channel_id'], df['published_at'], df[value_column],
+                                 df[known_column] if known_column else None)
+    features = {'channel_prior_videos': history.count()}
+    for n in last_n:
+        features[f'channel_mean_lift_last_{n}'] = history.mean(last_n=n)
+    for d in days:
+        features[f'channel_mean_lift_{d}d'] = history.mean(seconds=d * 86400)
+    for h in count_hours:
+        features[f'channel_videos_{h}h'] = history.count(seconds=h * 3600)
+    return features
@@ -0,0 +1,319 @@
+# src/youtube_first_hour/collector.py
+
+import asyncio
+import csv
+import dataclasses
+import functools
+import json
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .schema import VideoData
+
+API_URL = "https://www.googleapis.com/youtube/v3"
+# videos.list and channels.list accept at most 50 ids per call
+MAX_IDS_PER_CALL = 50
+LOGGED_AT_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, body: bytes):
+        super().__init__(f"HTTP {status}: {body[:200]!r}")
+        self.status = status
+
+
+class AsyncHTTPClient:
+    """
+    Asyncio front end to a pooled `requests.Session`: each GET runs in a
+    worker thread, with at most `max_connections` requests in flight.
+    Connection errors, timeouts, 429 and 5xx responses are retried with
+    exponential backoff (plus jitter); a request waiting out its backoff
+    does not hold a slot.
+    """
+
+    def __init__(self, max_connections: int = 32, timeout: float = 30.0, max_retries: int = 5,
+                 backoff: float = 0.5, max_backoff: float = 30.0, session: Optional[requests.Session] = None):
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.requests = 0
+        self.retries = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        # Own threads: the default executor has too few workers for max_connections
+        self._executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix='collector')
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """Status, lower-cased headers and decoded body of a GET, after retries"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                async with self._semaphore:
+                    self.requests += 1
+                    response = await loop.run_in_executor(
+                        self._executor, functools.partial(self._session.get, url, headers=headers,
+                                                          timeout=self.timeout))
+                if response.status_code != 429 and response.status_code < 500:
+                    return (response.status_code, {k.lower(): v for k, v in response.headers.items()},
+                            response.content)
+                retry_after = response.headers.get('Retry-After')
+                error: Exception = HTTPError(response.status_code, response.content)
+            except requests.RequestException as e:
+                error = e
+            if attempt == self.max_retries:
+                raise error
+            self.retries += 1
+            delay = min(self.max_backoff, self.backoff * 2 ** attempt) * (0.5 + random.random())
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get_json(self, url: str, params: Optional[Dict[str, object]] = None):
+        if params:
+            url = f"{url}?{urlencode(params)}"
+        status, _, body = await self.get(url, {'Accept': 'application/json'})
+        if status >= 400:
+            raise HTTPError(status, body)
+        return json.loads(body)
+
+    async def close(self) -> None:
+        self._session.close()
+        self._executor.shutdown(wait=False)
+
+
+def _batches(items: List[str], size: int) -> Iterable[List[str]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _count(statistics: Dict[str, str], name: str) -> Optional[float]:
+    # Hidden counts (e.g. likes disabled) are absent from the response
+    value = statistics.get(name)
+    return float(value) if value is not None else None
+
+
+class YouTubeCollector:
+    """
+    YouTube Data API v3 collector: discovers the videos published in a
+    time window (search.list per region and category) and snapshots their
+    statistics and their channels' with batched videos.list and
+    channels.list calls, all running concurrently through one client.
+    """
+
+    def __init__(self, api_key: str, client: Optional[AsyncHTTPClient] = None, base_url: str = API_URL,
+                 batch_size: int = MAX_IDS_PER_CALL, max_pages: int = 10):
+        self.api_key = api_key
+        self.client = client or AsyncHTTPClient()
+        self.base_url = base_url.rstrip('/')
+        self.batch_size = min(batch_size, MAX_IDS_PER_CALL)
+        self.max_pages = max_pages
+
+    async def _call(self, resource: str, **params):
+        return await self.client.get_json(f"{self.base_url}/{resource}", {**params, 'key': self.api_key})
+
+    async def _search(self, start: datetime, end: datetime, region: str, category: str) -> Dict[str, str]:
+        found, page_token = {}, None
+        for _ in range(self.max_pages):
+            params = dict(part='id', type='video', order='date', maxResults=50, regionCode=region,
+                          videoCategoryId=category, publishedAfter=start.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                          publishedBefore=end.strftime('%Y-%m-%dT%H:%M:%SZ'))
+            if page_token:
+                params['pageToken'] = page_token
+            page = await self._call('search', **params)
+            for item in page.get('items', []):
+                found.setdefault(item['id']['videoId'], region)
+            page_token = page.get('nextPageToken')
+            if not page_token:
+                break
+        return found
+
+    async def discover(self, start: datetime, end: datetime, regions: List[str],
+                       categories: List[str]) -> Dict[str, str]:
+        """video_id -> region code of every video published in [start, end)"""
+        results = await asyncio.gather(*(self._search(start, end, region, category)
+                                         for region in regions for category in categories))
+        videos: Dict[str, str] = {}
+        for found in results:
+            for video_id, region in found.items():
+                videos.setdefault(video_id, region)
+        return videos
+
+    async def _snapshot_batch(self, ids: List[str], countries: Dict[str, str]) -> List[dict]:
+        logged_at = datetime.now(timezone.utc).strftime(LOGGED_AT_FORMAT)
+        videos = await self._call('videos', part='snippet,statistics,contentDetails', id=','.join(ids),
+                                  maxResults=len(ids))
+        items = videos.get('items', [])
+        channel_ids = sorted({item['snippet']['channelId'] for item in items})
+        channels = {}
+        for batch in _batches(channel_ids, MAX_IDS_PER_CALL):
+            response = await self._call('channels', part='statistics', id=','.join(batch), maxResults=len(batch))
+            channels.update({item['id']: item.get('statistics', {}) for item in response.get('items', [])})
+
+        records = []
+        for item in items:
+            snippet, stats = item['snippet'], item.get('statistics', {})
+            channel = channels.get(snippet['channelId'], {})
+            records.append({
+                'video_id': item['id'],
+                'published_at': snippet.get('publishedAt'),
+                'category_id': float(snippet['categoryId']) if snippet.get('categoryId') else None,
+                'country': countries.get(item['id']),
+                'tags': ','.join(snippet.get('tags', [])),
+                'definition': item.get('contentDetails', {}).get('definition'),
+                'channel_id': snippet['channelId'],
+                'channel_title': snippet.get('channelTitle'),
+                'logged_at': logged_at,
+                'view_count': _count(stats, 'viewCount'),
+                'like_count': _count(stats, 'likeCount'),
+                'comment_count': _count(stats, 'commentCount'),
+                'c_view_count': _count(channel, 'viewCount'),
+                'c_subscriber_count': _count(channel, 'subscriberCount'),
+            })
+        return records
+
+    async def snapshot(self, countries: Dict[str, str], on_batch: Callable[[List[dict]], None]) -> int:
+        """
+        Fetch the current state of every video in `countries` (id -> region),
+        batch by batch in parallel; each finished batch is handed to
+        `on_batch` right away. Returns the number of videos fetched.
+        """
+        async def run(ids: List[str]) -> int:
+            records = await self._snapshot_batch(ids, countries)
+            on_batch(records)
+            return len(records)
+
+        counts = await asyncio.gather(*(run(ids) for ids in _batches(sorted(countries), self.batch_size)))
+        return sum(counts)
+
+
+class SnapshotStore:
+    """
+    Files of one snapshot pair, appended batch by batch: the initial
+    snapshot as JSON lines, then the complete VideoData rows as CSV once
+    the final snapshot of the same videos arrives.
+    """
+
+    FIELDS = [field.name for field in dataclasses.fields(VideoData)]
+    # Snapshot keys that get an _initial / _final suffix in VideoData
+    TIMED = ['logged_at', 'view_count', 'like_count', 'comment_count', 'c_view_count', 'c_subscriber_count']
+
+    def __init__(self, directory: str, window_end: datetime):
+        os.makedirs(directory, exist_ok=True)
+        stamp = window_end.strftime('%Y%m%d_%H%M')
+        self.initial_path = os.path.join(directory, f"initial_{stamp}.jsonl")
+        self.videos_path = os.path.join(directory, f"videos_{stamp}.csv")
+
+    def write_initial(self, records: List[dict]) -> None:
+        with open(self.initial_path, 'a') as f:
+            f.writelines(json.dumps(record) + '\n' for record in records)
+
+    def read_initial(self) -> Dict[str, dict]:
+        with open(self.initial_path) as f:
+            return {record['video_id']: record for record in map(json.loads, f)}
+
+    def write_final(self, initial: Dict[str, dict], records: List[dict]) -> None:
+        new_file = not os.path.exists(self.videos_path)
+        with open(self.videos_path, 'a', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=self.FIELDS)
+            if new_file:
+                writer.writeheader()
+            for final in records:
+                first = initial.get(final['video_id'])
+                if first is None:
+                    continue
+                row = {key: value for key, value in first.items() if key not in self.TIMED}
+                for key in self.TIMED:
+                    row[f'{key}_initial'] = first[key]
+                    row[f'{key}_final'] = final[key]
+                writer.writerow(row)
+
+
+async def collect_snapshot_pair(collector: YouTubeCollector, directory: str, window_end: datetime,
+                                regions: List[str], categories: List[str], window: float = 3600.0,
+                                delay: float = 3600.0) -> Dict[str, float]:
+    """
+    Discover the videos published in the `window` seconds before
+    `window_end`, snapshot them right away and again `delay` seconds later,
+    writing the joined VideoData rows. Returns throughput statistics.
+    """
+    store = SnapshotStore(directory, window_end)
+    start = time.perf_counter()
+    countries = await collector.discover(window_end - timedelta(seconds=window), window_end, regions, categories)
+    initial_count = await collector.snapshot(countries, store.write_initial)
+    initial_seconds = time.perf_counter() - start
+    print(f"[Collector] {window_end:%Y-%m-%d %H:00} initial: {initial_count} videos "
+          f"({initial_count / max(initial_seconds, 1e-9):.1f} videos/s)")
+
+    await asyncio.sleep(max(0.0, delay - initial_seconds))
+    initial = store.read_initial()
+    final_start = time.perf_counter()
+    final_count = await collector.snapshot({vid: r['country'] for vid, r in initial.items()},
+                                           lambda records: store.write_final(initial, records))
+    final_seconds = time.perf_counter() - final_start
+    print(f"[Collector] {window_end:%Y-%m-%d %H:00} final: {final_count} videos "
+          f"({final_count / max(final_seconds, 1e-9):.1f} videos/s) -> {store.videos_path}")
+    return {
+        'videos': final_count,
+        'initial_videos_per_second': initial_count / max(initial_seconds, 1e-9),
+        'final_videos_per_second': final_count / max(final_seconds, 1e-9),
+        'requests': collector.client.requests,
+        'retries': collector.client.retries,
+    }
+
+
+async def run_hourly(collector: YouTubeCollector, directory: str, regions: List[str], categories: List[str],
+                     runs: Optional[int] = None, interval: float = 3600.0, delay: float = 3600.0) -> None:
+    """
+    Cron-like scheduler: at every `interval` boundary (the hour by default)
+    start a snapshot pair for the window that just ended. Pairs overlap - the next hour's initial
+    snapshot runs while the previous pair waits for its final one.
+    A failed pair is logged as soon as it ends and does not stop the
+    schedule; with `runs` set, the first failure is raised once every pair
+    has finished.
+    """
+    pending: Set[asyncio.Task] = set()
+    failures: List[BaseException] = []
+
+    def finished(task: asyncio.Task) -> None:
+        pending.discard(task)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            print(f"[Collector] {task.get_name()} failed: {error!r}")
+            failures.append(error)
+
+    started = 0
+    while runs is None or started < runs:
+        now = time.time()
+        boundary = (now // interval + 1) * interval
+        await asyncio.sleep(boundary - now)
+        window_end = datetime.fromtimestamp(boundary, timezone.utc)
+        task = asyncio.create_task(collect_snapshot_pair(
+            collector, directory, window_end, regions, categories, window=interval, delay=delay),
+            name=f"snapshot pair {window_end:%Y-%m-%d %H:%M}")
+        pending.add(task)
+        task.add_done_callback(finished)
+        started += 1
+    # Failures are handled by `finished`; gather must not raise the first one early
+    await asyncio.gather(*pending, return_exceptions=True)
+    if failures:
+        raise failures[0]
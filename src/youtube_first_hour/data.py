@@ -1,27 +1,188 @@
+import hashlib
+import json
+import os
 import pandas as pd
-from typing import Optional
+from typing import Dict, List, Optional
+
+from .instrumentation import traced
+from .schema import dtype_plan
+
+REQUIRED_COLUMNS = [
+    'video_id', 'published_at', 'category_id', 'country', 'tags',
+    'definition', 'channel_id', 'channel_title', 'logged_at_initial',
+    'view_count_initial', 'like_count_initial', 'comment_count_initial',
+    'c_view_count_initial', 'c_subscriber_count_initial', 'logged_at_final',
+    'view_count_final', 'like_count_final', 'comment_count_final',
+    'c_view_count_final', 'c_subscriber_count_final'
+]
+
+# Columnar (Parquet / Arrow IPC) files keep dtypes between pipeline stages
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+ARROW_EXTENSIONS = ('.feather', '.arrow')
+
+# Low-cardinality strings stored as dictionary-encoded categoricals
+CATEGORICAL_COLUMNS = ['country', 'definition', 'published_day_of_week']
+TIMESTAMP_COLUMNS = ['published_at', 'logged_at_initial', 'logged_at_final']
+
+
+def is_columnar(filepath: str) -> bool:
+    """True if the file extension selects the columnar format"""
+    return os.path.splitext(filepath)[1].lower() in PARQUET_EXTENSIONS + ARROW_EXTENSIONS
+
+
+def _has_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _require_pyarrow() -> None:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Columnar storage needs pyarrow: pip install pyarrow") from e
+
+
+def to_columnar_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Give string columns their real types before writing them to a columnar file"""
+    df = df.copy(deep=False)
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and df[col].dtype == object:
+            df[col] = df[col].astype('category')
+    for col in TIMESTAMP_COLUMNS:
+        if col in df.columns and df[col].dtype == object:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    if 'published_time' in df.columns and df['published_time'].dtype == object:
+        df['published_time'] = pd.to_timedelta(df['published_time'], errors='coerce')
+    return df
+
+
+def frame_fingerprint(*frames: pd.DataFrame) -> str:
+    """Content hash of data frames: column names, dtypes and values, not the row index"""
+    digest = hashlib.sha256()
+    for frame in frames:
+        digest.update(json.dumps([list(map(str, frame.columns)), list(map(str, frame.dtypes))]).encode())
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+@traced('data.load')
+def load_table(filepath: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Load any stage output (CSV or columnar), reading only `columns` if given"""
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext in PARQUET_EXTENSIONS:
+        _require_pyarrow()
+        return pd.read_parquet(filepath, columns=columns)
+    if ext in ARROW_EXTENSIONS:
+        _require_pyarrow()
+        return pd.read_feather(filepath, columns=columns)
+    return pd.read_csv(filepath, usecols=columns)
+
+
+def table_columns(filepath: str) -> List[str]:
+    """Column names of a stored table without reading its rows"""
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext in PARQUET_EXTENSIONS + ARROW_EXTENSIONS:
+        _require_pyarrow()
+        import pyarrow.ipc
+        import pyarrow.parquet as pq
+        schema = pq.read_schema(filepath) if ext in PARQUET_EXTENSIONS else pyarrow.ipc.open_file(filepath).schema
+        return [name for name in schema.names if not name.startswith('__index_level_')]
+    return pd.read_csv(filepath, nrows=0).columns.tolist()
+
+
+def apply_dtype_plan(df: pd.DataFrame, plan: Dict[str, str]) -> pd.DataFrame:
+    """Cast columns to their planned dtype, one column at a time; columns that don't fit keep theirs"""
+    for col, dtype in plan.items():
+        if col in df.columns and str(df[col].dtype) != dtype:
+            try:
+                df[col] = df[col].astype(dtype)
+            except (TypeError, ValueError) as e:
+                print(f"[Data] {col} kept as {df[col].dtype}: not castable to {dtype} ({e})")
+    return df
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """Per-column dtype and deep memory (MB) of two versions of a frame, with a total row"""
+    report = pd.DataFrame({
+        'dtype_before': before.dtypes.astype(str),
+        'mb_before': before.memory_usage(deep=True, index=False) / 1e6,
+        'dtype_after': after.dtypes.astype(str),
+        'mb_after': after.memory_usage(deep=True, index=False) / 1e6,
+    })
+    report.loc['total'] = ['', report['mb_before'].sum(), '', report['mb_after'].sum()]
+    return report
+
+
+def load_raw_data(filepath: str, columns: Optional[List[str]] = None, compact: bool = True) -> pd.DataFrame:
+    """Load raw YouTube data matching your notebook structure.
+
+    compact applies `schema.dtype_plan` while reading: categorical ids,
+    Arrow strings and nullable integer counts instead of object strings
+    and float64.
+    """
+    arrow_strings = _has_pyarrow()
+    plan = dtype_plan(arrow_strings) if compact else {}
+    if plan and arrow_strings and not is_columnar(filepath):
+        # The parser writes strings straight into Arrow buffers, never Python
+        # objects; categoricals are encoded from those (faster than the
+        # parser's own categorical path). Counts are parsed as floats
+        # ("12.0" is a valid count) and narrowed below.
+        string_types = {col: 'string[pyarrow]' for col, dtype in plan.items()
+                        if dtype in ('category', 'string[pyarrow]') and (columns is None or col in columns)}
+        df = pd.read_csv(filepath, usecols=columns, dtype=string_types)
+    else:
+        df = load_table(filepath, columns=columns)
+    df = apply_dtype_plan(df, plan)
 
-def load_raw_data(filepath: str) -> pd.DataFrame:
-    """Load raw YouTube data matching your notebook structure"""
-    df = pd.read_csv(filepath)
-    
     # Verify required columns exist
-    required_columns = [
-        'video_id', 'published_at', 'category_id', 'country', 'tags', 
-        'definition', 'channel_id', 'channel_title', 'logged_at_initial',
-        'view_count_initial', 'like_count_initial', 'comment_count_initial',
-        'c_view_count_initial', 'c_subscriber_count_initial', 'logged_at_final',
-        'view_count_final', 'like_count_final', 'comment_count_final',
-        'c_view_count_final', 'c_subscriber_count_final'
-    ]
-    
+    required_columns = REQUIRED_COLUMNS if columns is None else columns
+
     missing_cols = [col for col in required_columns if col not in df.columns]
     if missing_cols:
         raise ValueError(f"Missing required columns: {missing_cols}")
-    
+
     return df
 
+@traced('data.save')
 def save_processed_data(df: pd.DataFrame, filepath: str) -> None:
-    """Save processed data to CSV"""
-    df.to_csv(filepath, index=False)
+    """Save processed data to CSV, or to Parquet/Arrow for a columnar extension"""
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext in PARQUET_EXTENSIONS:
+        _require_pyarrow()
+        to_columnar_dtypes(df).to_parquet(filepath, index=False)
+    elif ext in ARROW_EXTENSIONS:
+        _require_pyarrow()
+        to_columnar_dtypes(df).reset_index(drop=True).to_feather(filepath)
+    else:
+        df.to_csv(filepath, index=False)
     print(f"Saved processed data to {filepath}")
+
+
+def metadata_path(model_path: str) -> str:
+    """JSON metadata file saved alongside a model"""
+    return f"{os.path.splitext(model_path)[0]}_metadata.json"
+
+
+def iter_table(filepath: str, chunksize: int = 100_000, columns: Optional[List[str]] = None):
+    """Yield a stored table (CSV or columnar) in frames of at most `chunksize` rows"""
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext in PARQUET_EXTENSIONS:
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(filepath).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    elif ext in ARROW_EXTENSIONS:
+        _require_pyarrow()
+        import pyarrow.ipc
+        reader = pyarrow.ipc.open_file(filepath)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if columns is not None:
+                batch = batch.select(columns)
+            for start in range(0, batch.num_rows, chunksize):
+                yield batch.slice(start, chunksize).to_pandas()
+    else:
+        yield from pd.read_csv(filepath, chunksize=chunksize, usecols=columns)
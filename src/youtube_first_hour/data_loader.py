@@ -1,12 +1,213 @@
-import requests
+# src/youtube_first_hour/data_loader.py
+
+import argparse
+import csv
+import json
+import os
+from dataclasses import fields
+from typing import Dict, Iterator, List, Optional
+
 import pandas as pd
+import requests
+
+from .data import _require_pyarrow, iter_table
+from .schema import VideoData
+
+EXPORT_URL = "http://34.30.192.111:3000/export-csv"
+CHUNK_BYTES = 1024 * 1024
+
+
+def _meta_path(path: str) -> str:
+    return f"{path}.meta.json"
+
+
+def _read_meta(path: str) -> Dict[str, str]:
+    """Validators (ETag / Last-Modified) the server sent for a stored file"""
+    try:
+        with open(_meta_path(path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_meta(path: str, response: requests.Response) -> None:
+    meta = {key: response.headers[header] for key, header in
+            (('etag', 'ETag'), ('last_modified', 'Last-Modified')) if header in response.headers}
+    with open(_meta_path(path), 'w') as f:
+        json.dump(meta, f)
+
+
+def _conditional_headers(path: str) -> Dict[str, str]:
+    """If-None-Match / If-Modified-Since for a file downloaded before, so an unchanged export is a 304"""
+    if not os.path.exists(path):
+        return {}
+    meta = _read_meta(path)
+    headers = {}
+    if 'etag' in meta:
+        headers['If-None-Match'] = meta['etag']
+    if 'last_modified' in meta:
+        headers['If-Modified-Since'] = meta['last_modified']
+    return headers
+
+
+def _discard(part: str) -> None:
+    for name in (part, _meta_path(part)):
+        if os.path.exists(name):
+            os.remove(name)
+
+
+def _range_start(response: requests.Response) -> Optional[int]:
+    """First byte of a 206 body, from 'Content-Range: bytes START-END/TOTAL'"""
+    unit, _, spec = response.headers.get('Content-Range', '').partition(' ')
+    start = spec.partition('-')[0]
+    return int(start) if unit == 'bytes' and start.isdigit() else None
+
+
+def _commit(part: str, path: str) -> None:
+    os.replace(part, path)
+    if os.path.exists(_meta_path(part)):
+        os.replace(_meta_path(part), _meta_path(path))
+
+
+def download_export(url: str = EXPORT_URL, path: str = "latest_data.csv",
+                    session: Optional[requests.Session] = None, chunk_size: int = CHUNK_BYTES,
+                    timeout: float = 60.0) -> bool:
+    """
+    Stream the export to `path` chunk by chunk; returns False if the
+    server reports it unchanged since the last download.
+
+    The body goes to `path`.part first. An interrupted download resumes
+    from the end of that file with a Range request; If-Range makes the
+    server send the whole export instead if it changed in between. Without
+    a stored validator (no ETag or Last-Modified) a change could not be
+    detected, so the download starts over, as it does when a 206 does not
+    start at the resumed offset. Gzip
+    transfer encoding is decoded on the fly; resumed requests ask for the
+    identity encoding so byte offsets refer to the CSV itself.
+    """
+    session = session or requests.Session()
+    part = f"{path}.part"
+    offset = os.path.getsize(part) if os.path.exists(part) else 0
+    validator = _read_meta(part) if offset else {}
+    if offset and not validator:
+        # Bytes of a changed export would be appended to the old prefix unnoticed
+        print(f"[Data] No ETag or Last-Modified for {part}, downloading from the start")
+        _discard(part)
+        offset = 0
+    if offset:
+        headers = {'Range': f'bytes={offset}-', 'Accept-Encoding': 'identity',
+                   'If-Range': validator.get('etag', validator.get('last_modified'))}
+    else:
+        headers = _conditional_headers(path)
+
+    with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 304:
+            print(f"[Data] {url} unchanged since the last download, keeping {path}")
+            return False
+        if response.status_code == 416:
+            # The partial file is no prefix of the current export: start over
+            _discard(part)
+            return download_export(url, path, session, chunk_size, timeout)
+        response.raise_for_status()
+        if response.status_code == 206 and _range_start(response) != offset:
+            if not offset:
+                raise requests.HTTPError(f"Partial response to a full request for {url}", response=response)
+            print(f"[Data] Range response does not start at byte {offset}, downloading from the start")
+            _discard(part)
+            return download_export(url, path, session, chunk_size, timeout)
+        if response.status_code != 206:
+            offset = 0
+            _write_meta(part, response)
+        with open(part, 'ab' if offset else 'wb') as f:
+            for chunk in response.iter_content(chunk_size):
+                f.write(chunk)
+
+    _commit(part, path)
+    resumed = f" (resumed at byte {offset})" if offset else ""
+    print(f"[Data] Downloaded {url} to {path}{resumed}")
+    return True
+
+
+def stream_export(url: str = EXPORT_URL, chunksize: int = 100_000, columns: Optional[List[str]] = None,
+                  session: Optional[requests.Session] = None, timeout: float = 60.0) -> Iterator[pd.DataFrame]:
+    """
+    Parse the export straight from the response body in frames of `chunksize` rows, without a file.
+    Malformed rows are skipped, as with features.READ_CSV_KWARGS (here with the faster C parser).
+    """
+    session = session or requests.Session()
+    with session.get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        yield from pd.read_csv(response.raw, chunksize=chunksize, usecols=columns,
+                               quoting=csv.QUOTE_ALL, on_bad_lines='skip')
+
+
+def export_arrow_schema():
+    """Arrow types of the raw export: VideoData strings and float counts"""
+    import pyarrow as pa
+    return pa.schema([(field.name, pa.string() if field.type is str else pa.float64())
+                      for field in fields(VideoData)])
+
+
+def export_to_parquet(url: str = EXPORT_URL, path: str = "latest_data.parquet",
+                      session: Optional[requests.Session] = None, block_size: int = 16 * CHUNK_BYTES,
+                      timeout: float = 60.0) -> bool:
+    """
+    Stream the export through Arrow's incremental CSV reader into a Parquet
+    file, one record batch (about block_size bytes of CSV) at a time, so
+    neither the CSV nor the whole table is ever held in memory or on disk.
+    Rows with the wrong number of fields are skipped.
+    Returns False if the export is unchanged since the last conversion.
+    """
+    _require_pyarrow()
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+
+    session = session or requests.Session()
+    part = f"{path}.part"
+    schema = export_arrow_schema()
+    with session.get(url, headers=_conditional_headers(path), stream=True, timeout=timeout) as response:
+        if response.status_code == 304:
+            print(f"[Data] {url} unchanged since the last download, keeping {path}")
+            return False
+        response.raise_for_status()
+        response.raw.decode_content = True
+        skipped = []
+
+        def skip(row) -> str:
+            skipped.append(row.number)
+            return 'skip'
+
+        reader = pacsv.open_csv(response.raw,
+                                read_options=pacsv.ReadOptions(block_size=block_size),
+                                parse_options=pacsv.ParseOptions(invalid_row_handler=skip),
+                                convert_options=pacsv.ConvertOptions(column_types=schema))
+        rows = 0
+        with pq.ParquetWriter(part, reader.schema) as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+                rows += batch.num_rows
+        _write_meta(part, response)
+
+    _commit(part, path)
+    dropped = f" ({len(skipped)} malformed rows skipped)" if skipped else ""
+    print(f"[Data] Streamed {rows} rows from {url} to {path}{dropped}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download the latest /export-csv data.")
+    parser.add_argument("--url", default=EXPORT_URL)
+    parser.add_argument("--output", "-o", default="latest_data.csv",
+                        help="CSV path, or .parquet to convert while streaming")
+    args = parser.parse_args()
 
-download_url = "http://34.30.192.111:3000/export-csv"
+    if args.output.endswith(('.parquet', '.pq')):
+        export_to_parquet(args.url, args.output)
+    else:
+        download_export(args.url, args.output)
+    print(next(iter_table(args.output, chunksize=5)))
 
-response = requests.get(download_url)
-filename = 'latest_data.csv'
-with open(filename, 'wb') as f:
-    f.write(response.content)
 
-df = pd.read_csv(filename)
-print(df.head())
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -2,29 +2,231 @@ import pandas as pd
 import numpy as np
 import csv
 from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from .channel_history import channel_history_features
+from .data import is_columnar, load_table, save_processed_data
+from .instrumentation import span, traced
+from .time_features import as_feature, time_components
+
+# Reader settings shared by the in-memory and streaming entry points
+READ_CSV_KWARGS = dict(engine="python", quoting=csv.QUOTE_ALL, on_bad_lines='skip')
+
+
+class GroupStatsAccumulator:
+    """Running sums and counts behind the category and channel averages.
+
+    Fed chunk by chunk, it yields the same means as one groupby over the
+    full frame, so the group features never need every row in memory.
+    """
+
+    TARGETS = ['view_count_difference', 'like_count_difference']
+
+    def __init__(self):
+        self.category_sums: Optional[pd.DataFrame] = None
+        self.category_counts: Optional[pd.DataFrame] = None
+        self.channel_sums: Optional[pd.DataFrame] = None
+        self.channel_counts: Optional[pd.DataFrame] = None
+        self.channel_first_subs: Optional[pd.Series] = None
+        self.rows = 0
+
+    @staticmethod
+    def _add(total: Optional[pd.DataFrame], part: pd.DataFrame) -> pd.DataFrame:
+        if total is None:
+            return part
+        return total.add(part, fill_value=0)
+
+    def update(self, df: pd.DataFrame) -> None:
+        """Add a chunk that already carries the difference columns"""
+        # observed=True: categorical keys (see schema.dtype_plan) only yield groups that occur
+        by_category = df.groupby('category_id', observed=True)[self.TARGETS]
+        self.category_sums = self._add(self.category_sums, by_category.sum())
+        self.category_counts = self._add(self.category_counts, by_category.count())
+
+        by_channel = df.groupby('channel_id', observed=True)
+        self.channel_sums = self._add(self.channel_sums, by_channel[self.TARGETS].sum())
+        self.channel_counts = self._add(self.channel_counts, by_channel[self.TARGETS].count())
+        first_subs = by_channel['c_subscriber_count_initial'].first()
+        if self.channel_first_subs is None:
+            self.channel_first_subs = first_subs
+        else:
+            # Earlier chunks win, matching groupby's 'first' over the whole file
+            self.channel_first_subs = self.channel_first_subs.combine_first(first_subs)
+
+        self.rows += len(df)
+
+    def merge(self, other: "GroupStatsAccumulator") -> "GroupStatsAccumulator":
+        """Fold in the totals of another accumulator (which comes later in row order)"""
+        if other.category_sums is None:
+            return self
+        self.category_sums = self._add(self.category_sums, other.category_sums)
+        self.category_counts = self._add(self.category_counts, other.category_counts)
+        self.channel_sums = self._add(self.channel_sums, other.channel_sums)
+        self.channel_counts = self._add(self.channel_counts, other.channel_counts)
+        if self.channel_first_subs is None:
+            self.channel_first_subs = other.channel_first_subs
+        else:
+            self.channel_first_subs = self.channel_first_subs.combine_first(other.channel_first_subs)
+        self.rows += other.rows
+        return self
+
+    def category_means(self) -> pd.DataFrame:
+        """Per-category mean of each difference column"""
+        return self.category_sums / self.category_counts
+
+    def channel_performance(self) -> pd.DataFrame:
+        """Per-channel frame shaped like the in-memory channel aggregation"""
+        performance = self.channel_sums / self.channel_counts
+        performance['c_subscriber_count_initial'] = self.channel_first_subs.reindex(performance.index)
+        return performance
+
+
+class GroupLookupTable:
+    """Sorted key array with aligned value arrays, looked up by binary search.
+
+    Keys that were never seen get the table's default; missing (NaN) keys
+    give NaN, the same as mapping a groupby result onto the rows.
+    """
+
+    def __init__(self, keys: np.ndarray, values: Dict[str, np.ndarray], defaults: Dict[str, float]):
+        self.keys = keys
+        self.values = values
+        self.defaults = defaults
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, defaults: Dict[str, float]) -> "GroupLookupTable":
+        """Build a table from a frame indexed by group key"""
+        frame = frame[frame.index.notna()]
+        if frame.index.dtype.kind in 'iuf':
+            keys = frame.index.to_numpy(dtype=np.float64)
+        else:
+            keys = np.asarray(frame.index.astype(str), dtype=str)
+        order = np.argsort(keys, kind='stable')
+        values = {col: frame[col].to_numpy(dtype=np.float64)[order] for col in frame.columns}
+        return cls(keys[order], values, defaults)
+
+    def lookup(self, keys: pd.Series, column: str) -> np.ndarray:
+        """Vectorised map of `keys` to the value column"""
+        missing = keys.isna().to_numpy()
+        if self.keys.dtype.kind == 'f':
+            query = pd.to_numeric(keys, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            query = np.asarray(keys.astype(str), dtype=str)
+        return self.lookup_array(query, missing, column)
+
+    def lookup_array(self, query: np.ndarray, missing: np.ndarray, column: str) -> np.ndarray:
+        """`lookup` on keys already converted to the table's key dtype (no pandas)"""
+        out = np.full(len(query), self.defaults.get(column, np.nan), dtype=np.float64)
+        if len(self.keys):
+            pos = np.minimum(np.searchsorted(self.keys, query), len(self.keys) - 1)
+            found = self.keys[pos] == query
+            out[found] = self.values[column][pos[found]]
+        out[missing] = np.nan
+        return out
+
+    def to_arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        arrays = {f'{prefix}__keys': self.keys}
+        for col, values in self.values.items():
+            arrays[f'{prefix}__value__{col}'] = values
+        for col, default in self.defaults.items():
+            arrays[f'{prefix}__default__{col}'] = np.asarray(default, dtype=np.float64)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix: str) -> "GroupLookupTable":
+        values, defaults = {}, {}
+        for name in arrays.keys():
+            if name.startswith(f'{prefix}__value__'):
+                values[name[len(f'{prefix}__value__'):]] = arrays[name]
+            elif name.startswith(f'{prefix}__default__'):
+                defaults[name[len(f'{prefix}__default__'):]] = float(arrays[name])
+        return cls(arrays[f'{prefix}__keys'], values, defaults)
+
 
 class YouTubeFeatureEngineer:
     """Feature engineering pipeline matching your notebook exactly"""
     
+    # Channel average used for channels that were not in the fitted data
+    UNSEEN_CHANNEL_VALUE = 0.0
+    # Stage cache (see stage_cache.StageCache): bump the version when the output changes
+    CACHE_VERSION = 1
+    CACHED_STATE = ['category_view_stats', 'category_like_stats', 'channel_stats',
+                    'category_table', 'channel_table']
+    
     def __init__(self):
         self.category_view_stats = {}
         self.category_like_stats = {}
         self.channel_stats = {}
+        self.category_table: Optional[GroupLookupTable] = None
+        self.channel_table: Optional[GroupLookupTable] = None
+        
+    def process_all_features(self, df: pd.DataFrame, copy: bool = True,
+                             channel_history: bool = False) -> pd.DataFrame:
+        """Main pipeline - processes all features as in your notebook.
+        copy=False adds the features to `df` itself instead of a copy.
+        channel_history adds point-in-time channel features over the rows of
+        `df` (see `_add_channel_history`)."""
+        df = self.fit(df).transform(df, copy=copy)
+        if channel_history:
+            df = self._add_channel_history(df)
+        return df
+    
+    @traced('features.fit')
+    def fit(self, df: pd.DataFrame) -> "YouTubeFeatureEngineer":
+        """Learn the category and channel lookup tables from training rows.
+
+        Fit on the training split only and `transform` the validation or
+        scoring rows, so their own targets never feed their features.
+        """
+        stats = GroupStatsAccumulator()
+        stats.update(self._create_target_variables(
+            df[['category_id', 'channel_id', 'c_subscriber_count_initial',
+                'view_count_initial', 'view_count_final',
+                'like_count_initial', 'like_count_final']].copy()
+        ))
+        self.set_group_statistics(stats)
+        return self
+    
+    def set_group_statistics(self, stats: GroupStatsAccumulator) -> None:
+        """Build the lookup tables from already accumulated group statistics"""
+        category_means = stats.category_means()
+        channel_performance = stats.channel_performance()
         
-    def process_all_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Main pipeline - processes all features as in your notebook"""
-        df = df.copy()
+        # Unseen categories fall back to the mean over every fitted row (NaN without any)
+        counts = stats.category_counts.sum()
+        totals = stats.category_sums.sum().where(counts > 0) / counts.where(counts > 0)
+        self.category_table = GroupLookupTable.from_frame(category_means, totals.to_dict())
+        self.channel_table = GroupLookupTable.from_frame(
+            channel_performance, {'view_count_difference': self.UNSEEN_CHANNEL_VALUE}
+        )
+        
+        self.category_view_stats = category_means['view_count_difference'].to_dict()
+        self.category_like_stats = category_means['like_count_difference'].to_dict()
+        self.channel_stats = channel_performance.to_dict('index')
+    
+    @traced('features.transform')
+    def transform(self, df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
+        """Add every feature using the fitted lookup tables (no groupby).
+
+        Rows without final counts (e.g. videos being scored) skip the
+        target differences but still get every input feature.
+        """
+        if self.category_table is None or self.channel_table is None:
+            raise ValueError("`transform` called before `fit` or `load`.")
+        if copy:
+            df = df.copy()
         
         # Step 1: Create target variables (differences)
-        df = self._create_target_variables(df)
+        if {'view_count_final', 'like_count_final'}.issubset(df.columns):
+            df = self._create_target_variables(df)
         
         # Step 2: Extract time features from published_at
         df = self._extract_time_features(df)
         
-        # Step 3: Calculate category-level statistics
+        # Step 3: Look up category-level statistics
         df = self._add_category_statistics(df)
         
-        # Step 4: Calculate channel-level features
+        # Step 4: Look up channel-level features
         df = self._add_channel_features(df)
         
         # Step 5: Add relative performance features
@@ -32,39 +234,56 @@ class YouTubeFeatureEngineer:
         
         return df
     
+    def save(self, filepath: str) -> None:
+        """Save the fitted lookup tables as a compressed .npz archive"""
+        if self.category_table is None or self.channel_table is None:
+            raise ValueError("Nothing to save: the feature engineer is not fitted.")
+        np.savez_compressed(filepath, **self.to_arrays())
+    
+    @classmethod
+    def load(cls, filepath: str) -> "YouTubeFeatureEngineer":
+        """Load lookup tables written by `save`"""
+        with np.load(filepath, allow_pickle=False) as arrays:
+            return cls.from_arrays(arrays)
+    
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """The fitted lookup tables as named flat arrays"""
+        return {**self.category_table.to_arrays('category'), **self.channel_table.to_arrays('channel')}
+    
+    @classmethod
+    def from_arrays(cls, arrays) -> "YouTubeFeatureEngineer":
+        """Rebuild from `to_arrays` output; the arrays are used as-is (e.g. memory-mapped)"""
+        engineer = cls()
+        engineer.category_table = GroupLookupTable.from_arrays(arrays, 'category')
+        engineer.channel_table = GroupLookupTable.from_arrays(arrays, 'channel')
+        return engineer
+    
     def _create_target_variables(self, df: pd.DataFrame) -> pd.DataFrame:
         """Create view_count_difference and like_count_difference"""
         df['view_count_difference'] = df['view_count_final'] - df['view_count_initial']
         df['like_count_difference'] = df['like_count_final'] - df['like_count_initial']
         return df
     
+    @traced('features.time_features')
     def _extract_time_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Extract time features from published_at timestamp"""
-        # Convert to datetime
-        df['published_at'] = pd.to_datetime(df['published_at'])
+        """Extract integer time features from published_at timestamp"""
+        # Parse once; published_at itself is left as it was read
+        parts = time_components(df['published_at'])
+        valid = parts['valid']
         
-        # Extract components
-        df['published_year'] = df['published_at'].dt.year
-        df['published_month'] = df['published_at'].dt.month
-        df['published_day_of_week'] = df['published_at'].dt.day_name()
-        df['published_time'] = df['published_at'].dt.strftime('%H:%M:%S')
+        # Extract components (day of week: Monday=0)
+        df['published_year'] = as_feature(parts['year'], valid)
+        df['published_month'] = as_feature(parts['month'], valid)
+        df['published_day_of_week'] = as_feature(parts['weekday'], valid)
+        df['published_hour'] = as_feature(parts['hour'], valid)
+        df['published_minute'] = as_feature(parts['minute'], valid)
         
         return df
     
     def _add_category_statistics(self, df: pd.DataFrame) -> pd.DataFrame:
         """Add category-level average statistics"""
-        # Calculate category averages for view and like differences
-        category_view_avg = df.groupby('category_id')['view_count_difference'].mean()
-        category_like_avg = df.groupby('category_id')['like_count_difference'].mean()
-        
-        # Map back to dataframe
-        df['avg_view_diff_per_category'] = df['category_id'].map(category_view_avg)
-        df['avg_likes_diff_per_category'] = df['category_id'].map(category_like_avg)
-        
-        # Store for potential future use
-        self.category_view_stats = category_view_avg.to_dict()
-        self.category_like_stats = category_like_avg.to_dict()
-        
+        df['avg_view_diff_per_category'] = self.category_table.lookup(df['category_id'], 'view_count_difference')
+        df['avg_likes_diff_per_category'] = self.category_table.lookup(df['category_id'], 'like_count_difference')
         return df
     
     def _add_channel_features(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -74,15 +293,9 @@ class YouTubeFeatureEngineer:
         df['log_channel_subs'] = np.log1p(df['c_subscriber_count_initial'])
         df['channel_authority'] = df['log_channel_subs']
         
-        # Channel average performance metrics
-        channel_performance = df.groupby('channel_id').agg({
-            'view_count_difference': 'mean',
-            'like_count_difference': 'mean',
-            'c_subscriber_count_initial': 'first'
-        })
-        
-        # Map channel performance back
-        df['channel_avg_views'] = df['channel_id'].map(channel_performance['view_count_difference']).fillna(0)
+        # Look up channel performance (channels without a mean get 0, as before)
+        channel_avg_views = self.channel_table.lookup(df['channel_id'], 'view_count_difference')
+        df['channel_avg_views'] = np.where(np.isnan(channel_avg_views), 0.0, channel_avg_views)
         
         # Channel growth potential (subscriber count * average performance)
         df['channel_growth_potential'] = (
@@ -94,9 +307,20 @@ class YouTubeFeatureEngineer:
             df['channel_avg_views'] * df['log_channel_subs'] / 100
         )
         
-        # Store channel stats
-        self.channel_stats = channel_performance.to_dict('index')
-        
+        return df
+    
+    @traced('features.channel_history')
+    def _add_channel_history(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Add windowed channel features from each video's earlier videos only.
+
+        Unlike channel_avg_views (an all-time mean that includes later
+        videos), these see only the channel's videos published before the
+        row: mean lift over the last 5/20 videos and 7 days (of the videos
+        whose final snapshot, and so lift, was known by then), and the
+        number of videos in the last 24 hours.
+        """
+        for name, values in channel_history_features(df).items():
+            df[name] = values
         return df
     
     def _add_relative_features(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -125,7 +349,8 @@ class YouTubeFeatureEngineer:
             'published_year',
             'published_month', 
             'published_day_of_week',
-            'published_time',
+            'published_hour',
+            'published_minute',
             
             # Category statistics
             'avg_view_diff_per_category',
@@ -148,9 +373,10 @@ def process_youtube_data(input_file: str, output_file: str = None) -> pd.DataFra
     
     # Load data
     print("Loading raw data...")
-    df = pd.read_csv(input_file, engine="python", 
-                     quoting=csv.QUOTE_ALL,
-                     on_bad_lines='skip')
+    if is_columnar(input_file):
+        df = load_table(input_file)
+    else:
+        df = pd.read_csv(input_file, **READ_CSV_KWARGS)
     print(f"Loaded {len(df)} rows")
     
     # Initialize feature engineer
@@ -162,10 +388,74 @@ def process_youtube_data(input_file: str, output_file: str = None) -> pd.DataFra
     
     # Save if output file specified
     if output_file:
-        df_processed.to_csv(output_file, index=False)
-        print(f"Saved processed data to {output_file}")
+        save_processed_data(df_processed, output_file)
     
     print("Feature engineering completed!")
     print(f"Added {len(feature_engineer.get_feature_columns())} new feature columns")
     
     return df_processed
+
+
+def _widen_dtypes(seen: Dict[str, np.dtype], chunk: pd.DataFrame) -> None:
+    """Track the dtype a whole-file read would give each column"""
+    for col, dtype in chunk.dtypes.items():
+        prev = seen.get(col)
+        if prev is None or prev == dtype:
+            seen[col] = dtype
+        elif prev.kind in 'iuf' and dtype.kind in 'iuf':
+            seen[col] = np.result_type(prev, dtype)
+        else:
+            seen[col] = np.dtype(object)
+
+
+def accumulate_group_statistics(
+    input_file: str, chunksize: int = 100_000
+) -> Tuple[GroupStatsAccumulator, Dict[str, np.dtype]]:
+    """One chunked pass over a raw CSV: group sums/counts and whole-file dtypes"""
+    feature_engineer = YouTubeFeatureEngineer()
+    stats = GroupStatsAccumulator()
+    dtypes: Dict[str, np.dtype] = {}
+    for chunk in pd.read_csv(input_file, chunksize=chunksize, **READ_CSV_KWARGS):
+        _widen_dtypes(dtypes, chunk)
+        stats.update(feature_engineer._create_target_variables(chunk))
+    return stats, dtypes
+
+
+def stream_youtube_data(input_file: str, output_file: str, chunksize: int = 100_000) -> int:
+    """Process YouTube data in bounded chunks, two passes over the input file.
+
+    Pass 1 accumulates the per-category and per-channel sums and counts
+    (and the column dtypes of the whole file). Pass 2 engineers each chunk
+    with those statistics and appends it to `output_file`. Peak memory
+    depends on `chunksize`, not on the row count. When the counts are
+    integer-valued, as API counts are, the group sums are exact and the
+    output file is byte-identical to the one `process_youtube_data` writes;
+    fractional counts can differ in the last bits of the group means. Both
+    files are CSV: columnar outputs need the in-memory path.
+    """
+    if is_columnar(input_file) or is_columnar(output_file):
+        raise ValueError("Streaming mode reads and writes CSV only")
+
+    print("Pass 1: accumulating group statistics...")
+    with span('features.stream_statistics') as s:
+        stats, dtypes = accumulate_group_statistics(input_file, chunksize)
+        s.set(rows_in=stats.rows)
+    print(f"Scanned {stats.rows} rows")
+
+    feature_engineer = YouTubeFeatureEngineer()
+    feature_engineer.set_group_statistics(stats)
+
+    print("Pass 2: writing engineered chunks...")
+    rows_written = 0
+    reader = pd.read_csv(input_file, chunksize=chunksize, dtype=dtypes, **READ_CSV_KWARGS)
+    with span('features.stream_transform') as s:
+        for chunk in reader:
+            chunk = feature_engineer.transform(chunk, copy=False)
+            chunk.to_csv(output_file, mode='w' if rows_written == 0 else 'a',
+                         header=rows_written == 0, index=False)
+            rows_written += len(chunk)
+        s.set(rows_out=rows_written)
+    print(f"Saved processed data to {output_file}")
+
+    print("Feature engineering completed!")
+    return rows_written
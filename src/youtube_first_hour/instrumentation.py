@@ -0,0 +1,246 @@
+# src/youtube_first_hour/instrumentation.py
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+MLFLOW_TRACKING_URI = "mlruns"
+
+
+def _peak_rss_mb() -> float:
+    """Process high-water mark in MB; NaN where the resource module is missing (Windows)"""
+    try:
+        import resource
+    except ImportError:
+        return float('nan')
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def _rows(value: Any) -> Optional[int]:
+    """Row count of a frame, series or array; None for anything else"""
+    shape = getattr(value, 'shape', None)
+    return int(shape[0]) if shape else None
+
+
+def _require_mlflow() -> None:
+    try:
+        import mlflow  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Logging traces to MLflow needs mlflow: pip install mlflow") from e
+
+
+class _NullSpan:
+    """What `span` yields while tracing is off: accepts attributes, records nothing"""
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """One timed region: wall and CPU seconds, rows in/out and the growth of peak RSS"""
+
+    def __init__(self, name: str, parent: Optional[int], attrs: Dict[str, Any]):
+        self.name = name
+        self.parent = parent
+        self.attrs = attrs
+        self.thread = threading.get_ident()
+        self.start_ns = time.perf_counter_ns()
+        self.cpu_start = time.process_time()
+        self.peak_start = _peak_rss_mb()
+        self.record: Dict[str, Any] = {}
+
+    def set(self, **attrs: Any) -> None:
+        """Attach attributes, e.g. rows_out, once they are known"""
+        self.attrs.update(attrs)
+
+    def finish(self, span_id: int, origin_ns: int) -> Dict[str, Any]:
+        end_ns = time.perf_counter_ns()
+        self.record = {
+            'id': span_id,
+            'parent': self.parent,
+            'name': self.name,
+            'thread': self.thread,
+            'start_us': (self.start_ns - origin_ns) / 1000,
+            'wall_seconds': (end_ns - self.start_ns) / 1e9,
+            # Process-wide: includes the threads of numpy, xgboost and the like
+            'cpu_seconds': time.process_time() - self.cpu_start,
+            # Only growth of the process high-water mark shows; memory freed
+            # and reused inside the span is invisible to it
+            'peak_rss_delta_mb': _peak_rss_mb() - self.peak_start,
+            **self.attrs,
+        }
+        return self.record
+
+
+class Tracer:
+    """
+    Collects the spans of one run. Spans nest per thread; each record keeps
+    its parent's id. The trace is written as JSON (`save`), optionally as a
+    Chrome trace for chrome://tracing or Perfetto (`save_chrome_trace`),
+    and its per-stage totals can go to an MLflow run (`log_to_mlflow`).
+    """
+
+    def __init__(self):
+        self.spans: List[Dict[str, Any]] = []
+        self.origin_ns = time.perf_counter_ns()
+        self.started = time.strftime('%Y-%m-%dT%H:%M:%S')
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[Span]:
+        stack = self._local.__dict__.setdefault('stack', [])
+        current = Span(name, stack[-1][0] if stack else None, attrs)
+        with self._lock:
+            span_id = len(self.spans)
+            self.spans.append({})
+        stack.append((span_id, current))
+        try:
+            yield current
+        finally:
+            stack.pop()
+            self.spans[span_id] = current.finish(span_id, self.origin_ns)
+
+    def totals(self) -> Dict[str, Dict[str, float]]:
+        """Wall and CPU seconds and call count per span name"""
+        totals: Dict[str, Dict[str, float]] = {}
+        for record in self.spans:
+            total = totals.setdefault(record['name'], {'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0})
+            total['calls'] += 1
+            total['wall_seconds'] += record['wall_seconds']
+            total['cpu_seconds'] += record['cpu_seconds']
+        return totals
+
+    def save(self, path: str) -> None:
+        with open(path, 'w') as f:
+            json.dump({'started': self.started, 'pid': os.getpid(), 'spans': self.spans,
+                       'totals': self.totals()}, f, indent=2, default=str)
+        print(f"[Trace] {len(self.spans)} spans saved to {path}")
+
+    def save_chrome_trace(self, path: str) -> None:
+        """Complete ('X') events in the Trace Event Format, microsecond timestamps"""
+        pid = os.getpid()
+        events = [{
+            'name': record['name'], 'ph': 'X', 'pid': pid, 'tid': record['thread'],
+            'ts': record['start_us'], 'dur': record['wall_seconds'] * 1e6,
+            'args': {key: value for key, value in record.items()
+                     if key not in ('name', 'thread', 'start_us', 'wall_seconds')},
+        } for record in self.spans]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, default=str)
+        print(f"[Trace] Chrome trace saved to {path}")
+
+    def log_to_mlflow(self, run_name: Optional[str] = None, tracking_uri: str = MLFLOW_TRACKING_URI,
+                      trace_path: Optional[str] = None) -> None:
+        """Per-stage totals as metrics of a new run in the local MLflow store; one step per call of a stage"""
+        _require_mlflow()
+        import mlflow
+        mlflow.set_tracking_uri(tracking_uri)
+        with mlflow.start_run(run_name=run_name):
+            steps: Dict[str, int] = {}
+            for record in self.spans:
+                step = steps[record['name']] = steps.get(record['name'], -1) + 1
+                metrics = {f"{record['name']}.wall_seconds": record['wall_seconds'],
+                           f"{record['name']}.cpu_seconds": record['cpu_seconds']}
+                mlflow.log_metrics(metrics, step=step)
+            for name, total in self.totals().items():
+                mlflow.log_metric(f"{name}.total_wall_seconds", total['wall_seconds'])
+            if trace_path:
+                mlflow.set_tag('trace_path', os.path.abspath(trace_path))
+        print(f"[Trace] Stage timings logged to MLflow at {tracking_uri}")
+
+
+_TRACER: Optional[Tracer] = None
+
+
+def enable_tracing() -> Tracer:
+    """Start collecting spans in a fresh Tracer"""
+    global _TRACER
+    _TRACER = Tracer()
+    return _TRACER
+
+
+def disable_tracing() -> Optional[Tracer]:
+    """Stop collecting; returns the tracer that was active"""
+    global _TRACER
+    tracer, _TRACER = _TRACER, None
+    return tracer
+
+
+def span(name: str, **attrs: Any):
+    """
+    Context manager timing a pipeline stage, e.g.
+    `with span('features.fit', rows_in=len(df)) as s: ...; s.set(rows_out=n)`.
+    While tracing is off it returns a shared no-op object: one global
+    lookup per call, nothing measured.
+    """
+    if _TRACER is None:
+        return _NULL_CONTEXT
+    return _TRACER.span(name, **attrs)
+
+
+class _NullContext:
+    def __enter__(self) -> _NullSpan:
+        return _NULL_SPAN
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NULL_CONTEXT = _NullContext()
+
+
+def traced(name: str) -> Callable:
+    """Decorator form of `span`; rows_in/rows_out come from the first frame argument and the result"""
+    def decorate(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _TRACER is None:
+                return fn(*args, **kwargs)
+            rows_in = next((n for n in map(_rows, args) if n is not None), None)
+            with _TRACER.span(name, rows_in=rows_in) as s:
+                result = fn(*args, **kwargs)
+                s.set(rows_out=_rows(result))
+            return result
+        return wrapper
+    return decorate
+
+
+def add_trace_arguments(parser) -> None:
+    """--trace / --chrome-trace / --mlflow options shared by the pipeline CLIs"""
+    parser.add_argument("--trace", help="Write per-stage timings and memory to this JSON trace")
+    parser.add_argument("--chrome-trace", help="Also write the spans in Chrome trace format (chrome://tracing)")
+    parser.add_argument("--mlflow", action="store_true",
+                        help=f"Log the stage timings to the local MLflow store ({MLFLOW_TRACKING_URI}/)")
+
+
+@contextmanager
+def traced_run(args, run_name: str) -> Iterator[None]:
+    """Trace the block if any trace option is set, writing the outputs when it ends (even on failure)"""
+    if not (args.trace or args.chrome_trace or args.mlflow):
+        yield
+        return
+    if args.mlflow:
+        # Fail before the run, not after it
+        _require_mlflow()
+    tracer = enable_tracing()
+    try:
+        with tracer.span(run_name):
+            yield
+    finally:
+        disable_tracing()
+        if args.trace:
+            tracer.save(args.trace)
+        if args.chrome_trace:
+            tracer.save_chrome_trace(args.chrome_trace)
+        if args.mlflow:
+            tracer.log_to_mlflow(run_name, trace_path=args.trace)
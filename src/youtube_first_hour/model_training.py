@@ -3,38 +3,225 @@
 import pandas as pd
 import numpy as np
 import json
+import os
 import joblib
+import time
+from concurrent.futures import ProcessPoolExecutor
 from scipy import stats
-from typing import List, Tuple, Dict, Any
+from typing import Iterable, List, Tuple, Dict, Any, Optional, Union
 
 from sklearn.preprocessing import LabelEncoder
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error
 from sklearn.multioutput import MultiOutputRegressor
 import optuna
+from optuna.storages import RDBStorage
+from optuna.study import MaxTrialsCallback
+from optuna.trial import TrialState
 import xgboost as xgb
 
+from .artifacts import save_bundle
+from .data import load_table, metadata_path
+from .instrumentation import span, traced
+from .streaming_stats import QuantileSketch, RunningMoments, quantile_split, zscore_filter
+from .tag_features import TagFeatureBuilder
+from .tree_ensemble import TreeEnsemble
+
+
+def make_study_storage(storage: Optional[str]):
+    """
+    Optuna storage for a study: None keeps it in memory, a database URL
+    (e.g. sqlite:///artifacts/study.db) makes it shared and resumable.
+    Heartbeats let a resumed run mark the trials of a crashed worker as
+    failed; they don't count towards the trial budget, so they are redone.
+    """
+    if storage is None:
+        return None
+    return RDBStorage(
+        storage,
+        heartbeat_interval=60,
+        grace_period=180,
+        engine_kwargs={"connect_args": {"timeout": 60}} if storage.startswith("sqlite") else None,
+    )
+
+
+# Upper bound of the n_estimators search range; also spaces out the pruning
+# steps of the per-target boosters so every target reports on its own steps
+MAX_BOOST_ROUNDS = 4000
+EARLY_STOPPING_ROUNDS = 50
+
+
+class _PruningCallback(xgb.callback.TrainingCallback):
+    """Report the validation metric to Optuna every few rounds and prune bad trials."""
+
+    def __init__(self, trial, step_offset: int = 0, report_every: int = 10):
+        super().__init__()
+        self.trial = trial
+        self.step_offset = step_offset
+        self.report_every = report_every
+
+    def after_iteration(self, model, epoch: int, evals_log) -> bool:
+        if epoch % self.report_every:
+            return False
+        score = list(evals_log['valid'].values())[-1][-1]
+        self.trial.report(float(score), step=self.step_offset + epoch)
+        if self.trial.should_prune():
+            raise optuna.TrialPruned()
+        return False
+
+
+class TuningData:
+    """
+    Log targets and quantised training/validation matrices, built once per
+    study (per worker process) and reused by every trial.
+    For the per-target wrapper mode a single matrix pair is shared and only
+    its labels are swapped between targets.
+    """
+
+    def __init__(self, X_train, y_train, X_valid, y_valid, multi_target: bool):
+        self.multi_target = multi_target
+        self.y_valid = np.asarray(y_valid, dtype=float)
+        self.y_train_log = np.log1p(np.asarray(y_train, dtype=float))
+        self.y_valid_log = np.log1p(self.y_valid)
+
+        train_label = self.y_train_log if multi_target else self.y_train_log[:, 0]
+        valid_label = self.y_valid_log if multi_target else self.y_valid_log[:, 0]
+        self.dtrain = xgb.QuantileDMatrix(X_train, label=train_label)
+        self.dvalid = xgb.QuantileDMatrix(X_valid, label=valid_label, ref=self.dtrain)
+
+    def train_booster(self, params: Dict[str, Any], num_boost_round: int, trial,
+                      target: Optional[int]) -> Tuple[int, np.ndarray]:
+        """
+        Train with early stopping; returns the best iteration and the validation
+        predictions (log scale) at that iteration.
+        """
+        if target is not None:
+            self.dtrain.set_label(self.y_train_log[:, target])
+            self.dvalid.set_label(self.y_valid_log[:, target])
+        step_offset = 0 if target is None else target * MAX_BOOST_ROUNDS
+
+        with span('training.trial_fit', trial=trial.number, target=target) as s:
+            booster = xgb.train(
+                params, self.dtrain,
+                num_boost_round=num_boost_round,
+                evals=[(self.dvalid, 'valid')],
+                early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+                callbacks=[_PruningCallback(trial, step_offset)],
+                verbose_eval=False
+            )
+            s.set(rounds=booster.num_boosted_rounds())
+        best_iteration = booster.best_iteration
+        preds = booster.predict(self.dvalid, iteration_range=(0, best_iteration + 1))
+        return best_iteration, preds.reshape(len(self.y_valid), -1)
+
+
+def export_tree_arrays(model: Union[MultiOutputRegressor, xgb.XGBRegressor],
+                       feature_names: Optional[List[str]] = None) -> TreeEnsemble:
+    """
+    Flatten a trained model's trees into a TreeEnsemble that predicts the same
+    (log-scale) outputs without xgboost. The wrapper's per-target boosters
+    become one ensemble; a native multi-target booster keeps its tree-to-target
+    assignment. Vector-leaf ('multi_output_tree') and categorical splits are
+    not supported. Models with their own export (blending.StackedModel) use it.
+    feature_names: the training columns, needed when the boosters were fit on
+    a matrix without names (the CSR matrix of tag features); defaults to the
+    boosters' own names.
+    """
+    if hasattr(model, 'to_tree_ensemble'):
+        return model.to_tree_ensemble()
+    estimators = getattr(model, 'estimators_', None) or [model]
+    trees, tree_target, base_score = [], [], []
+    for booster in (est.get_booster() for est in estimators):
+        config = json.loads(booster.save_raw(raw_format='json'))['learner']
+        if config['objective']['name'] != 'reg:squarederror':
+            raise ValueError(f"Objective {config['objective']['name']} is not supported")
+        gbtree = config['gradient_booster']['model']
+        n_rounds = booster.num_boosted_rounds()
+        if booster.attr('best_iteration') is not None:
+            # Same trees as the sklearn predict after early stopping
+            n_rounds = int(booster.attr('best_iteration')) + 1
+        n_trees = gbtree['iteration_indptr'][n_rounds]
+        for tree in gbtree['trees'][:n_trees]:
+            if int(tree['tree_param']['size_leaf_vector']) > 1 or tree['categories_nodes']:
+                raise ValueError("Vector-leaf trees and categorical splits are not supported")
+        trees.extend(gbtree['trees'][:n_trees])
+        tree_target.extend(len(base_score) + t for t in gbtree['tree_info'][:n_trees])
+        base_score.extend(float(v) for v in config['learner_model_param']['base_score'].strip('[]').split(','))
+        feature_names = feature_names or booster.feature_names
+        n_features = booster.num_features()
+    if feature_names is not None and len(feature_names) != n_features:
+        raise ValueError(f"{len(feature_names)} feature names for a model of {n_features} features")
+    return TreeEnsemble.from_trees(trees, tree_target, base_score, feature_names, n_features)
+
+
+def _optimize_worker(target_columns: List[str], multi_strategy: Optional[str], storage: str,
+                     study_name: str, n_trials: int, timeout: Optional[float], n_jobs: int,
+                     data: Tuple) -> None:
+    """Run trials of a shared study in a worker process until the budget is spent."""
+    trainer = QuantileModelTrainer(target_columns, n_jobs=n_jobs, multi_strategy=multi_strategy)
+    study = optuna.load_study(study_name=study_name, storage=make_study_storage(storage))
+    trainer._optimize(study, data, n_trials, timeout)
+
 
 class QuantileModelTrainer:
-    def __init__(self, target_columns: List[str]):
+    """
+    multi_strategy selects how the targets are trained:
+    - None: MultiOutputRegressor, one independent booster per target
+    - 'one_output_per_tree': a single native multi-target booster; the
+      feature matrix and its histogram bins are built once for all targets
+    - 'multi_output_tree': as above, with vector-leaf trees shared by all targets
+      (not exportable with export_tree_arrays, so not offered by the CLI)
+    tag_features: optional TagFeatureBuilder; the `tags` column (see
+    YouTubePreprocessor.preprocess keep_tags) then becomes sparse tag
+    columns and the boosters train on one CSR matrix.
+    """
+
+    MULTI_STRATEGIES = (None, 'one_output_per_tree', 'multi_output_tree')
+    # Stage cache (see stage_cache.StageCache): bump the version when prepare_features changes
+    CACHE_VERSION = 1
+    CACHED_STATE = ['label_encoders', 'country_encoding']
+
+    def __init__(self, target_columns: List[str], n_jobs: int = -1, multi_strategy: Optional[str] = None,
+                 tag_features: Optional[TagFeatureBuilder] = None):
+        if multi_strategy not in self.MULTI_STRATEGIES:
+            raise ValueError(f"multi_strategy must be one of {self.MULTI_STRATEGIES}, got {multi_strategy!r}")
         self.target_columns = target_columns
+        self.n_jobs = n_jobs
+        self.multi_strategy = multi_strategy
+        self.tag_features = tag_features
         self.label_encoders: Dict[str, LabelEncoder] = {}
+        self.country_encoding: Dict[str, int] = {}
+        self.feature_columns: List[str] = []
         self.best_params: Dict[str, Any] = {}
-        self.model: MultiOutputRegressor = None
+        self.model: Union[MultiOutputRegressor, xgb.XGBRegressor] = None
 
+    @traced('training.prepare_features')
     def prepare_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Perform the feature extraction steps from the notebook before training."""
 
-        # Extract hours and minutes from published_time
+        # Files engineered before the integer time features still carry published_time
         if 'published_time' in df.columns:
-            df['published_time'] = pd.to_datetime(df['published_time'], format='%H:%M:%S', errors='coerce')
-            df['published_hour'] = df['published_time'].dt.hour
-            df['published_minute'] = df['published_time'].dt.minute
+            if pd.api.types.is_timedelta64_dtype(df['published_time']):
+                # Typed columnar input: no string parsing needed
+                seconds = df['published_time'].dt.total_seconds()
+                df['published_hour'] = seconds // 3600
+                df['published_minute'] = (seconds // 60) % 60
+            else:
+                df['published_time'] = pd.to_datetime(df['published_time'], format='%H:%M:%S', errors='coerce')
+                df['published_hour'] = df['published_time'].dt.hour
+                df['published_minute'] = df['published_time'].dt.minute
+            # Same integer dtypes from either input format (nullable only with missing times)
+            for col in ['published_hour', 'published_minute']:
+                df[col] = df[col].astype('Int64' if df[col].isna().any() else 'int64')
             df.drop(columns=['published_time'], inplace=True)
 
-        # Encode categorical columns
+        # Raw timestamps: their integer parts are already features
+        df.drop(columns=['published_at', 'logged_at_initial', 'logged_at_final'],
+                inplace=True, errors='ignore')
+
+        # Encode categorical columns (day of week is already an integer in new files)
         for col in ['published_day_of_week', 'definition']:
-            if col in df.columns:
+            if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
                 le = LabelEncoder()
                 df[col] = le.fit_transform(df[col])
                 self.label_encoders[col] = le
@@ -44,35 +231,65 @@ class QuantileModelTrainer:
             df['country'] = df['country'].astype('category')
             categories = list(df['country'].cat.categories)
             country_to_code = {country: idx for idx, country in enumerate(categories)}
-            with open("country_encoding.json", "w") as f:
-                json.dump(country_to_code, f)
+            self.country_encoding = country_to_code
+            self._write_country_encoding()
             df['country_encoded'] = df['country'].cat.codes
             df.drop(columns=['country'], inplace=True)
 
         return df
 
-    def remove_outliers(self, df: pd.DataFrame, z_thresh: float = 3.0) -> pd.DataFrame:
-        """Remove rows where all target columns are valid and within z_thresh."""
+    def _write_country_encoding(self) -> None:
+        with open("country_encoding.json", "w") as f:
+            json.dump(self.country_encoding, f)
+
+    def cache_restored(self, method: str) -> None:
+        """Side effects of a stage whose output came from the stage cache"""
+        if method == 'prepare_features' and self.country_encoding:
+            self._write_country_encoding()
+
+    @traced('training.remove_outliers')
+    def remove_outliers(self, df: pd.DataFrame, z_thresh: float = 3.0,
+                        moments: Optional[RunningMoments] = None) -> pd.DataFrame:
+        """
+        Remove rows where all target columns are valid and within z_thresh.
+        With `moments` (see `target_moments`) the mean and std come from a
+        streaming pass, so `df` can be one chunk or partition of the data.
+        """
+        if moments is not None:
+            return zscore_filter(df, moments, z_thresh)
         df = df.dropna(subset=self.target_columns)
         z_scores = np.abs(stats.zscore(df[self.target_columns]))
         mask = (z_scores < z_thresh).all(axis=1)
         return df[mask]
 
-    def split_quantiles(self, df: pd.DataFrame, col: str) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
-        """Split the dataset into low/mid/high quantiles for a given column."""
-        q25 = df[col].quantile(0.25)
-        q75 = df[col].quantile(0.75)
+    def target_moments(self, chunks: Iterable[pd.DataFrame]) -> RunningMoments:
+        """One pass of running target means and variances over chunked input (mergeable)."""
+        return RunningMoments.from_chunks(chunks, self.target_columns)
 
-        low = df[df[col] <= q25]
-        mid = df[(df[col] > q25) & (df[col] <= q75)]
-        high = df[df[col] > q75]
+    def split_quantiles(self, df: pd.DataFrame, col: str,
+                        sketch: Optional[QuantileSketch] = None) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """
+        Split the dataset into low/mid/high quantiles for a given column.
+        With a `sketch` of the column (QuantileSketch.from_chunks) the split
+        points are approximate, and `df` can be one chunk of the data.
+        """
+        if sketch is not None:
+            q25, q75 = sketch.quantiles([0.25, 0.75])
+        else:
+            q25 = df[col].quantile(0.25)
+            q75 = df[col].quantile(0.75)
+        return quantile_split(df, col, q25, q75)
 
-        return low, mid, high
+    def build_model(self, params: Dict[str, Any]) -> Union[MultiOutputRegressor, xgb.XGBRegressor]:
+        """Unfitted multi-target model for the configured multi_strategy."""
+        if self.multi_strategy is None:
+            return MultiOutputRegressor(xgb.XGBRegressor(**params))
+        return xgb.XGBRegressor(**params, tree_method='hist', multi_strategy=self.multi_strategy)
 
-    def optuna_objective(self, trial, X_train, y_train, X_valid, y_valid):
-        """Objective function for Optuna hyperparameter tuning."""
-        params = {
-            'n_estimators': trial.suggest_int('n_estimators', 500, 4000),
+    def suggest_params(self, trial) -> Dict[str, Any]:
+        """Sample one point of the XGBoost search space (sklearn-style parameter names)."""
+        return {
+            'n_estimators': trial.suggest_int('n_estimators', 500, MAX_BOOST_ROUNDS),
             'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.2),
             'max_depth': trial.suggest_int('max_depth', 3, 14),
             'min_child_weight': trial.suggest_int('min_child_weight', 1, 10),
@@ -83,52 +300,182 @@ class QuantileModelTrainer:
             'reg_lambda': trial.suggest_float('reg_lambda', 0, 1),
             'objective': 'reg:squarederror',
             'random_state': 42,
-            'n_jobs': -1
+            'n_jobs': self.n_jobs
         }
 
-        base_model = xgb.XGBRegressor(**params)
-        mor = MultiOutputRegressor(base_model)
+    def optuna_objective(self, trial, data: "TuningData"):
+        """
+        Objective function for Optuna hyperparameter tuning.
+        Trains on the study's cached quantised matrices with early stopping on
+        the validation RMSE (log scale), reporting it to the pruner as it goes.
+        n_estimators is only an upper bound; the best iteration of each target
+        is stored on the trial and the MAPE is measured at that iteration.
+        """
+        params = self.suggest_params(trial)
+        num_boost_round = params.pop('n_estimators')
+        # Fit time is kept on the trial too, so runs with tracing off (or in
+        # worker processes) still have it in the study storage
+        start = time.perf_counter()
+        booster_params = xgb.XGBRegressor(**params, tree_method='hist').get_xgb_params()
+        booster_params = {k: v for k, v in booster_params.items() if v is not None}
 
-        mor.fit(X_train, np.log1p(y_train),
-                eval_set=[(X_valid, np.log1p(y_valid))],
-                verbose=False)
+        if self.multi_strategy is not None:
+            booster_params['multi_strategy'] = self.multi_strategy
+            rounds = [data.train_booster(booster_params, num_boost_round, trial, target=None)]
+        else:
+            rounds = []
+            for i in range(len(self.target_columns)):
+                rounds.append(data.train_booster(booster_params, num_boost_round, trial, target=i))
 
-        preds_log = mor.predict(X_valid)
-        preds = np.expm1(preds_log)
+        trial.set_user_attr('best_iterations', [r[0] for r in rounds])
+        trial.set_user_attr('fit_seconds', time.perf_counter() - start)
+        preds = np.column_stack([r[1] for r in rounds])
+        return float(mean_absolute_percentage_error(data.y_valid, np.expm1(preds)))
+
+    def _traced_objective(self, trial, data: "TuningData"):
+        with span('training.trial', trial=trial.number) as s:
+            try:
+                value = self.optuna_objective(trial, data)
+            except optuna.TrialPruned:
+                s.set(state='pruned')
+                raise
+            s.set(state='complete', value=value)
+            return value
+
+    def _optimize(self, study: optuna.Study, data: Tuple, n_trials: int, timeout: Optional[float]) -> None:
+        """Run trials until the study holds n_trials finished trials or timeout seconds pass."""
+        # Built once per process and shared by every trial of the study
+        with span('training.build_matrices', rows_in=data[0].shape[0]):
+            tuning_data = TuningData(*data, multi_target=self.multi_strategy is not None)
+        study.optimize(
+            lambda trial: self._traced_objective(trial, tuning_data),
+            timeout=timeout,
+            callbacks=[MaxTrialsCallback(n_trials, states=(TrialState.COMPLETE, TrialState.PRUNED))],
+            gc_after_trial=True
+        )
 
-        mape = mean_absolute_percentage_error(y_valid, preds)
-        return mape
+    def _check_study_setup(self, study: optuna.Study, feature_names: List[str]) -> None:
+        """Record what the study tunes, or refuse to resume a study that tuned something else."""
+        setup = {'multi_strategy': self.multi_strategy, 'feature_columns': feature_names}
+        stored = {key: study.user_attrs[key] for key in setup if key in study.user_attrs}
+        if not stored:
+            for key, value in setup.items():
+                study.set_user_attr(key, value)
+            return
+        changed = [key for key in setup if stored.get(key) != setup[key]]
+        if changed:
+            raise ValueError(f"Study {study.study_name!r} was tuned with a different {' and '.join(changed)}; "
+                             f"use another study name or storage")
 
-    def tune_and_train(self, df: pd.DataFrame, save_path: str) -> None:
-        """Full pipeline: prepare → outlier removal → split → train → save model."""
-        df = self.prepare_features(df)
+    @traced('training.tune')
+    def tune(
+        self,
+        X_train: pd.DataFrame,
+        y_train: pd.DataFrame,
+        X_valid: pd.DataFrame,
+        y_valid: pd.DataFrame,
+        n_trials: int = 10,
+        timeout: Optional[float] = None,
+        n_workers: int = 1,
+        storage: Optional[str] = None,
+        study_name: str = "XGBoost_Optimization",
+        feature_names: Optional[List[str]] = None
+    ) -> optuna.Study:
+        """
+        Optuna search with early stopping and median pruning on the validation
+        RMSE. The quantised matrices are built once per process, not per trial.
+        - n_trials: finished (complete or pruned) trials the study should hold,
+          counting trials from earlier runs of a resumed study
+        - timeout: wall-clock budget in seconds for this run
+        - n_workers: processes running trials against the shared storage
+        - storage: database URL; required for n_workers > 1 and to resume
+        - feature_names: column names of a sparse X_train
+        A stored study only resumes with the multi_strategy and feature
+        columns it was created with; anything else raises ValueError.
+        """
+        if n_workers > 1 and storage is None:
+            raise ValueError("Parallel tuning needs a shared `storage` URL, e.g. sqlite:///study.db")
+
+        study = optuna.create_study(
+            direction="minimize",
+            study_name=study_name,
+            storage=make_study_storage(storage),
+            load_if_exists=True,
+            pruner=optuna.pruners.MedianPruner(n_startup_trials=5)
+        )
+        self._check_study_setup(study, list(X_train.columns) if feature_names is None else list(feature_names))
+        data = (X_train, y_train, X_valid, y_valid)
+
+        if n_workers <= 1:
+            self._optimize(study, data, n_trials, timeout)
+        else:
+            # Split the cores so the workers' boosters don't oversubscribe them
+            n_jobs = max(1, (os.cpu_count() or 1) // n_workers)
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                futures = [
+                    pool.submit(_optimize_worker, self.target_columns, self.multi_strategy, storage,
+                                study_name, n_trials, timeout, n_jobs, data)
+                    for _ in range(n_workers)
+                ]
+                for future in futures:
+                    future.result()
+
+        finished = study.get_trials(deepcopy=False, states=(TrialState.COMPLETE, TrialState.PRUNED))
+        pruned = sum(t.state == TrialState.PRUNED for t in finished)
+        print(f"Finished trials: {len(finished)} ({pruned} pruned)")
+        return study
+
+    def tune_and_train(self, df: pd.DataFrame, save_path: str, cache=None, **tuning_kwargs) -> None:
+        """
+        Full pipeline: prepare → outlier removal → split → train → save model.
+        cache: optional stage_cache.StageCache reusing the prepared features.
+        tuning_kwargs (n_trials, timeout, n_workers, storage, study_name) go to `tune`.
+        """
+        df = cache.run(self, 'prepare_features', df) if cache else self.prepare_features(df)
         df = self.remove_outliers(df)
 
         # Define X, y
         X = df.drop(columns=self.target_columns)
         y = df[self.target_columns]
+        tags = X.pop('tags') if 'tags' in X.columns else None
+        feature_names = list(X.columns)
 
         # Train/valid split
-        X_train, X_valid, y_train, y_valid = train_test_split(
-            X, y, test_size=0.2, random_state=42
-        )
+        if tags is None or self.tag_features is None:
+            X_train, X_valid, y_train, y_valid = train_test_split(
+                X, y, test_size=0.2, random_state=42
+            )
+        else:
+            X_train, X_valid, y_train, y_valid, tags_train, tags_valid = train_test_split(
+                X, y, tags, test_size=0.2, random_state=42
+            )
+            # Vocabulary and tag statistics from the training rows only
+            self.tag_features.fit(tags_train, y_train)
+            feature_names = self.tag_features.feature_names(feature_names)
+            X_train = self.tag_features.transform_frame(X_train, tags_train)
+            X_valid = self.tag_features.transform_frame(X_valid, tags_valid)
 
         # Optuna tuning
-        study = optuna.create_study(direction="minimize", study_name="XGBoost_Optimization")
-        study.optimize(
-            lambda trial: self.optuna_objective(trial, X_train, y_train, X_valid, y_valid),
-            n_trials=10
-        )
-        self.best_params = study.best_trial.params
+        study = self.tune(X_train, y_train, X_valid, y_valid, feature_names=feature_names, **tuning_kwargs)
+        self.best_params = dict(study.best_trial.params)
+
+        # Refit at the early-stopped iteration counts, not the tuned upper bound;
+        # the wrapper's boosters each get their own target's count
+        best_iterations = study.best_trial.user_attrs.get('best_iterations')
+        target_rounds = None
+        if best_iterations:
+            print(f"Best iterations: {best_iterations} (upper bound {self.best_params['n_estimators']})")
+            self.best_params['n_estimators'] = max(best_iterations) + 1
+            if self.multi_strategy is None:
+                target_rounds = [iteration + 1 for iteration in best_iterations]
         print("Best parameters:", self.best_params)
 
         # Train final model
-        final_base = xgb.XGBRegressor(**self.best_params)
-        self.model = MultiOutputRegressor(final_base)
-        self.model.fit(X_train, np.log1p(y_train))
+        self.fit(X_train, y_train, self.best_params, feature_names, target_rounds=target_rounds)
 
         # Evaluate
-        preds_log = self.model.predict(X_valid)
+        with span('training.predict', rows_in=X_valid.shape[0]):
+            preds_log = self.model.predict(X_valid)
         preds = np.expm1(preds_log)
         overall_mae = mean_absolute_error(y_valid, preds)
         print("Overall MAE:", overall_mae)
@@ -137,12 +484,68 @@ class QuantileModelTrainer:
             print(f"{col}: {col_mae:.4f}")
 
         # Save model
-        joblib.dump(self.model, save_path)
+        self.save(save_path)
         print(f"✅ Model saved at {save_path}")
 
+    @traced('training.fit')
+    def fit(self, X: pd.DataFrame, y: pd.DataFrame, params: Dict[str, Any],
+            feature_names: Optional[List[str]] = None, target_rounds: Optional[List[int]] = None):
+        """
+        Fit the final model on log1p targets and remember the feature order (feature_names for a sparse X).
+        target_rounds: boosting rounds of each target's booster in the wrapper mode, instead of n_estimators.
+        """
+        self.feature_columns = list(X.columns) if feature_names is None else list(feature_names)
+        self.model = self.build_model(params)
+        y_log = np.log1p(np.asarray(y, dtype=float))
+        if target_rounds is None or self.multi_strategy is not None:
+            self.model.fit(X, y_log)
+            return self.model
+        # MultiOutputRegressor clones one estimator for every target, so fit the boosters here
+        self.model.estimators_ = [
+            xgb.XGBRegressor(**{**params, 'n_estimators': rounds}).fit(X, y_log[:, i])
+            for i, rounds in enumerate(target_rounds)
+        ]
+        self.model.n_features_in_ = X.shape[1]
+        return self.model
+
+    def metadata(self) -> Dict[str, Any]:
+        """Everything besides the model that scoring needs to rebuild the feature matrix."""
+        metadata = {
+            'target_columns': list(self.target_columns),
+            'feature_columns': self.feature_columns,
+            'multi_strategy': self.multi_strategy,
+            'label_encoders': {col: le.classes_.tolist() for col, le in self.label_encoders.items()},
+            'country_encoding': self.country_encoding,
+        }
+        if self.tag_features is not None:
+            metadata['tag_features'] = self.tag_features.metadata()
+        return metadata
+
+    @traced('training.save')
+    def save(self, save_path: str) -> None:
+        """Dump the model with joblib and its metadata next to it as JSON."""
+        joblib.dump(self.model, save_path)
+        with open(metadata_path(save_path), "w") as f:
+            json.dump(self.metadata(), f, indent=2)
+
+    def export_bundle(self, directory: str, feature_engineer, scaler=None) -> Dict[str, Any]:
+        """Write a memory-mappable artifact bundle (see artifacts.save_bundle) for scoring workers."""
+        ensemble = export_tree_arrays(self.model, self.feature_columns)
+        return save_bundle(directory, ensemble, self.metadata(), feature_engineer, scaler)
+
+    def export_trees(self, save_path: str) -> TreeEnsemble:
+        """Save the model as TreeEnsemble arrays (.npz) with its metadata next to it."""
+        ensemble = export_tree_arrays(self.model, self.feature_columns)
+        ensemble.save(save_path)
+        with open(metadata_path(save_path), "w") as f:
+            json.dump(self.metadata(), f, indent=2)
+        return ensemble
+
 
-def train_model_from_csv(input_csv: str, target_columns: List[str], output_model_path: str):
-    """Helper to train model directly from a data file."""
-    df = pd.read_csv(input_csv)
-    trainer = QuantileModelTrainer(target_columns)
-    trainer.tune_and_train(df, save_path=output_model_path)
+def train_model_from_csv(input_csv: str, target_columns: List[str], output_model_path: str,
+                         multi_strategy: Optional[str] = None, cache=None,
+                         tag_features: Optional[TagFeatureBuilder] = None, **tuning_kwargs):
+    """Helper to train model directly from a data file (CSV or Parquet/Arrow)."""
+    df = load_table(input_csv)
+    trainer = QuantileModelTrainer(target_columns, multi_strategy=multi_strategy, tag_features=tag_features)
+    trainer.tune_and_train(df, save_path=output_model_path, cache=cache, **tuning_kwargs)
@@ -0,0 +1,152 @@
+# src/youtube_first_hour/parallel_features.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .data import _require_pyarrow
+from .features import GroupStatsAccumulator, YouTubeFeatureEngineer
+
+# Raw columns `YouTubeFeatureEngineer.transform` (and the channel history) read
+INPUT_COLUMNS = ['published_at', 'category_id', 'channel_id', 'c_subscriber_count_initial',
+                 'view_count_initial', 'view_count_final', 'like_count_initial', 'like_count_final',
+                 'logged_at_final']
+
+
+def _write_shared(table) -> Tuple[str, int]:
+    """Arrow IPC stream of `table` written straight into a new shared memory block"""
+    import pyarrow as pa
+    sink = pa.MockOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    size = sink.size()
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    buffer = pa.py_buffer(shm.buf)
+    writer = pa.ipc.new_stream(pa.FixedSizeBufferWriter(buffer), table.schema)
+    writer.write_table(table)
+    writer.close()
+    # Arrow must let go of the mapping before it can be closed
+    del writer, buffer
+    shm.close()
+    return shm.name, size
+
+
+def _read_shared(name: str, size: int, rows: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """Frame of (the `rows` of) a table in shared memory; Arrow reads the block in place"""
+    import pyarrow as pa
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        buffer = pa.py_buffer(shm.buf)[:size]
+        table = pa.ipc.open_stream(buffer).read_all()
+        if rows is not None:
+            table = table.take(rows)
+        df = table.to_pandas()
+        del table, buffer
+    finally:
+        shm.close()
+    return df
+
+
+def _release(name: str) -> None:
+    shm = shared_memory.SharedMemory(name=name)
+    shm.close()
+    shm.unlink()
+
+
+def _partition_stats(source: Tuple[str, int], rows: np.ndarray) -> GroupStatsAccumulator:
+    """Map step: partial group sums and counts of one partition (runs in a worker process)."""
+    df = _read_shared(*source, rows)
+    stats = GroupStatsAccumulator()
+    stats.update(YouTubeFeatureEngineer()._create_target_variables(df))
+    return stats
+
+
+def _partition_features(source: Tuple[str, int], rows: np.ndarray, tables: Dict[str, np.ndarray],
+                        channel_history: bool) -> Tuple[str, int]:
+    """Row-local step on one partition; its new columns go back as an Arrow block in shared memory."""
+    import pyarrow as pa
+    df = _read_shared(*source, rows)
+    engineer = YouTubeFeatureEngineer.from_arrays(tables)
+    inputs = set(df.columns)
+    df = engineer.transform(df, copy=False)
+    if channel_history:
+        df = engineer._add_channel_history(df)
+    new = [col for col in df.columns if col not in inputs]
+    name, size = _write_shared(pa.Table.from_pandas(df[new], preserve_index=False))
+    # The parent unlinks the block once it has read it
+    resource_tracker.unregister(f"/{name}" if not name.startswith('/') else name, 'shared_memory')
+    return name, size
+
+
+class ParallelFeatureEngineer:
+    """
+    `YouTubeFeatureEngineer.process_all_features` across a process pool.
+
+    Rows are hash-partitioned by channel_id, so every channel lives in one
+    partition. The input columns are written once to shared memory as an
+    Arrow stream, which workers map in place. The steps are:
+    1. map: each worker returns the GroupStatsAccumulator of its partitions;
+    2. reduce: the accumulators are merged into the global category and
+       channel tables;
+    3. map: workers run the row-local transform (and the per-channel
+       history) on their partitions and pass back only the new columns, as
+       Arrow buffers in shared memory rather than pickled frames.
+
+    The output equals the serial path: channel sums are summed over the same
+    rows in the same order, and partial category sums add up exactly when
+    the counts are integer-valued (as API counts are), as in the streaming
+    path. n_partitions defaults to four per worker for load balance.
+    """
+
+    def __init__(self, n_workers: int = os.cpu_count() or 1, n_partitions: Optional[int] = None):
+        _require_pyarrow()
+        self.n_workers = n_workers
+        self.n_partitions = n_partitions or 4 * n_workers
+        self.engineer: Optional[YouTubeFeatureEngineer] = None
+
+    def partitions(self, channels: pd.Series) -> List[np.ndarray]:
+        """Row positions of every non-empty partition, each in input order"""
+        hashes = pd.util.hash_pandas_object(channels, index=False).to_numpy()
+        part = (hashes % np.uint64(self.n_partitions)).astype(np.int64)
+        order = np.argsort(part, kind='stable')
+        bounds = np.cumsum(np.bincount(part, minlength=self.n_partitions))[:-1]
+        return [rows for rows in np.split(order, bounds) if len(rows)]
+
+    def process_all_features(self, df: pd.DataFrame, channel_history: bool = False) -> pd.DataFrame:
+        import pyarrow as pa
+        columns = [col for col in INPUT_COLUMNS if col in df.columns]
+        partitions = self.partitions(df['channel_id'])
+        source = _write_shared(pa.Table.from_pandas(df[columns], preserve_index=False))
+        blocks: List[Tuple[str, int]] = []
+        try:
+            try:
+                with ProcessPoolExecutor(max_workers=self.n_workers) as pool:
+                    stats = GroupStatsAccumulator()
+                    for part in pool.map(_partition_stats, [source] * len(partitions), partitions):
+                        stats.merge(part)
+                    self.engineer = YouTubeFeatureEngineer()
+                    self.engineer.set_group_statistics(stats)
+                    print(f"[Parallel] Group statistics of {stats.rows} rows from {len(partitions)} partitions")
+
+                    tables = self.engineer.to_arrays()
+                    futures = [pool.submit(_partition_features, source, rows, tables, channel_history)
+                               for rows in partitions]
+                    # Every block that was written is recorded before a failed partition raises
+                    wait(futures)
+                    blocks.extend(future.result() for future in futures if future.exception() is None)
+                    for future in futures:
+                        future.result()
+            finally:
+                _release(source[0])
+            frames = [_read_shared(name, size) for name, size in blocks]
+        finally:
+            for name, _ in blocks:
+                _release(name)
+        # Back to input row order: partition frames are stacked, then sorted by row position
+        positions = np.concatenate(partitions)
+        new = pd.concat(frames, ignore_index=True).set_axis(positions).sort_index()
+        return pd.concat([df, new.set_axis(df.index)], axis=1)
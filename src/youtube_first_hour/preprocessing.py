@@ -5,6 +5,9 @@ import numpy as np
 from sklearn.preprocessing import StandardScaler
 from typing import List, Optional
 
+from .instrumentation import span, traced
+from .time_features import time_components
+
 
 class YouTubePreprocessor:
     """
@@ -24,21 +27,25 @@ class YouTubePreprocessor:
         'comment_count_final'
     ]
 
+    # Stage cache (see stage_cache.StageCache): bump the version when the output changes
+    CACHE_VERSION = 1
+    CACHED_STATE = ['scaler', 'numeric_columns']
+
     def __init__(self):
         self.scaler: Optional[StandardScaler] = None
         self.numeric_columns: List[str] = []
 
+    @traced('preprocess.logged_hours')
     def add_logged_hours(self, df: pd.DataFrame) -> pd.DataFrame:
         """Extract logged_at_initial_hour and logged_at_final_hour."""
         df = df.copy()
-        if 'logged_at_initial' in df.columns:
-            df['logged_at_initial'] = pd.to_datetime(df['logged_at_initial'], errors='coerce')
-            df['logged_at_initial_hour'] = df['logged_at_initial'].dt.hour.fillna(0).astype(int)
-        if 'logged_at_final' in df.columns:
-            df['logged_at_final'] = pd.to_datetime(df['logged_at_final'], errors='coerce')
-            df['logged_at_final_hour'] = df['logged_at_final'].dt.hour.fillna(0).astype(int)
+        for col in ['logged_at_initial', 'logged_at_final']:
+            if col in df.columns:
+                # Unparseable or missing timestamps get hour 0
+                df[f'{col}_hour'] = time_components(df[col])['hour'].astype(int)
         return df
 
+    @traced('preprocess.select_features')
     def select_features(
         self,
         df: pd.DataFrame,
@@ -56,6 +63,7 @@ class YouTubePreprocessor:
             df = df.drop(columns=cols_to_drop)
         return df
 
+    @traced('preprocess.drop_unwanted')
     def drop_unwanted_columns(
         self,
         df: pd.DataFrame,
@@ -70,6 +78,7 @@ class YouTubePreprocessor:
         df = df.drop(columns=unwanted_cols, axis=1, errors='ignore')
         return df
 
+    @traced('preprocess.scale')
     def scale_numeric(
         self,
         df: pd.DataFrame,
@@ -93,11 +102,23 @@ class YouTubePreprocessor:
             df[columns] = self.scaler.transform(df[columns])
         return df
 
+    def unwanted_columns(self, keep_tags: bool = False) -> List[str]:
+        """DEFAULT_UNWANTED_COLS, less `tags` when a tag_features.TagFeatureBuilder will use it"""
+        return [col for col in self.DEFAULT_UNWANTED_COLS if not (keep_tags and col == 'tags')]
+
+    def input_columns(self, columns: List[str], unwanted_cols: Optional[List[str]] = None) -> List[str]:
+        """Columns of a stored table that `preprocess` can use, to read only those"""
+        unwanted = set(self.DEFAULT_UNWANTED_COLS if unwanted_cols is None else unwanted_cols)
+        return [col for col in columns if col not in unwanted]
+
+    @traced('preprocess')
     def preprocess(
         self,
         df: pd.DataFrame,
         scaling: bool = False,
-        numeric_cols: Optional[List[str]] = None
+        numeric_cols: Optional[List[str]] = None,
+        copy: bool = True,
+        keep_tags: bool = False
     ) -> pd.DataFrame:
         """
         Full preprocessing pipeline:
@@ -105,10 +126,66 @@ class YouTubePreprocessor:
         2. Drops high-null columns
         3. Drops unwanted columns
         4. Optionally scales numeric columns
+        copy=False plans the steps together instead (see `_preprocess_planned`).
+        keep_tags keeps the raw `tags` column for tag_features.
         """
+        unwanted = self.unwanted_columns(keep_tags)
+        if not copy:
+            return self._preprocess_planned(df, scaling, numeric_cols, unwanted)
         df_proc = self.add_logged_hours(df)
         df_proc = self.select_features(df_proc)
-        df_proc = self.drop_unwanted_columns(df_proc)
+        df_proc = self.drop_unwanted_columns(df_proc, unwanted)
         if scaling:
             df_proc = self.scale_numeric(df_proc, numeric_cols, fit=True)
         return df_proc
+
+    def _preprocess_planned(
+        self,
+        df: pd.DataFrame,
+        scaling: bool,
+        numeric_cols: Optional[List[str]],
+        unwanted_cols: List[str],
+        dropna_axis1_threshold: float = 0.95,
+        chunk_rows: int = 16384
+    ) -> pd.DataFrame:
+        """
+        The step-by-step pipeline without its intermediate copies. The final
+        column set is worked out first; unscaled columns are shared with `df`
+        rather than copied, and the scaled columns are written once into a
+        float block and standardised in place. Unscaled columns are
+        identical to the copying pipeline's; scaled ones agree to rounding,
+        as the scaler's statistics are accumulated chunk by chunk.
+        """
+        columns = {col: df[col] for col in df.columns}
+        for col in ['logged_at_initial', 'logged_at_final']:
+            if col in df.columns:
+                columns[f'{col}_hour'] = time_components(df[col])['hour'].astype(int)
+
+        # Null ratios one column at a time, never a full boolean frame
+        dropped = [col for col, values in columns.items() if pd.isna(values).mean() > dropna_axis1_threshold]
+        if dropped:
+            print(f"[Preprocessing] Dropping {len(dropped)} columns with >{dropna_axis1_threshold*100}% nulls")
+        unwanted = set(unwanted_cols) | set(dropped)
+        columns = {col: values for col, values in columns.items() if col not in unwanted}
+        if not scaling:
+            return pd.DataFrame(columns, copy=False)
+
+        if numeric_cols is None:
+            empty = pd.DataFrame({col: values[:0] for col, values in columns.items()})
+            numeric_cols = empty.select_dtypes(include=[np.number]).columns.tolist()
+        self.numeric_columns = numeric_cols
+        with span('preprocess.scale', rows_in=len(df)):
+            block = np.empty((len(df), len(numeric_cols)), dtype=np.float64, order='F')
+            for j, col in enumerate(numeric_cols):
+                block[:, j] = columns[col]
+
+            # Statistics row chunk by row chunk, then one in-place standardisation
+            self.scaler = StandardScaler()
+            for start in range(0, len(block), chunk_rows):
+                self.scaler.partial_fit(pd.DataFrame(block[start:start + chunk_rows], columns=numeric_cols,
+                                                     copy=False))
+            block -= self.scaler.mean_
+            block /= self.scaler.scale_
+            for j, col in enumerate(numeric_cols):
+                columns[col] = pd.Series(block[:, j], index=df.index, copy=False)
+        return pd.DataFrame(columns, copy=False)
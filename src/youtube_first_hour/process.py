@@ -1,17 +1,21 @@
 import argparse
 import os
-from .features import process_youtube_data
+from .features import process_youtube_data, stream_youtube_data
+from .instrumentation import add_trace_arguments, traced_run
 
 def main():
     """Command line interface for processing YouTube data"""
     parser = argparse.ArgumentParser(description='Process YouTube video data with feature engineering')
     
     parser.add_argument('--input', '-i', required=True, 
-                       help='Input CSV file path')
+                       help='Input CSV (or Parquet/Arrow) file path')
     parser.add_argument('--output', '-o', 
-                       help='Output CSV file path (optional)')
+                       help='Output file path (optional); .parquet/.feather writes a typed columnar file')
     parser.add_argument('--show-stats', action='store_true',
                        help='Show basic statistics after processing')
+    parser.add_argument('--chunksize', type=int,
+                       help='Stream the input in chunks of this many rows (bounded memory)')
+    add_trace_arguments(parser)
     
     args = parser.parse_args()
     
@@ -26,8 +30,17 @@ def main():
         args.output = f"{base_name}_processed.csv"
     
     try:
+        if args.chunksize:
+            with traced_run(args, 'process_data'):
+                rows = stream_youtube_data(args.input, args.output, chunksize=args.chunksize)
+            print(f"Total videos processed: {rows}")
+            if args.show_stats:
+                print("--show-stats is not available in streaming mode")
+            return
+        
         # Process the data
-        df_processed = process_youtube_data(args.input, args.output)
+        with traced_run(args, 'process_data'):
+            df_processed = process_youtube_data(args.input, args.output)
         
         # Show stats if requested
         if args.show_stats:
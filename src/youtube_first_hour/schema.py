@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, fields
+from typing import Dict, List
 
 @dataclass
 class VideoData:
@@ -24,3 +24,27 @@ class VideoData:
     comment_count_final: float
     c_view_count_final: float
     c_subscriber_count_final: float
+
+
+# Storage types for raw VideoData columns (see data.load_raw_data).
+# Repeated strings become categoricals; unique or free-text strings (ids,
+# tags, timestamps) become Arrow-backed strings. Counts become nullable
+# integers: int64 where they can pass 2**31 (views), int32 otherwise.
+CATEGORICAL_FIELDS = ['channel_id', 'channel_title', 'country', 'definition']
+WIDE_COUNT_FIELDS = ['view_count_initial', 'view_count_final', 'c_view_count_initial', 'c_view_count_final']
+
+
+def dtype_plan(arrow_strings: bool = True) -> Dict[str, str]:
+    """Compact dtype of every VideoData field; object strings when pyarrow is unavailable"""
+    plan = {}
+    for field in fields(VideoData):
+        if field.type is str:
+            if field.name in CATEGORICAL_FIELDS:
+                plan[field.name] = 'category'
+            else:
+                plan[field.name] = 'string[pyarrow]' if arrow_strings else 'object'
+        elif field.name == 'category_id':
+            plan[field.name] = 'float32'
+        else:
+            plan[field.name] = 'Int64' if field.name in WIDE_COUNT_FIELDS else 'Int32'
+    return plan
@@ -0,0 +1,288 @@
+# src/youtube_first_hour/segment_training.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import optuna
+from sklearn.dummy import DummyClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.metrics import mean_absolute_percentage_error
+from sklearn.model_selection import train_test_split
+from sklearn.multioutput import MultiOutputRegressor
+
+from .model_training import MAX_BOOST_ROUNDS, QuantileModelTrainer
+
+# Pseudo-segment of all rows, trained only for segments too small for their own model
+GLOBAL_SEGMENT = 'global'
+
+
+class QuantileSegments:
+    """
+    low / mid / high split of one column at its 25th and 75th percentiles,
+    as `QuantileModelTrainer.split_quantiles`: low <= q25 < mid <= q75 < high.
+    """
+
+    names = ['low', 'mid', 'high']
+
+    def __init__(self, column: str, quantiles: Tuple[float, float] = (0.25, 0.75)):
+        self.column = column
+        self.quantiles = quantiles
+        self.thresholds: Optional[np.ndarray] = None
+
+    @property
+    def columns(self) -> List[str]:
+        return [self.column]
+
+    def fit(self, df: pd.DataFrame) -> "QuantileSegments":
+        self.thresholds = df[self.column].quantile(list(self.quantiles)).to_numpy()
+        return self
+
+    def assign(self, df: pd.DataFrame) -> np.ndarray:
+        """Segment index of every row"""
+        return np.searchsorted(self.thresholds, df[self.column].to_numpy(), side='left')
+
+
+class ZScoreSegments:
+    """
+    normal / outlier split of the notebooks: a row is normal when all its
+    columns are within `threshold` standard deviations of the training mean.
+    """
+
+    names = ['normal', 'outlier']
+
+    def __init__(self, columns: Sequence[str], threshold: float = 1.0):
+        self.columns = list(columns)
+        self.threshold = threshold
+        self.mean: Optional[np.ndarray] = None
+        self.std: Optional[np.ndarray] = None
+
+    def fit(self, df: pd.DataFrame) -> "ZScoreSegments":
+        values = df[self.columns].to_numpy(dtype=float)
+        self.mean = values.mean(axis=0)
+        self.std = values.std(axis=0)
+        return self
+
+    def assign(self, df: pd.DataFrame) -> np.ndarray:
+        z = np.abs((df[self.columns].to_numpy(dtype=float) - self.mean) / self.std)
+        return (~(z < self.threshold).all(axis=1)).astype(np.intp)
+
+
+# --- Model families --------------------------------------------------------
+# Each family tunes on one segment and returns (fitted model, validation MAPE,
+# params). Models are fit on log1p targets; lightgbm and catboost are
+# optional and only imported by the jobs that use them.
+
+def _tune_xgboost(X_train, y_train, X_valid, y_valid, n_trials: int, n_jobs: int, target_columns):
+    trainer = QuantileModelTrainer(target_columns, n_jobs=n_jobs)
+    study = trainer.tune(X_train, y_train, X_valid, y_valid, n_trials=n_trials,
+                         study_name="XGBoost_Segment")
+    params = dict(study.best_trial.params)
+    best_iterations = study.best_trial.user_attrs.get('best_iterations')
+    target_rounds = None
+    if best_iterations:
+        params['n_estimators'] = max(best_iterations) + 1
+        target_rounds = [iteration + 1 for iteration in best_iterations]
+    params.update(objective='reg:squarederror', random_state=42, n_jobs=n_jobs)
+    model = trainer.fit(X_train, y_train, params, target_rounds=target_rounds)
+    return model, study.best_value, params
+
+
+def _lightgbm_model(trial, n_jobs: int):
+    from lightgbm import LGBMRegressor
+
+    params = {
+        'n_estimators': trial.suggest_int('n_estimators', 500, MAX_BOOST_ROUNDS),
+        'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.2),
+        'max_depth': trial.suggest_int('max_depth', 3, 14),
+        'reg_alpha': trial.suggest_float('reg_alpha', 0, 1),
+        'reg_lambda': trial.suggest_float('reg_lambda', 0, 1),
+        'min_child_samples': trial.suggest_int('min_child_samples', 10, 50),
+        'colsample_bytree': trial.suggest_float('colsample_bytree', 0.6, 1.0),
+        'subsample': trial.suggest_float('subsample', 0.5, 1.0),
+        'objective': 'regression',
+        'random_state': 42,
+        'n_jobs': n_jobs,
+        'verbose': -1
+    }
+    return MultiOutputRegressor(LGBMRegressor(**params))
+
+
+def _catboost_model(trial, n_jobs: int):
+    from catboost import CatBoostRegressor
+
+    params = {
+        'iterations': trial.suggest_int('iterations', 500, MAX_BOOST_ROUNDS),
+        'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.2),
+        'depth': trial.suggest_int('depth', 4, 10),
+        'l2_leaf_reg': trial.suggest_float('l2_leaf_reg', 1, 10),
+        'random_seed': 42,
+        'thread_count': n_jobs,
+        'verbose': 0
+    }
+    return MultiOutputRegressor(CatBoostRegressor(**params))
+
+
+def _sklearn_family(make_model: Callable):
+    """Family tuned by plain fit/predict trials over `make_model(trial, n_jobs)`"""
+
+    def tune(X_train, y_train, X_valid, y_valid, n_trials: int, n_jobs: int, target_columns):
+        y_train_log = np.log1p(y_train)
+        best = {}
+
+        def objective(trial):
+            model = make_model(trial, n_jobs)
+            model.fit(X_train, y_train_log)
+            score = float(mean_absolute_percentage_error(y_valid, np.expm1(model.predict(X_valid))))
+            # Keep the best fitted model instead of refitting it after the search
+            if not best or score < best['score']:
+                best.update(model=model, score=score)
+            return score
+
+        study = optuna.create_study(direction="minimize")
+        study.optimize(objective, n_trials=n_trials, gc_after_trial=True)
+        return best['model'], study.best_value, dict(study.best_trial.params)
+
+    return tune
+
+
+MODEL_FAMILIES: Dict[str, Callable] = {
+    'xgboost': _tune_xgboost,
+    'lightgbm': _sklearn_family(_lightgbm_model),
+    'catboost': _sklearn_family(_catboost_model),
+}
+
+
+def _segment_job(family: str, segment: str, data: Tuple, n_trials: int, n_jobs: int,
+                 target_columns: List[str]) -> Dict[str, Any]:
+    """Tune and fit one family on one segment (runs in a worker process)."""
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    from threadpoolctl import threadpool_limits
+    # Cap OpenMP/BLAS pools too, not just the estimator's own n_jobs
+    with threadpool_limits(limits=n_jobs):
+        model, score, params = MODEL_FAMILIES[family](*data, n_trials, n_jobs, target_columns)
+    return {'segment': segment, 'family': family, 'model': model, 'score': score, 'params': params}
+
+
+class SegmentedEnsemble:
+    """
+    One model per segment plus the router that picks a row's segment at
+    predict time. When the segmentation rule only reads feature columns the
+    rule itself routes; rules on targets (unknown when scoring) are routed by
+    a classifier trained to predict the segment from the features.
+    """
+
+    def __init__(self, rule, models: Dict[str, Any], target_columns: List[str],
+                 feature_columns: List[str], router=None, scores: Optional[Dict] = None):
+        self.rule = rule
+        self.models = models
+        self.target_columns = target_columns
+        self.feature_columns = feature_columns
+        self.router = router
+        self.scores = scores or {}
+
+    def route(self, X: pd.DataFrame) -> np.ndarray:
+        """Segment index of every row"""
+        if self.router is None:
+            return self.rule.assign(X)
+        return self.router.predict(X[self.feature_columns])
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        """Log-scale predictions (like the single models), each row by its segment's model"""
+        X = X[self.feature_columns]
+        segments = self.route(X)
+        preds = np.empty((len(X), len(self.target_columns)), dtype=float)
+        for idx, name in enumerate(self.rule.names):
+            rows = segments == idx
+            if rows.any():
+                preds[rows] = self.models[name].predict(X[rows])
+        return preds
+
+
+class SegmentTrainer:
+    """
+    Divide-and-conquer training: split the data with a segmentation rule
+    (QuantileSegments / ZScoreSegments), tune every (segment x family) job
+    in a process pool and keep the best family of each segment. A segment
+    with no train or validation rows gets the best model of all rows.
+    Each of the n_workers jobs running at once gets cpu_count // n_workers
+    threads so the pool doesn't oversubscribe the cores.
+    """
+
+    def __init__(self, target_columns: List[str], rule, families: Sequence[str] = ('xgboost',),
+                 n_workers: int = 1, n_trials: int = 10):
+        unknown = set(families) - set(MODEL_FAMILIES)
+        if unknown:
+            raise ValueError(f"Unknown model families {sorted(unknown)}, expected {list(MODEL_FAMILIES)}")
+        self.target_columns = target_columns
+        self.rule = rule
+        self.families = list(families)
+        self.n_workers = n_workers
+        self.n_trials = n_trials
+
+    def _jobs(self, X_train, y_train, X_valid, y_valid, train_seg,
+              valid_seg) -> Tuple[List[Tuple[str, str, Tuple]], List[str]]:
+        """(family, segment, data) jobs, and the segments without rows to train or validate on"""
+        jobs, empty = [], []
+        for idx, name in enumerate(self.rule.names):
+            tr, va = train_seg == idx, valid_seg == idx
+            if not tr.any() or not va.any():
+                empty.append(name)
+                continue
+            data = (X_train[tr], y_train[tr], X_valid[va], y_valid[va])
+            jobs.extend((family, name, data) for family in self.families)
+        if empty:
+            # Empty segments fall back to a model of all rows
+            jobs.extend((family, GLOBAL_SEGMENT, (X_train, y_train, X_valid, y_valid))
+                        for family in self.families)
+        return jobs, empty
+
+    def fit(self, df: pd.DataFrame, valid_size: float = 0.2) -> SegmentedEnsemble:
+        X = df.drop(columns=self.target_columns)
+        y = df[self.target_columns]
+        X_train, X_valid, y_train, y_valid = train_test_split(X, y, test_size=valid_size, random_state=42)
+
+        self.rule.fit(pd.concat([X_train, y_train], axis=1))
+        train_seg = self.rule.assign(pd.concat([X_train, y_train], axis=1))
+        valid_seg = self.rule.assign(pd.concat([X_valid, y_valid], axis=1))
+        for idx, name in enumerate(self.rule.names):
+            print(f"[Segments] {name}: {(train_seg == idx).sum()} train / {(valid_seg == idx).sum()} valid rows")
+
+        n_jobs = max(1, (os.cpu_count() or 1) // self.n_workers)
+        jobs, empty = self._jobs(X_train, y_train, X_valid, y_valid, train_seg, valid_seg)
+        args = [(family, name, data, self.n_trials, n_jobs, self.target_columns) for family, name, data in jobs]
+        if self.n_workers <= 1:
+            results = [_segment_job(*a) for a in args]
+        else:
+            with ProcessPoolExecutor(max_workers=self.n_workers) as pool:
+                results = list(pool.map(_segment_job, *zip(*args)))
+
+        best: Dict[str, Dict[str, Any]] = {}
+        scores: Dict[str, Dict[str, float]] = {}
+        for result in results:
+            segment = result['segment']
+            scores.setdefault(segment, {})[result['family']] = result['score']
+            print(f"[Segments] {segment} / {result['family']}: valid MAPE {result['score']:.4f}")
+            if segment not in best or result['score'] < best[segment]['score']:
+                best[segment] = result
+        for name in empty:
+            print(f"[Segments] {name}: no train or validation rows, using the {GLOBAL_SEGMENT} model")
+            best[name] = best[GLOBAL_SEGMENT]
+
+        router = None
+        if set(self.rule.columns) & set(self.target_columns):
+            if len(np.unique(train_seg)) > 1:
+                router = HistGradientBoostingClassifier(random_state=42).fit(X_train, train_seg)
+            else:
+                # Every training row is in one segment: nothing to learn
+                router = DummyClassifier(strategy='most_frequent').fit(X_train, train_seg)
+            accuracy = float((router.predict(X_valid) == valid_seg).mean())
+            print(f"[Segments] Router accuracy on validation: {accuracy:.3f}")
+
+        ensemble = SegmentedEnsemble(self.rule, {name: best[name]['model'] for name in self.rule.names},
+                                     self.target_columns, list(X.columns), router, scores)
+        preds = np.expm1(ensemble.predict(X_valid))
+        print(f"[Segments] Routed ensemble valid MAPE: {mean_absolute_percentage_error(y_valid, preds):.4f}")
+        return ensemble
@@ -0,0 +1,278 @@
+# src/youtube_first_hour/serving.py
+
+import json
+import os
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from .batching import MicroBatcher
+from .channel_history import HISTORY_PREFIXES
+from .data import metadata_path
+from .features import YouTubeFeatureEngineer
+from .schema import VideoData
+from .tag_features import TagFeatureBuilder
+from .time_features import as_feature, time_components
+from .tree_ensemble import TreeEnsemble
+
+Record = Union[VideoData, Dict[str, Any]]
+
+
+def _floats(values: List[Any]) -> np.ndarray:
+    """Numeric column from record values; None and unparseable values become NaN"""
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+
+
+class FirstHourPredictor:
+    """
+    Scores raw VideoData records with a model saved by `QuantileModelTrainer.save`
+    (joblib, predicted with the xgboost boosters in place) or exported by
+    `QuantileModelTrainer.export_trees` (.npz TreeEnsemble, no xgboost needed).
+    Everything (model, metadata, lookup tables, optional scaler) is loaded
+    once; each call rebuilds the training feature matrix straight from the
+    record values with NumPy - no DataFrame per request.
+    """
+
+    def __init__(self, model, metadata: Dict[str, Any], feature_engineer: YouTubeFeatureEngineer,
+                 scaler=None, n_threads: int = 1):
+        self.target_columns: List[str] = metadata['target_columns']
+        self.feature_columns: List[str] = metadata['feature_columns']
+        history = [col for col in self.feature_columns if col.startswith(HISTORY_PREFIXES)]
+        if history:
+            # They need each channel's earlier videos, which no lookup table keeps
+            raise ValueError(f"The model uses channel history features ({', '.join(history)}), "
+                             "which records cannot be scored with; engineer features without --channel-history")
+        self.feature_engineer = feature_engineer
+        self.vocabularies = {col: {value: idx for idx, value in enumerate(classes)}
+                             for col, classes in metadata.get('label_encoders', {}).items()}
+        self.country_encoding: Dict[str, int] = metadata.get('country_encoding', {})
+        # Models trained with tag features score the raw `tags` of each record
+        self.tag_features: Optional[TagFeatureBuilder] = None
+        if metadata.get('tag_features'):
+            self.tag_features = TagFeatureBuilder.from_metadata(metadata['tag_features'])
+
+        self.scaled_index = np.array([], dtype=np.intp)
+        if scaler is not None:
+            names = list(getattr(scaler, 'feature_names_in_', []))
+            if not names:
+                raise ValueError("The scaler must be fitted on a DataFrame so its column names are known")
+            self.set_scaling(names, scaler.mean_, scaler.scale_)
+
+        self.ensemble: Optional[TreeEnsemble] = None
+        self.boosters = []
+        if isinstance(model, TreeEnsemble):
+            if list(model.feature_names) != self.feature_columns:
+                raise ValueError("Tree arrays were exported for different feature columns")
+            self.ensemble = model
+        else:
+            # One booster per target (wrapper) or one booster for all targets (native)
+            estimators = getattr(model, 'estimators_', None) or [model]
+            self.boosters = [est.get_booster() for est in estimators]
+            for booster in self.boosters:
+                booster.set_param({'nthread': n_threads})
+
+    def set_scaling(self, columns: Sequence[str], mean: np.ndarray, scale: np.ndarray) -> None:
+        """Standardise these columns (a fitted StandardScaler's names, mean_ and scale_)"""
+        keep = [i for i, name in enumerate(columns) if name in self.feature_columns]
+        self.scaled_index = np.array([self.feature_columns.index(columns[i]) for i in keep], dtype=np.intp)
+        self.scaled_mean = np.asarray(mean, dtype=np.float32)[keep]
+        self.scaled_scale = np.asarray(scale, dtype=np.float32)[keep]
+
+    @classmethod
+    def load(cls, model_path: str, tables_path: str, scaler_path: Optional[str] = None,
+             n_threads: int = 1) -> "FirstHourPredictor":
+        """
+        Load a model, its `_metadata.json`, the feature engineer's lookup
+        tables (.npz) and, if the model was trained on scaled inputs, the scaler.
+        """
+        if model_path.endswith('.npz'):
+            model = TreeEnsemble.load(model_path)
+        else:
+            model = joblib.load(model_path)
+        with open(metadata_path(model_path)) as f:
+            metadata = json.load(f)
+        # An older metadata file may carry a country mapping only as country_encoding.json
+        if not metadata.get('country_encoding'):
+            legacy = os.path.join(os.path.dirname(model_path), "country_encoding.json")
+            if os.path.exists(legacy):
+                with open(legacy) as f:
+                    metadata['country_encoding'] = json.load(f)
+        scaler = joblib.load(scaler_path) if scaler_path else None
+        return cls(model, metadata, YouTubeFeatureEngineer.load(tables_path), scaler, n_threads)
+
+    def features(self, records: Sequence[Record]) -> np.ndarray:
+        """Feature matrix (rows x feature_columns, float32) for raw records"""
+        rows = [r.__dict__ if isinstance(r, VideoData) else r for r in records]
+        get = lambda name: [row.get(name) for row in rows]
+        columns = self._engineer(get, len(rows))
+
+        X = np.empty((len(rows), len(self.feature_columns)), dtype=np.float32)
+        for j, name in enumerate(self.feature_columns):
+            X[:, j] = columns[name] if name in columns else _floats(get(name))
+        if len(self.scaled_index):
+            X[:, self.scaled_index] = (X[:, self.scaled_index] - self.scaled_mean) / self.scaled_scale
+        return X
+
+    def _engineer(self, get, n: int) -> Dict[str, np.ndarray]:
+        """YouTubeFeatureEngineer.transform, YouTubePreprocessor and prepare_features on arrays"""
+        out: Dict[str, np.ndarray] = {}
+
+        # The three timestamp columns are parsed in one call
+        stamps = np.array(get('published_at') + get('logged_at_initial') + get('logged_at_final'), dtype=object)
+        parts = time_components(stamps)
+        published = slice(0, n)
+        valid = parts['valid'][published]
+        for name, component in [('published_year', 'year'), ('published_month', 'month'),
+                                ('published_day_of_week', 'weekday'), ('published_hour', 'hour'),
+                                ('published_minute', 'minute')]:
+            out[name] = as_feature(parts[component][published], valid)
+        out['logged_at_initial_hour'] = parts['hour'][n:2 * n]
+        out['logged_at_final_hour'] = parts['hour'][2 * n:]
+
+        categories = _floats(get('category_id'))
+        table = self.feature_engineer.category_table
+        out['avg_view_diff_per_category'] = table.lookup_array(
+            categories, np.isnan(categories), 'view_count_difference')
+        out['avg_likes_diff_per_category'] = table.lookup_array(
+            categories, np.isnan(categories), 'like_count_difference')
+
+        channels = get('channel_id')
+        channel_avg_views = self.feature_engineer.channel_table.lookup_array(
+            np.array([str(c) for c in channels], dtype=str),
+            np.array([c is None for c in channels]), 'view_count_difference')
+        channel_avg_views = np.where(np.isnan(channel_avg_views), 0.0, channel_avg_views)
+        subs = _floats(get('c_subscriber_count_initial'))
+        log_subs = np.log1p(subs)
+        out['log_channel_subs'] = out['channel_authority'] = log_subs
+        out['channel_avg_views'] = channel_avg_views
+        out['channel_growth_potential'] = subs * channel_avg_views / 1000
+        out['channel_virality_score'] = channel_avg_views * log_subs / 100
+
+        out['relative_views_to_category'] = (
+            _floats(get('view_count_initial')) / (out['avg_view_diff_per_category'] + 1))
+        out['relative_likes_to_category'] = (
+            _floats(get('like_count_initial')) / (out['avg_likes_diff_per_category'] + 1))
+
+        # Label-encoded columns; values never seen in training are missing (NaN)
+        for col, vocabulary in self.vocabularies.items():
+            out[col] = np.array([vocabulary.get(v, np.nan) for v in get(col)], dtype=np.float64)
+
+        # Missing countries were category code -1 in training
+        unknown = self.country_encoding.get('unknown', -1)
+        out['country_encoded'] = np.array(
+            [-1 if c is None else self.country_encoding.get(c, unknown) for c in get('country')],
+            dtype=np.float64)
+
+        if self.tag_features is not None:
+            out.update(self.tag_features.columns(pd.Series(get('tags'), dtype=object)))
+        return out
+
+    def predict_array(self, records: Sequence[Record]) -> np.ndarray:
+        """Forecasts (rows x target_columns) on the original count scale"""
+        X = self.features(records)
+        if self.ensemble is not None:
+            preds = self.ensemble.predict(X)
+        elif len(self.boosters) == 1:
+            preds = self.boosters[0].inplace_predict(X).reshape(len(X), -1)
+        else:
+            preds = np.column_stack([booster.inplace_predict(X) for booster in self.boosters])
+        return np.expm1(preds)
+
+    def predict(self, records: Sequence[Record]) -> List[Dict[str, float]]:
+        """One {target: forecast} dict per record"""
+        return self.to_dicts(self.predict_array(records))
+
+    def to_dicts(self, preds: np.ndarray) -> List[Dict[str, float]]:
+        return [dict(zip(self.target_columns, row)) for row in preds.tolist()]
+
+
+class _PredictionHandler(BaseHTTPRequestHandler):
+    """
+    POST /predict with one record (JSON object) or a micro-batch (JSON array);
+    GET /health, and GET /metrics when requests go through a MicroBatcher
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; Nagle would hold the body back
+    disable_nagle_algorithm = True
+    predictor: FirstHourPredictor = None
+    batcher: Optional[MicroBatcher] = None
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._reply(200, {"status": "ok", "targets": self.predictor.target_columns})
+        elif self.path == "/metrics" and self.batcher is not None:
+            self._reply(200, self.batcher.metrics.snapshot())
+        else:
+            self._reply(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._reply(404, {"error": f"unknown path {self.path}"})
+            return
+        start = time.perf_counter()
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            single = isinstance(body, dict)
+            records = [body] if single else body
+            if self.batcher is not None:
+                # Concurrent requests are merged into one predict call
+                predictions = self.predictor.to_dicts(self.batcher.predict(records))
+            else:
+                predictions = self.predictor.predict(records)
+        except (ValueError, TypeError, AttributeError) as e:
+            self._reply(400, {"error": str(e)})
+            return
+        self._reply(200, {
+            "predictions": predictions[0] if single else predictions,
+            "latency_ms": (time.perf_counter() - start) * 1000,
+        })
+
+    def _reply(self, status: int, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self) -> str:
+        # Unix-socket peers have no (host, port) address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        # Per-request logging would dominate the latency
+        pass
+
+
+class _TCPHTTPServer(ThreadingHTTPServer):
+    # The socketserver default backlog of 5 drops connections under bursts
+    request_queue_size = 128
+
+
+class _UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def make_server(predictor: FirstHourPredictor, host: str = "127.0.0.1", port: int = 8080,
+                unix_socket: Optional[str] = None, batcher: Optional[MicroBatcher] = None):
+    """
+    HTTP prediction server on host:port, or on a Unix socket path if given.
+    With a batcher (built on predictor.predict_array) concurrent requests
+    share vectorised predict calls.
+    """
+    handler = type("PredictionHandler", (_PredictionHandler,), {"predictor": predictor, "batcher": batcher})
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        return _UnixHTTPServer(unix_socket, handler)
+    return _TCPHTTPServer((host, port), handler)
@@ -0,0 +1,130 @@
+# src/youtube_first_hour/stage_cache.py
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sys
+from typing import Any, Dict, List, Tuple
+
+import joblib
+import pandas as pd
+
+from .data import _require_pyarrow, frame_fingerprint
+
+
+# Parameters that change how a stage runs, not what it returns
+NON_KEY_PARAMS = ('copy',)
+
+
+def stage_dependencies(module_name: str) -> List[str]:
+    """A module and every module of its package it uses, directly or through the others"""
+    package = module_name.split('.')[0] + '.'
+    seen, pending = set(), [module_name]
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        for value in vars(sys.modules[name]).values():
+            dependency = value.__name__ if inspect.ismodule(value) else getattr(value, '__module__', None)
+            if isinstance(dependency, str) and dependency.startswith(package) and dependency in sys.modules:
+                pending.append(dependency)
+    return sorted(seen)
+
+
+@functools.lru_cache(maxsize=None)
+def code_fingerprint(module_name: str) -> str:
+    """Hash of the source of `stage_dependencies(module_name)`"""
+    digest = hashlib.sha256()
+    for name in stage_dependencies(module_name):
+        digest.update(name.encode())
+        digest.update(inspect.getsource(sys.modules[name]).encode())
+    return digest.hexdigest()
+
+
+class StageCache:
+    """
+    Content-addressed cache of pipeline stage outputs.
+
+    A stage is a method of a pipeline object (`YouTubeFeatureEngineer.
+    process_all_features`, `YouTubePreprocessor.preprocess`,
+    `QuantileModelTrainer.prepare_features`) mapping a frame to a frame.
+    Its key hashes the input frame, the call parameters (less
+    NON_KEY_PARAMS), the class's CACHE_VERSION and the source of its module
+    and of the package modules that one depends on. The output is stored as
+    Parquet with the fitted attributes listed in the class's CACHED_STATE
+    next to it, so a hit restores the object as if the stage had run; a
+    `cache_restored(method)` method of the object, if any, then redoes the
+    stage's side effects. Least recently used entries are evicted once the
+    cache grows past max_bytes.
+    """
+
+    def __init__(self, directory: str = "artifacts/stage_cache", max_bytes: int = 2 * 1024 ** 3):
+        _require_pyarrow()
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, obj, method: str, df: pd.DataFrame, params: Dict[str, Any]) -> str:
+        cls = type(obj)
+        payload = {
+            'stage': f"{cls.__name__}.{method}",
+            'version': getattr(cls, 'CACHE_VERSION', 0),
+            'code': code_fingerprint(cls.__module__),
+            'params': {name: value for name, value in params.items() if name not in NON_KEY_PARAMS},
+            'data': frame_fingerprint(df),
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:24]
+
+    def _paths(self, stage: str, key: str) -> Tuple[str, str]:
+        stem = os.path.join(self.directory, f"{stage}-{key}")
+        return f"{stem}.parquet", f"{stem}.state.joblib"
+
+    def run(self, obj, method: str, df: pd.DataFrame, **params) -> pd.DataFrame:
+        """`getattr(obj, method)(df, **params)`, or its cached output and fitted state"""
+        stage = f"{type(obj).__name__}.{method}"
+        data_path, state_path = self._paths(stage, self.key(obj, method, df, params))
+        if os.path.exists(data_path) and os.path.exists(state_path):
+            for path in (data_path, state_path):
+                os.utime(path)
+            for name, value in joblib.load(state_path).items():
+                setattr(obj, name, value)
+            if hasattr(obj, 'cache_restored'):
+                obj.cache_restored(method)
+            print(f"[Cache] {stage}: hit")
+            return pd.read_parquet(data_path)
+
+        out = getattr(obj, method)(df, **params)
+        try:
+            out.to_parquet(data_path)
+        except (TypeError, ValueError, ImportError) as e:
+            # Mixed-type object columns can't be stored; the stage still ran
+            print(f"[Cache] {stage}: output not cached ({e})")
+            if os.path.exists(data_path):
+                os.remove(data_path)
+            return out
+        joblib.dump({name: getattr(obj, name) for name in getattr(obj, 'CACHED_STATE', [])}, state_path)
+        print(f"[Cache] {stage}: stored")
+        self.evict()
+        return out
+
+    def entries(self) -> List[Tuple[float, int, str]]:
+        """(last use, size, path) of every cached file, oldest first"""
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
@@ -0,0 +1,154 @@
+# src/youtube_first_hour/streaming_stats.py
+
+import math
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class RunningMoments:
+    """
+    Per-column count, mean and sum of squared deviations, updated one chunk
+    at a time and mergeable across processes (Welford / Chan et al.).
+    Each chunk is reduced with NumPy, then folded into the running totals,
+    so memory depends on the chunk, not the dataset.
+
+    Matches the full-matrix `scipy.stats.zscore` (ddof=0) to about 1e-12
+    relative: only rows whose z-score is that close to the threshold can
+    be classified differently.
+    """
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+        self.count = 0
+        self.mean = np.zeros(len(self.columns))
+        self.m2 = np.zeros(len(self.columns))
+
+    def _combine(self, count: int, mean: np.ndarray, m2: np.ndarray) -> None:
+        total = self.count + count
+        if count == 0:
+            return
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (count / total)
+        self.m2 = self.m2 + m2 + delta ** 2 * (self.count * count / total)
+        self.count = total
+
+    def update(self, df: pd.DataFrame) -> "RunningMoments":
+        """Add a chunk; rows with a missing value in any column are skipped, as in remove_outliers"""
+        values = df[self.columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        values = values[~np.isnan(values).any(axis=1)]
+        if len(values):
+            mean = values.mean(axis=0)
+            self._combine(len(values), mean, ((values - mean) ** 2).sum(axis=0))
+        return self
+
+    def merge(self, other: "RunningMoments") -> "RunningMoments":
+        """Fold in the moments of another partition"""
+        self._combine(other.count, other.mean, other.m2)
+        return self
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.m2 / self.count)
+
+    def zscores(self, df: pd.DataFrame) -> np.ndarray:
+        return (df[self.columns].to_numpy(dtype=np.float64, na_value=np.nan) - self.mean) / self.std
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[pd.DataFrame], columns: Sequence[str]) -> "RunningMoments":
+        moments = cls(columns)
+        for chunk in chunks:
+            moments.update(chunk)
+        return moments
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with relative-error guarantee (DDSketch-style
+    logarithmic buckets). Every value x != 0 falls in bucket
+    ceil(log_gamma |x|) with gamma = (1 + a) / (1 - a); a quantile is
+    answered by its bucket's midpoint, which is within a relative error
+    `a` (relative_accuracy) of the order statistic at rank floor(q * (n - 1)),
+    the lower of the two that pandas' `quantile` interpolates between.
+
+    Buckets only add up, so partitions are merged exactly, and memory grows
+    with log(max / min), not with the number of values (about 1,200
+    buckets cover counts from 1 to 1e10 at a = 0.01).
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+
+    def _add(self, store: Dict[int, int], magnitudes: np.ndarray) -> None:
+        index = np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+        for i, n in zip(*np.unique(index, return_counts=True)):
+            store[int(i)] = store.get(int(i), 0) + int(n)
+
+    def update(self, values) -> "QuantileSketch":
+        """Add a chunk of values; NaNs are ignored like pandas' quantile"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self._add(self.positive, values[values > 0])
+        self._add(self.negative, -values[values < 0])
+        self.zeros += int((values == 0).sum())
+        self.count += len(values)
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if other.gamma != self.gamma:
+            raise ValueError("Only sketches with the same relative_accuracy can be merged")
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for i, n in other_store.items():
+                store[i] = store.get(i, 0) + n
+        self.zeros += other.zeros
+        self.count += other.count
+        return self
+
+    def _value(self, index: int) -> float:
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def quantiles(self, qs: Sequence[float]) -> List[float]:
+        """Approximate quantiles, in the order of `qs`"""
+        if self.count == 0:
+            return [float('nan')] * len(qs)
+        # Buckets in ascending value order: negatives by falling magnitude, zero, positives
+        values = ([-self._value(i) for i in sorted(self.negative, reverse=True)] + [0.0]
+                  + [self._value(i) for i in sorted(self.positive)])
+        counts = ([self.negative[i] for i in sorted(self.negative, reverse=True)] + [self.zeros]
+                  + [self.positive[i] for i in sorted(self.positive)])
+        cumulative = np.cumsum(counts)
+        ranks = np.asarray(qs, dtype=np.float64) * (self.count - 1)
+        return [values[int(np.searchsorted(cumulative, rank, side='right'))] for rank in ranks]
+
+    def quantile(self, q: float) -> float:
+        return self.quantiles([q])[0]
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[pd.DataFrame], column: str,
+                    relative_accuracy: float = 0.01) -> "QuantileSketch":
+        sketch = cls(relative_accuracy)
+        for chunk in chunks:
+            sketch.update(chunk[column])
+        return sketch
+
+
+def quantile_split(df: pd.DataFrame, col: str, q25: float, q75: float):
+    """low / mid / high parts of a frame (or chunk) for given split points"""
+    values = df[col]
+    return df[values <= q25], df[(values > q25) & (values <= q75)], df[values > q75]
+
+
+def zscore_filter(df: pd.DataFrame, moments: RunningMoments, z_thresh: float = 3.0) -> pd.DataFrame:
+    """Rows of a chunk with every column present and within z_thresh of the running moments"""
+    df = df.dropna(subset=moments.columns)
+    keep = (np.abs(moments.zscores(df)) < z_thresh).all(axis=1)
+    return df[keep]
@@ -0,0 +1,180 @@
+# src/youtube_first_hour/synthetic.py
+
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from .data import _has_pyarrow, is_columnar
+
+COUNTRIES = ['US', 'IN', 'BR', 'GB', 'ID', 'MX', 'JP', 'DE', 'KR', 'FR', 'RU', 'CA', 'PH', 'VN', 'TR',
+             'TH', 'ES', 'IT', 'AR', 'PK', 'NG', 'EG', 'CO', 'AU', 'PL', 'SA', 'BD', 'UA', 'MY', 'NL',
+             'KE', 'CL', 'PE', 'ZA', 'TW', 'SE', 'LK', 'NZ', 'IE', 'SG']
+CATEGORIES = [1.0, 2.0, 10.0, 15.0, 17.0, 19.0, 20.0, 22.0, 23.0, 24.0, 25.0, 26.0, 27.0, 28.0]
+# Relative upload volume by hour of day (UTC), peaking in the afternoon
+HOURLY_UPLOADS = 1 + 0.6 * np.sin(2 * np.pi * (np.arange(24) - 9) / 24)
+
+
+def _zipf_weights(n: int, exponent: float) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def _sample(rng: np.random.Generator, cumulative: np.ndarray, n: int) -> np.ndarray:
+    """Indices drawn with the probabilities whose running sum is `cumulative`"""
+    return np.minimum(np.searchsorted(cumulative, rng.random(n) * cumulative[-1]), len(cumulative) - 1)
+
+
+def _format_timestamps(seconds: np.ndarray, sep: str = ' ', suffix: str = '') -> np.ndarray:
+    """'YYYY-MM-DD{sep}HH:MM:SS{suffix}' strings of epoch seconds, written in place of NumPy's ISO text"""
+    text = np.datetime_as_string(seconds.astype('datetime64[s]'), unit='s').astype(f'U{19 + len(suffix)}')
+    chars = text.view(np.uint32).reshape(len(text), -1)
+    chars[:, 10] = ord(sep)
+    for i, char in enumerate(suffix):
+        chars[:, 19 + i] = ord(char)
+    return text
+
+
+def _join_tags(vocabulary: np.ndarray, ids: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Comma-joined tags of every row, where row i carries ids[offsets[i]:offsets[i + 1]]"""
+    if _has_pyarrow():
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        lists = pa.ListArray.from_arrays(pa.array(offsets, type=pa.int32()), pa.array(vocabulary[ids]))
+        return pc.binary_join(lists, ',').to_numpy(zero_copy_only=False)
+    rows = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    joined = pd.Series(vocabulary[ids]).groupby(rows).agg(','.join)
+    return joined.reindex(np.arange(len(offsets) - 1), fill_value='').to_numpy()
+
+
+class SyntheticVideoGenerator:
+    """
+    Seeded raw rows in the VideoData schema with the skew of real
+    collections, for tests and benchmarks at any scale:
+    - Zipfian channels: a few channels upload most videos, and the busiest
+      channels are also the ones with the most subscribers (log-normal);
+    - heavy-tailed views: log-normal in the channel's reach, with rare
+      Pareto-distributed viral videos; the initial snapshot is taken 1-59
+      minutes after publishing and the final one an hour later;
+    - many countries (Zipfian over 40) and categories, both mostly fixed
+      per channel; Zipfian tags, some videos untagged, some likes hidden.
+
+    The channel population depends on `seed` only. Rows are drawn per
+    chunk from (seed, chunk), so the same seed and chunk size always give
+    the same rows.
+    """
+
+    def __init__(self, seed: int = 0, n_channels: int = 100_000, n_tags: int = 5_000,
+                 start: str = '2025-08-01', days: int = 30):
+        self.seed = seed
+        self.days = days
+        self.start = int(pd.Timestamp(start).timestamp())
+        rng = np.random.default_rng(seed)
+
+        self.channel_cumulative = np.cumsum(_zipf_weights(n_channels, 0.8))
+        # Channel rank 0 uploads the most; reach follows rank loosely
+        subscribers = np.sort(rng.lognormal(np.log(2_000), 2.0, n_channels))[::-1]
+        self.subscribers = np.floor(subscribers * rng.lognormal(0, 0.5, n_channels))
+        self.channel_views = np.floor(self.subscribers * rng.lognormal(np.log(150), 1.0, n_channels))
+        self.channel_country = _sample(rng, np.cumsum(_zipf_weights(len(COUNTRIES), 1.0)), n_channels)
+        self.channel_category = rng.integers(0, len(CATEGORIES), n_channels)
+        self.channel_ids = np.char.add('UC', np.char.zfill(np.arange(n_channels).astype(str), 22))
+
+        self.tags = np.char.add('tag', np.arange(n_tags).astype(str)).astype(object)
+        self.tag_cumulative = np.cumsum(_zipf_weights(n_tags, 1.0))
+
+    def sample(self, n_rows: int, chunk: int = 0) -> pd.DataFrame:
+        """`n_rows` raw rows, the `chunk`-th block of this generator's stream"""
+        rng = np.random.default_rng([self.seed, chunk])
+        channel = _sample(rng, self.channel_cumulative, n_rows)
+        subscribers = self.subscribers[channel]
+
+        day = rng.integers(0, self.days, n_rows)
+        hour = _sample(rng, np.cumsum(HOURLY_UPLOADS), n_rows)
+        published = self.start + day * 86400 + hour * 3600 + rng.integers(0, 3600, n_rows)
+        logged_initial = published + rng.integers(60, 3600, n_rows)
+        logged_final = logged_initial + 3600
+
+        # Views expected by the final snapshot, of which the first minutes bring a share
+        reach = (subscribers + 10) ** 0.5 * rng.lognormal(0, 1.5, n_rows)
+        viral = rng.random(n_rows) < 0.01
+        reach[viral] *= 1 + rng.pareto(1.5, viral.sum()) * 5
+        minutes = (logged_initial - published) / 60
+        share = (minutes / (minutes + 60)) ** 0.8
+        views_initial = np.floor(reach * share)
+        views_final = views_initial + np.floor(reach * (1 - share) * rng.lognormal(0, 0.3, n_rows))
+
+        like_rate = rng.beta(2, 50, n_rows)
+        likes_final = np.floor(views_final * like_rate)
+        likes_initial = np.minimum(np.floor(views_initial * like_rate * rng.uniform(0.8, 1.2, n_rows)),
+                                   likes_final)
+        hidden = rng.random(n_rows) < 0.02
+        likes_initial[hidden] = likes_final[hidden] = np.nan
+        comment_rate = rng.beta(1.2, 400, n_rows)
+        comments_initial = np.floor(views_initial * comment_rate)
+        comments_final = np.maximum(np.floor(views_final * comment_rate), comments_initial)
+
+        category = np.where(rng.random(n_rows) < 0.85, self.channel_category[channel],
+                            rng.integers(0, len(CATEGORIES), n_rows))
+        country = np.where(rng.random(n_rows) < 0.9, self.channel_country[channel],
+                           rng.integers(0, len(COUNTRIES), n_rows))
+        # 0-12 tags per video, a fifth of videos untagged
+        n_tags = np.where(rng.random(n_rows) < 0.2, 0, rng.integers(1, 13, n_rows))
+        offsets = np.concatenate([[0], np.cumsum(n_tags)])
+        tag_ids = _sample(rng, self.tag_cumulative, int(offsets[-1]))
+
+        subscriber_growth = np.floor(subscribers * rng.exponential(1e-4, n_rows))
+        frame = pd.DataFrame({
+            'video_id': np.char.add(f'v{self.seed}_{chunk}_', np.arange(n_rows).astype(str)),
+            'published_at': _format_timestamps(published, 'T', 'Z'),
+            'category_id': np.asarray(CATEGORIES)[category],
+            'country': np.asarray(COUNTRIES)[country],
+            'tags': _join_tags(self.tags, tag_ids, offsets),
+            'definition': np.where(rng.random(n_rows) < 0.85, 'hd', 'sd'),
+            'channel_id': self.channel_ids[channel],
+            'channel_title': np.char.add('Channel ', channel.astype(str)),
+            'logged_at_initial': _format_timestamps(logged_initial),
+            'view_count_initial': views_initial,
+            'like_count_initial': likes_initial,
+            'comment_count_initial': comments_initial,
+            'c_view_count_initial': self.channel_views[channel],
+            'c_subscriber_count_initial': subscribers,
+            'logged_at_final': _format_timestamps(logged_final),
+            'view_count_final': views_final,
+            'like_count_final': likes_final,
+            'comment_count_final': comments_final,
+            'c_view_count_final': self.channel_views[channel] + views_final,
+            'c_subscriber_count_final': subscribers + subscriber_growth,
+        })
+        return frame
+
+    def iter_chunks(self, n_rows: int, chunk_rows: int = 1_000_000) -> Iterator[pd.DataFrame]:
+        """Yield `n_rows` rows in chunks so huge datasets never sit in memory"""
+        for chunk, start in enumerate(range(0, n_rows, chunk_rows)):
+            yield self.sample(min(chunk_rows, n_rows - start), chunk)
+
+    def write(self, path: str, n_rows: int, chunk_rows: int = 1_000_000) -> None:
+        """Write `n_rows` rows chunk by chunk to a CSV or Parquet file"""
+        writer = None
+        if is_columnar(path):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            from .data_loader import export_arrow_schema
+            schema = export_arrow_schema()
+            writer = pq.ParquetWriter(path, schema)
+        try:
+            for i, chunk in enumerate(self.iter_chunks(n_rows, chunk_rows)):
+                if writer is not None:
+                    writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                else:
+                    chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        finally:
+            if writer is not None:
+                writer.close()
+        print(f"[Synthetic] Wrote {n_rows} rows (seed {self.seed}) to {path}")
+
+
+def synthetic_videos(n_rows: int, seed: int = 0, n_channels: Optional[int] = None) -> pd.DataFrame:
+    """`n_rows` raw rows from a SyntheticVideoGenerator (channels default to one per 20 rows, 100-100k)"""
+    n_channels = n_channels or int(np.clip(n_rows // 20, 100, 100_000))
+    return SyntheticVideoGenerator(seed, n_channels=n_channels).sample(n_rows)
@@ -0,0 +1,220 @@
+# src/youtube_first_hour/tag_features.py
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from .data import _has_pyarrow
+
+TAG_SEPARATOR = ','
+
+
+def tokenize_tags(tags: pd.Series) -> Tuple[np.ndarray, Any]:
+    """
+    (row position, tag) of every tag in a column of comma-separated tag
+    strings: trimmed, lower-cased, empty tags dropped. With pyarrow the
+    split runs in Arrow compute kernels and the tags stay an Arrow array;
+    without it pandas' vectorised string methods are used.
+    """
+    if _has_pyarrow():
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        values = pa.array(tags, type=pa.string(), from_pandas=True)
+        if isinstance(values, pa.ChunkedArray):
+            values = values.combine_chunks()
+        lists = pc.split_pattern(values, TAG_SEPARATOR)
+        tokens = pc.utf8_lower(pc.utf8_trim_whitespace(pc.list_flatten(lists)))
+        rows = pc.list_parent_indices(lists).to_numpy()
+        keep = pc.greater(pc.utf8_length(tokens), 0)
+        return rows[keep.to_numpy(zero_copy_only=False)], tokens.filter(keep)
+    split = tags.reset_index(drop=True).str.split(TAG_SEPARATOR).explode().dropna()
+    tokens = split.str.strip().str.lower()
+    keep = (tokens != '').to_numpy()
+    return split.index.to_numpy()[keep], tokens.to_numpy()[keep]
+
+
+def _value_counts(tokens) -> Dict[str, int]:
+    if isinstance(tokens, np.ndarray):
+        return pd.Series(tokens).value_counts().to_dict()
+    import pyarrow.compute as pc
+    counts = pc.value_counts(tokens)
+    return dict(zip(counts.field('values').to_pylist(), counts.field('counts').to_pylist()))
+
+
+def _lookup(tokens, vocabulary: List[str]) -> np.ndarray:
+    """Vocabulary index of every tag, -1 for tags outside it"""
+    if isinstance(tokens, np.ndarray):
+        return pd.Index(vocabulary).get_indexer(tokens)
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    index = pc.index_in(tokens, value_set=pa.array(vocabulary, type=pa.string()))
+    return index.fill_null(-1).to_numpy().astype(np.int64)
+
+
+class TagCounter:
+    """
+    Streaming heavy-hitter counter (Misra-Gries) over tag chunks. At most
+    `capacity` tags are tracked; whenever a chunk pushes past that, every
+    count drops by the (capacity + 1)-th largest one and tags at zero are
+    forgotten. Any tag seen more than total / capacity times survives, with
+    its count underestimated by at most `error`. Counters of partitions merge.
+    """
+
+    def __init__(self, capacity: int = 10_000):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.total = 0
+        self.error = 0
+
+    def _add(self, counts: Dict[str, int]) -> None:
+        for tag, n in counts.items():
+            self.counts[tag] = self.counts.get(tag, 0) + n
+        if len(self.counts) > self.capacity:
+            cut = np.partition(np.fromiter(self.counts.values(), dtype=np.int64),
+                               len(self.counts) - self.capacity - 1)[len(self.counts) - self.capacity - 1]
+            self.counts = {tag: n - cut for tag, n in self.counts.items() if n > cut}
+            self.error += int(cut)
+
+    def update(self, tokens) -> "TagCounter":
+        counts = _value_counts(tokens)
+        self.total += sum(counts.values())
+        self._add(counts)
+        return self
+
+    def merge(self, other: "TagCounter") -> "TagCounter":
+        self.total += other.total
+        self.error += other.error
+        self._add(other.counts)
+        return self
+
+    def most_common(self, k: int, min_count: int = 1) -> List[str]:
+        """Top-k tags by (lower-bound) count, ties broken alphabetically"""
+        ranked = sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))
+        return [tag for tag, n in ranked[:k] if n >= min_count]
+
+
+class TagFeatureBuilder:
+    """
+    Tag features for the boosters, kept sparse end to end:
+    - a CSR indicator matrix over the top `max_tags` tags (by a streaming
+      TagCounter pass), so memory grows with the number of tags, not
+      rows x vocabulary;
+    - per-tag target statistics: the mean log1p target of the training
+      rows carrying the tag, shrunk towards the global mean by `smoothing`
+      pseudo-rows, summarised per row as the mean over its tags.
+    The statistics come from the rows `fit` sees; fit on the training split
+    only, or they leak the validation targets.
+    """
+
+    def __init__(self, max_tags: int = 1000, min_count: int = 5, smoothing: float = 20.0,
+                 capacity: Optional[int] = None, chunk_rows: int = 200_000):
+        self.max_tags = max_tags
+        self.min_count = min_count
+        self.smoothing = smoothing
+        self.capacity = capacity or 10 * max_tags
+        self.chunk_rows = chunk_rows
+        self.vocabulary: List[str] = []
+        self.target_columns: List[str] = []
+        self.global_mean: Optional[np.ndarray] = None
+        self.tag_means: Optional[np.ndarray] = None
+
+    def fit(self, tags: pd.Series, y: Optional[pd.DataFrame] = None) -> "TagFeatureBuilder":
+        counter = TagCounter(self.capacity)
+        for start in range(0, len(tags), self.chunk_rows):
+            counter.update(tokenize_tags(tags.iloc[start:start + self.chunk_rows])[1])
+        self.vocabulary = counter.most_common(self.max_tags, self.min_count)
+        print(f"[Tags] Kept {len(self.vocabulary)} tags out of {counter.total} tag occurrences")
+        if y is not None:
+            self._fit_target_stats(tags, y)
+        return self
+
+    def _fit_target_stats(self, tags: pd.Series, y: pd.DataFrame) -> None:
+        self.target_columns = list(y.columns)
+        y_log = np.log1p(y.to_numpy(dtype=np.float64))
+        self.global_mean = y_log.mean(axis=0)
+        sums = np.zeros((len(self.vocabulary), y_log.shape[1]))
+        counts = np.zeros(len(self.vocabulary))
+        for start in range(0, len(tags), self.chunk_rows):
+            indicators = self.transform(tags.iloc[start:start + self.chunk_rows])
+            sums += indicators.T @ y_log[start:start + self.chunk_rows]
+            counts += np.asarray(indicators.sum(axis=0)).ravel()
+        self.tag_means = (sums + self.smoothing * self.global_mean) / (counts + self.smoothing)[:, None]
+
+    def _encode(self, tags: pd.Series) -> Tuple[sp.csr_matrix, np.ndarray]:
+        """Indicator matrix of the known tags and the number of tags (known or not) of every row"""
+        rows, tokens = tokenize_tags(tags)
+        ids = _lookup(tokens, self.vocabulary)
+        known = ids >= 0
+        # Built from (row, column) pairs: memory is O(tags), a repeated tag counts once
+        matrix = sp.csr_matrix((np.ones(known.sum(), dtype=np.float32), (rows[known], ids[known])),
+                               shape=(len(tags), len(self.vocabulary)))
+        matrix.data[:] = 1.0
+        return matrix, np.bincount(rows, minlength=len(tags))
+
+    def transform(self, tags: pd.Series) -> sp.csr_matrix:
+        """rows x vocabulary 0/1 matrix of the known tags of every row"""
+        return self._encode(tags)[0]
+
+    def summary_columns(self) -> List[str]:
+        return ['tag_count', 'known_tag_count'] + [f'tag_mean_log_{col}' for col in self.target_columns]
+
+    def summary(self, indicators: sp.csr_matrix, tag_count: np.ndarray) -> np.ndarray:
+        """Dense per-row tag count, known tag count and mean tag statistics (NaN without known tags)"""
+        known = np.diff(indicators.indptr)
+        columns = [tag_count, known]
+        if self.tag_means is not None:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                columns.extend((indicators @ self.tag_means).T / known)
+        return np.column_stack(columns).astype(np.float32)
+
+    def feature_names(self, dense_columns: List[str]) -> List[str]:
+        return list(dense_columns) + self.summary_columns() + [f'tag_{i}' for i in range(len(self.vocabulary))]
+
+    def columns(self, tags: pd.Series) -> Dict[str, np.ndarray]:
+        """
+        Tag summaries and indicators by feature name, for dense scoring. A
+        tag the row lacks is NaN: transform_frame leaves it unstored, which
+        xgboost reads as missing, not as 0.
+        """
+        indicators, tag_count = self._encode(tags)
+        columns = dict(zip(self.summary_columns(), self.summary(indicators, tag_count).T))
+        present = np.where(indicators.toarray() > 0, np.float32(1), np.float32(np.nan))
+        columns.update((f'tag_{i}', present[:, i]) for i in range(len(self.vocabulary)))
+        return columns
+
+    def transform_frame(self, X: pd.DataFrame, tags: pd.Series) -> sp.csr_matrix:
+        """
+        Dense features, tag summaries and tag indicators side by side as one
+        CSR matrix for xgboost. The dense part is stored explicitly, zeros
+        included: xgboost treats only unstored entries as missing.
+        """
+        indicators, tag_count = self._encode(tags)
+        dense = np.hstack([X.to_numpy(dtype=np.float32), self.summary(indicators, tag_count)])
+        n_rows, n_dense = dense.shape
+        dense_part = sp.csr_matrix((dense.ravel(), np.tile(np.arange(n_dense), n_rows),
+                                    np.arange(n_rows + 1) * n_dense), shape=dense.shape)
+        return sp.hstack([dense_part, indicators], format='csr')
+
+    @classmethod
+    def from_metadata(cls, metadata: Dict[str, Any]) -> "TagFeatureBuilder":
+        """Fitted builder from the output of `metadata`"""
+        builder = cls(max_tags=max(1, len(metadata['vocabulary'])), smoothing=metadata['smoothing'])
+        builder.vocabulary = list(metadata['vocabulary'])
+        builder.target_columns = list(metadata['target_columns'])
+        if metadata['tag_means'] is not None:
+            builder.global_mean = np.asarray(metadata['global_mean'], dtype=np.float64)
+            builder.tag_means = np.asarray(metadata['tag_means'], dtype=np.float64).reshape(
+                len(builder.vocabulary), len(builder.target_columns))
+        return builder
+
+    def metadata(self) -> Dict[str, Any]:
+        """Vocabulary and statistics scoring needs to rebuild the tag columns"""
+        return {
+            'vocabulary': self.vocabulary,
+            'target_columns': self.target_columns,
+            'smoothing': self.smoothing,
+            'global_mean': None if self.global_mean is None else self.global_mean.tolist(),
+            'tag_means': None if self.tag_means is None else self.tag_means.tolist(),
+        }
@@ -0,0 +1,136 @@
+# src/youtube_first_hour/time_features.py
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Tuple
+
+# Fast-path layout: 'YYYY-MM-DDTHH:MM:SS' (or a space instead of 'T'), then
+# optionally a fraction and a 'Z' - the format the YouTube Data API returns
+_WIDTH = 32
+_FIELDS = {'year': (0, 4), 'month': (5, 7), 'day': (8, 10),
+           'hour': (11, 13), 'minute': (14, 16), 'second': (17, 19)}
+
+COMPONENTS = list(_FIELDS) + ['weekday']
+# Days per month (index 0 unused); February gains a day in leap years
+_MONTH_DAYS = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], dtype=np.int32)
+
+
+def _days_since_epoch(year: np.ndarray, month: np.ndarray, day: np.ndarray) -> np.ndarray:
+    """Days from 1970-01-01 to civil dates, fully vectorised"""
+    y = year - (month <= 2)
+    era = y // 400
+    yoe = y - era * 400
+    doy = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def _month_length(year: np.ndarray, month: np.ndarray) -> np.ndarray:
+    """Days in each month (month outside 1-12 gives 0), leap years included"""
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    inside = (month >= 1) & (month <= 12)
+    return np.where(inside, _MONTH_DAYS[np.where(inside, month, 0)] + (leap & (month == 2)), 0)
+
+
+def _weekday(year: np.ndarray, month: np.ndarray, day: np.ndarray) -> np.ndarray:
+    """Day of week (Monday=0) from civil dates, fully vectorised"""
+    # 1970-01-01 was a Thursday
+    return (_days_since_epoch(year, month, day) + 3) % 7
+
+
+def _parse_fixed_width(values: np.ndarray):
+    """
+    Read ISO-8601 timestamps digit by digit from their bytes.
+    Returns the components and a mask of the rows that matched the layout;
+    everything else (UTC offsets, other layouts, missing values) is left
+    for the pandas fallback.
+    """
+    raw = np.asarray(values, dtype=f'S{_WIDTH}')
+    b = raw.view(np.uint8).reshape(len(raw), _WIDTH)
+
+    ok = (b[:, 4] == ord('-')) & (b[:, 7] == ord('-'))
+    ok &= (b[:, 10] == ord('T')) | (b[:, 10] == ord(' '))
+    ok &= (b[:, 13] == ord(':')) & (b[:, 16] == ord(':'))
+
+    # After the seconds only '', 'Z' or '.fff[Z]' may follow (no offsets),
+    # and the string must not have been cut off at _WIDTH
+    first = b[:, 19]
+    ok &= (first == 0) | (first == ord('.')) | (first == ord('Z'))
+    rest = b[:, 20:]
+    ok &= ((rest - np.uint8(ord('0')) < 10) | (rest == 0) | (rest == ord('Z'))).all(axis=1)
+    ok &= b[:, -1] == 0
+
+    parts = {}
+    for name, (start, stop) in _FIELDS.items():
+        value = np.zeros(len(raw), dtype=np.int32)
+        for i in range(start, stop):
+            digit = b[:, i] - np.uint8(ord('0'))
+            ok &= digit < 10
+            value = value * 10 + digit
+        parts[name] = value
+
+    # Impossible dates (Feb 30, Apr 31, Feb 29 off leap years) and leap
+    # seconds are left to the fallback, which turns them into NaT
+    ok &= (parts['day'] >= 1) & (parts['day'] <= _month_length(parts['year'], parts['month']))
+    ok &= (parts['hour'] < 24) & (parts['minute'] < 60) & (parts['second'] < 60)
+    return parts, ok
+
+
+def time_components(values) -> Dict[str, np.ndarray]:
+    """
+    Integer calendar components of a timestamp column, parsed once.
+    Returns int32 arrays for COMPONENTS (weekday: Monday=0) plus a 'valid'
+    boolean mask; components of missing or unparseable rows are 0.
+    - datetime64 columns (e.g. from Parquet) use their fields directly
+    - API ISO-8601 strings take a vectorised fixed-width fast path
+    - anything else falls back to pd.to_datetime, converted to UTC
+    """
+    if isinstance(values, pd.Series) and pd.api.types.is_datetime64_any_dtype(values):
+        dt = values.dt
+        parts = {name: getattr(dt, name).fillna(0).to_numpy(dtype=np.int64) for name in _FIELDS}
+        parts['weekday'] = dt.dayofweek.fillna(0).to_numpy(dtype=np.int64)
+        return _finish(parts, values.notna().to_numpy())
+    if isinstance(values, np.ndarray) and values.dtype.kind == 'M':
+        return time_components(pd.Series(values))
+
+    # Plain object arrays from here on: small (online) batches skip pandas entirely
+    raw = values.to_numpy(dtype=object) if isinstance(values, pd.Series) else np.asarray(values, dtype=object)
+    n = len(raw)
+    try:
+        parts, valid = _parse_fixed_width(raw)
+    except UnicodeEncodeError:
+        parts = {name: np.zeros(n, dtype=np.int32) for name in _FIELDS}
+        valid = np.zeros(n, dtype=bool)
+
+    fallback = ~valid & ~pd.isna(raw)
+    if fallback.any():
+        parsed = pd.to_datetime(pd.Series(raw[fallback]), errors='coerce', utc=True, format='mixed')
+        parsed_ok = parsed.notna().to_numpy()
+        rows = np.flatnonzero(fallback)[parsed_ok]
+        for name in _FIELDS:
+            parts[name][rows] = getattr(parsed.dt, name).to_numpy()[parsed_ok]
+        valid[rows] = True
+
+    parts['weekday'] = _weekday(parts['year'], parts['month'], parts['day'])
+    return _finish(parts, valid)
+
+
+def _finish(parts: Dict[str, np.ndarray], valid: np.ndarray) -> Dict[str, np.ndarray]:
+    out = {name: np.where(valid, parts[name], 0).astype(np.int32) for name in COMPONENTS}
+    out['valid'] = valid
+    return out
+
+
+def epoch_seconds(values) -> Tuple[np.ndarray, np.ndarray]:
+    """Seconds since 1970-01-01 UTC (int64) of a timestamp column and its 'valid' mask, via time_components"""
+    parts = {name: value.astype(np.int64) for name, value in time_components(values).items()}
+    days = _days_since_epoch(parts['year'], parts['month'], parts['day'])
+    seconds = days * 86400 + parts['hour'] * 3600 + parts['minute'] * 60 + parts['second']
+    return seconds, parts['valid'].astype(bool)
+
+
+def as_feature(component: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """Integer column when every row parsed, float with NaN for the others otherwise"""
+    if valid.all():
+        return component
+    return np.where(valid, component, np.nan)
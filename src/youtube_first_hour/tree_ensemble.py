@@ -0,0 +1,168 @@
+# src/youtube_first_hour/tree_ensemble.py
+
+import numpy as np
+from typing import Dict, List, Optional
+
+# Rows x trees node positions evaluated at once; keeps the working set in cache
+_CHUNK_ELEMENTS = 1 << 18
+
+
+class TreeEnsemble:
+    """
+    Gradient-boosted trees flattened into contiguous NumPy arrays, predicted
+    without xgboost (see `model_training.export_tree_arrays`).
+
+    Every tree's nodes share one global layout: split feature, float32
+    threshold, left/right child, the child taken on a missing value, and the
+    leaf value. Leaves point at themselves, so all trees of all targets are
+    walked together, one level per step, for a whole batch of rows.
+    """
+
+    ARRAYS = ['feature', 'threshold', 'children', 'missing_child', 'value',
+              'roots', 'tree_target', 'base_score', 'feature_names']
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, children: np.ndarray,
+                 missing_child: np.ndarray, value: np.ndarray, roots: np.ndarray,
+                 tree_target: np.ndarray, base_score: np.ndarray, feature_names: np.ndarray):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.missing_child = missing_child
+        self.value = value
+        self.roots = roots
+        self.tree_target = tree_target
+        self.base_score = base_score
+        self.feature_names = feature_names
+        self.n_targets = len(base_score)
+        self.depth = self._max_depth()
+        # Leaf sums per target as one matrix product
+        self._target_matrix = np.zeros((len(roots), self.n_targets), dtype=np.float64)
+        self._target_matrix[np.arange(len(roots)), tree_target] = 1.0
+
+    def _max_depth(self) -> int:
+        """Levels below the deepest root, i.e. steps until every row sits on a leaf"""
+        frontier = self.roots
+        depth = 0
+        while True:
+            internal = frontier[self.children[frontier, 0] != frontier]
+            if not len(internal):
+                return depth
+            frontier = self.children[internal].ravel()
+            depth += 1
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Raw predictions (rows x targets) for a float feature matrix"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != len(self.feature_names):
+            raise ValueError(f"Expected {len(self.feature_names)} feature columns, got shape {X.shape}")
+        out = np.empty((len(X), self.n_targets), dtype=np.float32)
+        step = max(1, _CHUNK_ELEMENTS // max(1, len(self.roots)))
+        for start in range(0, len(X), step):
+            out[start:start + step] = self._predict_chunk(X[start:start + step])
+        return out
+
+    def _predict_chunk(self, X: np.ndarray) -> np.ndarray:
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        row_offset = (np.arange(n_rows, dtype=np.intp) * n_features)[:, None]
+        children = self.children.ravel()
+        has_missing = np.isnan(flat).any()
+
+        node = np.broadcast_to(self.roots.astype(np.intp), (n_rows, len(self.roots))).copy()
+        for _ in range(self.depth):
+            x = flat[row_offset + self.feature[node]]
+            # Same test as xgboost: left when x < threshold (NaN compares False)
+            go_right = ~(x < self.threshold[node])
+            nxt = children[2 * node + go_right]
+            if has_missing:
+                nxt = np.where(np.isnan(x), self.missing_child[node], nxt)
+            node = nxt
+
+        margin = self.value[node].astype(np.float64) @ self._target_matrix
+        return (margin + self.base_score).astype(np.float32)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+    def save(self, filepath: str) -> None:
+        """Save the arrays as an uncompressed .npz archive"""
+        np.savez(filepath, **self.to_arrays())
+
+    @classmethod
+    def load(cls, filepath: str) -> "TreeEnsemble":
+        with np.load(filepath, allow_pickle=False) as arrays:
+            return cls(**{name: arrays[name] for name in cls.ARRAYS})
+
+    @classmethod
+    def from_trees(cls, trees: List[dict], tree_target: List[int], base_score: List[float],
+                   feature_names: Optional[List[str]], n_features: int) -> "TreeEnsemble":
+        """
+        Build from xgboost's JSON tree dicts (`Booster.save_raw('json')`):
+        left_children, right_children, split_indices, split_conditions
+        (leaf values on leaves) and default_left.
+        """
+        feature, threshold, children, missing_child, value, roots = [], [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            left = np.asarray(tree['left_children'], dtype=np.int64)
+            right = np.asarray(tree['right_children'], dtype=np.int64)
+            conditions = np.asarray(tree['split_conditions'], dtype=np.float32)
+            is_leaf = left == -1
+            own = np.arange(len(left), dtype=np.int64)
+            left = np.where(is_leaf, own, left) + offset
+            right = np.where(is_leaf, own, right) + offset
+
+            feature.append(np.where(is_leaf, 0, tree['split_indices']).astype(np.int32))
+            threshold.append(np.where(is_leaf, 0, conditions).astype(np.float32))
+            children.append(np.stack([left, right], axis=1))
+            missing_child.append(np.where(np.asarray(tree['default_left'], dtype=bool), left, right))
+            value.append(np.where(is_leaf, conditions, 0).astype(np.float32))
+            roots.append(offset)
+            offset += len(left)
+
+        names = feature_names or [f"f{i}" for i in range(n_features)]
+        return cls(
+            feature=np.concatenate(feature),
+            threshold=np.concatenate(threshold),
+            children=np.concatenate(children).astype(np.intp),
+            missing_child=np.concatenate(missing_child).astype(np.intp),
+            value=np.concatenate(value),
+            roots=np.asarray(roots, dtype=np.intp),
+            tree_target=np.asarray(tree_target, dtype=np.intp),
+            base_score=np.asarray(base_score, dtype=np.float64),
+            feature_names=np.asarray(names, dtype=str),
+        )
+
+    @classmethod
+    def blend(cls, ensembles: List["TreeEnsemble"], weights: np.ndarray, intercept: np.ndarray) -> "TreeEnsemble":
+        """
+        One ensemble predicting intercept + sum_i weights[i] * ensembles[i]
+        per target: the weights are folded into the leaf values, so a linear
+        blend of tree models costs a single traversal.
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        feature, threshold, children, missing_child, value, roots, tree_target = [], [], [], [], [], [], []
+        base_score = np.asarray(intercept, dtype=np.float64).copy()
+        offset = 0
+        for ensemble, w in zip(ensembles, weights):
+            node_tree = np.searchsorted(ensemble.roots, np.arange(len(ensemble.value)), side='right') - 1
+            feature.append(ensemble.feature)
+            threshold.append(ensemble.threshold)
+            children.append(ensemble.children + offset)
+            missing_child.append(ensemble.missing_child + offset)
+            value.append((ensemble.value * w[ensemble.tree_target[node_tree]]).astype(np.float32))
+            roots.append(ensemble.roots + offset)
+            tree_target.append(ensemble.tree_target)
+            base_score += w * ensemble.base_score
+            offset += len(ensemble.value)
+        return cls(
+            feature=np.concatenate(feature),
+            threshold=np.concatenate(threshold),
+            children=np.concatenate(children).astype(np.intp),
+            missing_child=np.concatenate(missing_child).astype(np.intp),
+            value=np.concatenate(value),
+            roots=np.concatenate(roots).astype(np.intp),
+            tree_target=np.concatenate(tree_target).astype(np.intp),
+            base_score=base_score,
+            feature_names=ensembles[0].feature_names,
+        )
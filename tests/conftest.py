@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+from youtube_first_hour.features import YouTubeFeatureEngineer
+from youtube_first_hour.model_training import QuantileModelTrainer
+from youtube_first_hour.preprocessing import YouTubePreprocessor
+from youtube_first_hour.serving import FirstHourPredictor
+
+TARGETS = ['like_count_initial', 'like_count_final', 'view_count_initial', 'view_count_final']
+
+
+def _make_videos(n_rows: int = 10) -> pd.DataFrame:
+    """Several videos spread over a few channels and categories"""
+    rows = []
+    for i in range(n_rows):
+        rows.append({
+            'video_id': f'vid_{i}',
+            'published_at': f'2025-08-0{1 + i % 7} {10 + i % 12}:{i % 60:02d}:07',
+            'category_id': [22.0, 10.0, 24.0][i % 3],
+            'country': ['US', 'GB', 'IN'][i % 3],
+            'tags': 'comedy,funny',
+            'definition': 'hd' if i % 2 else 'sd',
+            'channel_id': f'UC{i % 4}',
+            'channel_title': f'Channel {i % 4}',
+            'logged_at_initial': '2025-08-01 15:01:29',
+            'view_count_initial': 50.0 + i,
+            'like_count_initial': 3.0 + i,
+            'comment_count_initial': 0.0,
+            'c_view_count_initial': 740384.0 + i,
+            'c_subscriber_count_initial': 11400.0 * (1 + i % 4),
+            'logged_at_final': '2025-08-01 16:00:04',
+            'view_count_final': 500.0 + 7 * i,
+            'like_count_final': 29.0 + 2 * i,
+            'comment_count_final': 6.0,
+            'c_view_count_final': 741634.0 + i,
+            'c_subscriber_count_final': 11400.0 * (1 + i % 4)
+        })
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def make_videos():
+    """`make_videos(n_rows)`: raw rows in the VideoData schema"""
+    return _make_videos
+
+
+@pytest.fixture
+def targets():
+    return list(TARGETS)
+
+
+@pytest.fixture
+def training_frame(tmp_path, monkeypatch, make_videos, targets):
+    """`training_frame(n)`: engineered, preprocessed and prepared rows, ready to fit"""
+    monkeypatch.chdir(tmp_path)
+
+    def build(n=120):
+        df = YouTubePreprocessor().preprocess(YouTubeFeatureEngineer().process_all_features(make_videos(n)))
+        return QuantileModelTrainer(targets).prepare_features(df)
+    return build
+
+
+@pytest.fixture
+def trained(tmp_path, monkeypatch, make_videos, targets):
+    """Small model trained through the package pipeline, saved with its tables: (raw, X, trainer, predictor)"""
+    monkeypatch.chdir(tmp_path)
+    raw = make_videos(40)
+    fe = YouTubeFeatureEngineer()
+    df = YouTubePreprocessor().preprocess(fe.process_all_features(raw))
+    trainer = QuantileModelTrainer(targets, n_jobs=1)
+    df = trainer.prepare_features(df)
+    X, y = df.drop(columns=targets), df[targets]
+    trainer.fit(X, y, {'n_estimators': 20, 'max_depth': 3, 'random_state': 0})
+    trainer.save(str(tmp_path / 'model.joblib'))
+    fe.save(str(tmp_path / 'tables.npz'))
+    predictor = FirstHourPredictor.load(str(tmp_path / 'model.joblib'), str(tmp_path / 'tables.npz'))
+    return raw, X, trainer, predictor
@@ -0,0 +1,26 @@
+import pandas as pd
+from youtube_first_hour.aggregate_store import AggregateStore
+from youtube_first_hour.features import YouTubeFeatureEngineer, GroupStatsAccumulator
+
+
+def test_hourly_updates_match_full_recompute(tmp_path, make_videos):
+    raw = make_videos(12)
+    full = YouTubeFeatureEngineer()
+    expected = full.process_all_features(raw)
+
+    with AggregateStore(str(tmp_path / 'agg.sqlite')) as store:
+        for hour, batch in enumerate([raw.iloc[:5], raw.iloc[5:9], raw.iloc[9:]]):
+            assert store.update(batch, batch_id=f'hour-{hour}')
+        # Re-sending an hour must not double count it
+        assert not store.update(raw.iloc[:5], batch_id='hour-0')
+
+        stats = GroupStatsAccumulator()
+        stats.update(full._create_target_variables(raw.copy()))
+        assert store.verify(stats) == {'categories': 0, 'channels': 0, 'first_subscriber_count': 0}
+
+        new_hour = raw.iloc[:3]
+        result = store.feature_engineer(new_hour).transform(new_hour)
+
+    pd.testing.assert_series_equal(result['channel_avg_views'], expected['channel_avg_views'].iloc[:3])
+    pd.testing.assert_series_equal(result['avg_view_diff_per_category'],
+                                   expected['avg_view_diff_per_category'].iloc[:3])
@@ -0,0 +1,36 @@
+import json
+
+import numpy as np
+import pytest
+from sklearn.preprocessing import StandardScaler
+from youtube_first_hour.artifacts import load_bundle, map_arrays
+from youtube_first_hour.features import YouTubeFeatureEngineer
+from youtube_first_hour.serving import FirstHourPredictor
+
+
+def test_bundle_round_trip_is_memory_mapped(tmp_path, trained):
+    raw, X, trainer, _ = trained
+    scaler = StandardScaler().fit(X[['c_view_count_initial', 'channel_avg_views']])
+    tables = YouTubeFeatureEngineer.load(str(tmp_path / 'tables.npz'))
+    bundle = str(tmp_path / 'bundle')
+    trainer.export_bundle(bundle, tables, scaler)
+
+    trainer.export_trees(str(tmp_path / 'trees.npz'))
+    expected = FirstHourPredictor(FirstHourPredictor.load(str(tmp_path / 'trees.npz'),
+                                                          str(tmp_path / 'tables.npz')).ensemble,
+                                  trainer.metadata(), tables, scaler)
+    records = raw.to_dict('records')
+    predictor = load_bundle(bundle)
+    np.testing.assert_array_equal(predictor.features(records), expected.features(records))
+    np.testing.assert_array_equal(predictor.predict_array(records), expected.predict_array(records))
+
+    arrays = map_arrays(bundle)
+    assert not arrays['tree__threshold'].flags.writeable
+    assert all(spec['offset'] % 64 == 0 for spec in json.load(open(f"{bundle}/manifest.json"))['arrays'].values())
+
+    # A manifest that no longer matches its schema hash is refused
+    manifest = json.load(open(f"{bundle}/manifest.json"))
+    manifest['feature_columns'] = manifest['feature_columns'][::-1]
+    json.dump(manifest, open(f"{bundle}/manifest.json", "w"))
+    with pytest.raises(ValueError, match="schema hash"):
+        load_bundle(bundle)
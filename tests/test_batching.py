@@ -0,0 +1,92 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+from youtube_first_hour.batching import MicroBatcher
+
+
+def _double(records):
+    time.sleep(0.002)
+    if any(r < 0 for r in records):
+        raise ValueError("negative record")
+    return np.asarray(records, dtype=float)[:, None] * 2
+
+
+def test_concurrent_requests_share_batches():
+    results = {}
+    with MicroBatcher(_double, max_batch_size=16, max_wait_ms=5) as batcher:
+        def caller(i):
+            results[i] = batcher.predict([i])[0, 0]
+        threads = [threading.Thread(target=caller, args=(i,)) for i in range(64)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        np.testing.assert_array_equal(batcher.predict(list(range(40))).ravel(), np.arange(40) * 2)
+
+        # A bad record fails only its own caller
+        bad, good = batcher.submit(-1), batcher.submit(3)
+        with pytest.raises(ValueError):
+            bad.result()
+        assert good.result()[0] == 6
+        metrics = batcher.metrics.snapshot()
+
+    assert results == {i: 2 * i for i in range(64)}
+    assert metrics['requests'] == 64 + 40 + 1
+    assert metrics['batches'] < metrics['requests']
+    assert max(int(k) for k in metrics['batch_size']['histogram']) <= 16
+    assert metrics['queue_wait_ms']['p50'] >= 0
+
+
+def test_close_resolves_every_accepted_request():
+    batcher = MicroBatcher(_double, max_batch_size=8, max_wait_ms=1)
+    accepted, refused = [], []
+
+    def caller():
+        for i in range(200):
+            try:
+                accepted.append(batcher.submit(i))
+            except RuntimeError:
+                refused.append(i)
+                return
+
+    threads = [threading.Thread(target=caller) for _ in range(4)]
+    for t in threads:
+        t.start()
+    time.sleep(0.01)
+    batcher.close()
+    for t in threads:
+        t.join()
+
+    # Whatever submit accepted was scored before the batching thread stopped
+    assert all(future.done() for future in accepted)
+    assert len(accepted) + len(refused) > 0
+    with pytest.raises(RuntimeError):
+        batcher.submit(1)
+
+
+def test_cancelled_and_short_batches_keep_the_thread_alive():
+    release = threading.Event()
+
+    def slow(records):
+        release.wait()
+        return _double(records)
+
+    with MicroBatcher(slow, max_batch_size=4, max_wait_ms=1) as batcher:
+        first = batcher.submit(1)
+        time.sleep(0.05)
+        # Queued behind the running batch: cancelled before it is dispatched
+        cancelled, kept = batcher.submit(2), batcher.submit(3)
+        assert cancelled.cancel()
+        release.set()
+        assert first.result(timeout=5)[0] == 2 and kept.result(timeout=5)[0] == 6
+
+        # A predict_fn returning too few rows fails its batch, not the thread
+        batcher.predict_fn = lambda records: _double(records)[:-1]
+        short = [batcher.submit(i) for i in range(3)]
+        for future in short:
+            with pytest.raises(ValueError, match="rows for"):
+                future.result(timeout=5)
+        batcher.predict_fn = _double
+        assert batcher.submit(5).result(timeout=5)[0] == 10
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+import xgboost as xgb
+from youtube_first_hour.blending import StackingTrainer, make_estimator
+
+LEARNERS = {
+    'xgb_shallow': ('xgboost', {'n_estimators': 20, 'max_depth': 2, 'random_state': 0}),
+    'xgb_deep': ('xgboost', {'n_estimators': 20, 'max_depth': 4, 'random_state': 0}),
+}
+
+
+def test_stack_reuses_cached_oof_and_compiles(tmp_path, targets, training_frame):
+    df = training_frame(n=60)
+    X, y = df.drop(columns=targets), df[targets]
+
+    trainer = StackingTrainer(targets, dict(LEARNERS), cache_dir=str(tmp_path / 'oof'), n_folds=3)
+    stack = trainer.fit(X, y)
+    assert trainer.computed == ['xgb_shallow', 'xgb_deep']
+
+    # Re-tuning one learner retrains only that learner
+    learners = dict(LEARNERS, xgb_deep=('xgboost', {'n_estimators': 30, 'max_depth': 4, 'random_state': 0}))
+    retuned = StackingTrainer(targets, learners, cache_dir=str(tmp_path / 'oof'), n_folds=3)
+    stack = retuned.fit(X, y)
+    assert retuned.computed == ['xgb_deep']
+
+    # Hand-computed blend of base learners fitted independently, one booster per target
+    y_log = np.log1p(y.to_numpy(dtype=float))
+    expected = np.tile(stack.intercept, (len(X), 1))
+    for i, (_, params) in enumerate(learners.values()):
+        for t in range(len(targets)):
+            booster = xgb.XGBRegressor(**params, n_jobs=1).fit(X, y_log[:, t])
+            expected[:, t] += stack.weights[i, t] * booster.predict(X)
+    np.testing.assert_allclose(stack.predict(X), expected, rtol=1e-5)
+    compiled = stack.to_tree_ensemble().predict(X.to_numpy(dtype=np.float32))
+    np.testing.assert_allclose(compiled, expected, rtol=1e-4, atol=1e-4)
+
+
+def test_make_estimator_thread_count_overrides_params():
+    model = make_estimator('xgboost', {'n_estimators': 5, 'n_jobs': 8}, n_jobs=2)
+    assert model.estimator.get_params()['n_jobs'] == 2
+    forest = make_estimator('random_forest', {'n_estimators': 5, 'n_jobs': -1}, n_jobs=2)
+    assert forest.get_params()['n_jobs'] == 2
+    with pytest.raises(ValueError):
+        make_estimator('svm', {})
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+from youtube_first_hour.channel_history import channel_history_features
+from youtube_first_hour.features import YouTubeFeatureEngineer
+from youtube_first_hour.serving import FirstHourPredictor
+
+
+def _history_frame(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    published = pd.Timestamp('2025-08-01') + pd.to_timedelta(rng.integers(0, 14 * 24, n) * 3600, unit='s')
+    # Final snapshot (when the lift is known) one to three hours later
+    final = published + pd.to_timedelta(rng.integers(3600, 3 * 3600, n), unit='s')
+    return pd.DataFrame({
+        'channel_id': rng.choice(['UC1', 'UC2', 'UC3', 'UC4', None], n),
+        'published_at': published.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'logged_at_final': final.strftime('%Y-%m-%d %H:%M:%S'),
+        'view_count_difference': np.where(rng.random(n) < 0.1, np.nan, rng.random(n) * 1000),
+    })
+
+
+def test_features_match_brute_force_filter():
+    df = _history_frame(600)
+    features = channel_history_features(df)
+    times = pd.to_datetime(df['published_at'])
+    known = pd.to_datetime(df['logged_at_final'], utc=True)
+    for i in range(0, len(df), 5):
+        if df['channel_id'][i] is None:
+            assert all(np.isnan(values[i]) for values in features.values())
+            continue
+        channel = df['channel_id'] == df['channel_id'][i]
+        earlier = df[channel & (times < times[i])]
+        earlier_times = times[earlier.index]
+        # Lifts count once known: final snapshot strictly before this video was published
+        known_times = known[channel & (known < times[i])].sort_values(kind='stable')
+        lift = df.loc[known_times.index, 'view_count_difference']
+        week = lift[known_times >= times[i] - pd.Timedelta(days=7)]
+        day = earlier_times[earlier_times >= times[i] - pd.Timedelta(hours=24)]
+        np.testing.assert_allclose(
+            [features['channel_prior_videos'][i], features['channel_mean_lift_last_5'][i],
+             features['channel_mean_lift_7d'][i], features['channel_videos_24h'][i]],
+            [len(earlier), lift.iloc[-5:].mean(), week.mean(), len(day)])
+
+
+def test_no_future_row_contributes():
+    df = _history_frame()
+    full = pd.DataFrame(channel_history_features(df))
+    times = pd.to_datetime(df['published_at'])
+    known = pd.to_datetime(df['logged_at_final'], utc=True)
+    rng = np.random.default_rng(1)
+    for cutoff in times.sample(5, random_state=0):
+        # Rewrite every lift not yet known at the cutoff - including videos published
+        # shortly before it, whose final snapshot comes after it - and add future videos
+        future = known >= cutoff
+        assert (future & (times < cutoff)).any()
+        changed = df.copy()
+        changed.loc[future, 'view_count_difference'] = rng.random(future.sum()) * 1e6
+        extra = _history_frame(500, seed=2)
+        extra['published_at'] = (cutoff + pd.Timedelta(hours=1)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        extra['logged_at_final'] = (cutoff + pd.Timedelta(hours=2)).strftime('%Y-%m-%d %H:%M:%S')
+        changed = pd.concat([changed, extra], ignore_index=True)
+
+        recomputed = pd.DataFrame(channel_history_features(changed))
+        past_or_now = np.flatnonzero((times <= cutoff).to_numpy())
+        pd.testing.assert_frame_equal(recomputed.iloc[past_or_now], full.iloc[past_or_now], check_exact=True)
+
+
+def test_feature_engineer_adds_history_columns(make_videos):
+    df = YouTubeFeatureEngineer().process_all_features(make_videos(30), channel_history=True)
+    assert {'channel_prior_videos', 'channel_mean_lift_last_5', 'channel_mean_lift_7d',
+            'channel_videos_24h'} <= set(df.columns)
+
+
+def test_serving_refuses_history_trained_model():
+    metadata = {'target_columns': ['view_count_final'],
+                'feature_columns': ['view_count_initial', 'channel_prior_videos', 'channel_mean_lift_7d']}
+    with pytest.raises(ValueError, match='channel_prior_videos, channel_mean_lift_7d'):
+        FirstHourPredictor(None, metadata, YouTubeFeatureEngineer())
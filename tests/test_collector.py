@@ -0,0 +1,109 @@
+import asyncio
+import gzip
+import json
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+import pytest
+from youtube_first_hour import collector as collector_module
+from youtube_first_hour.collector import (AsyncHTTPClient, YouTubeCollector, collect_snapshot_pair,
+                                          run_hourly)
+from youtube_first_hour.schema import VideoData
+
+N_VIDEOS = 120
+
+
+class _FakeYouTubeAPI(BaseHTTPRequestHandler):
+    """Stand-in for the three Data API resources the collector uses"""
+
+    protocol_version = "HTTP/1.1"
+    calls = {'search': 0, 'videos': 0, 'channels': 0}
+    snapshots = {}
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        resource = parts.path.rsplit('/', 1)[-1]
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        self.calls[resource] += 1
+        if resource == 'videos' and self.calls['videos'] == 1:
+            return self._send(503, {'error': 'backendError'})  # retried by the client
+
+        if resource == 'search':
+            page = int(query.get('pageToken', 0))
+            ids = [f'vid{i}' for i in range(page * 50, min(N_VIDEOS, (page + 1) * 50))]
+            body = {'items': [{'id': {'videoId': vid}} for vid in ids]}
+            if (page + 1) * 50 < N_VIDEOS:
+                body['nextPageToken'] = str(page + 1)
+        elif resource == 'videos':
+            items = []
+            for vid in query['id'].split(','):
+                seen = self.snapshots[vid] = self.snapshots.get(vid, 0) + 1
+                i = int(vid[3:])
+                items.append({
+                    'id': vid,
+                    'snippet': {'publishedAt': '2025-08-01T07:30:00Z', 'categoryId': '22', 'tags': ['a', 'b'],
+                                'channelId': f'UC{i % 7}', 'channelTitle': f'Channel {i % 7}'},
+                    'statistics': {'viewCount': str(10 * seen + i), 'likeCount': str(seen), 'commentCount': '0'},
+                    'contentDetails': {'definition': 'hd'},
+                })
+            body = {'items': items}
+        else:
+            body = {'items': [{'id': cid, 'statistics': {'viewCount': '1000', 'subscriberCount': '50'}}
+                              for cid in query['id'].split(',')]}
+        self._send(200, body)
+
+    def _send(self, status, body):
+        data = gzip.compress(json.dumps(body).encode())
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def test_snapshot_pair_against_local_api(tmp_path):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _FakeYouTubeAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = AsyncHTTPClient(max_connections=4, backoff=0.01)
+        collector = YouTubeCollector('test-key', client, base_url=f"http://127.0.0.1:{server.server_port}/youtube/v3")
+        window_end = datetime(2025, 8, 1, 8, tzinfo=timezone.utc)
+        stats = asyncio.run(collect_snapshot_pair(collector, str(tmp_path), window_end, ['US'], ['22'],
+                                                  delay=0.05))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert stats['videos'] == N_VIDEOS and stats['retries'] == 1
+    assert stats['final_videos_per_second'] > 0
+    # 50-id batches: 3 videos.list calls per snapshot (+1 retried), one channels.list per batch
+    assert _FakeYouTubeAPI.calls == {'search': 3, 'videos': 7, 'channels': 6}
+
+    df = pd.read_csv(tmp_path / 'videos_20250801_0800.csv')
+    assert list(df.columns) == [f.name for f in VideoData.__dataclass_fields__.values()]
+    assert len(df) == N_VIDEOS
+    assert (df['view_count_final'] - df['view_count_initial'] == 10).all()
+    assert set(df['country']) == {'US'} and set(df['tags']) == {'a,b'}
+
+
+def test_run_hourly_keeps_going_after_a_failed_pair(monkeypatch):
+    started = []
+
+    async def fake_pair(collector, directory, window_end, *args, **kwargs):
+        started.append(window_end)
+        if len(started) == 1:
+            raise RuntimeError("quota exceeded")
+        await asyncio.sleep(0.01)
+
+    monkeypatch.setattr(collector_module, 'collect_snapshot_pair', fake_pair)
+    with pytest.raises(RuntimeError, match="quota exceeded"):
+        asyncio.run(run_hourly(None, '.', ['US'], ['22'], runs=3, interval=0.02))
+    # The failure was retrieved and the schedule went on without it
+    assert len(started) == 3
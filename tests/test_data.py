@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+from youtube_first_hour.data import load_raw_data, load_table, memory_report, save_processed_data
+from youtube_first_hour.features import YouTubeFeatureEngineer
+
+
+def test_columnar_round_trip_keeps_types(tmp_path, make_videos):
+    pytest.importorskip("pyarrow")
+    df = YouTubeFeatureEngineer().process_all_features(make_videos(6))
+    path = str(tmp_path / 'features.parquet')
+    save_processed_data(df, path)
+
+    loaded = load_table(path)
+    assert isinstance(loaded['country'].dtype, pd.CategoricalDtype)
+    assert isinstance(loaded['definition'].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(loaded['published_at'])
+    assert pd.api.types.is_integer_dtype(loaded['published_hour'])
+    pd.testing.assert_series_equal(loaded['view_count_difference'], df['view_count_difference'])
+
+
+def test_load_raw_data_projects_columns(tmp_path, make_videos):
+    path = str(tmp_path / 'raw.csv')
+    make_videos(3).to_csv(path, index=False)
+    df = load_raw_data(path, columns=['video_id', 'view_count_final'])
+    assert list(df.columns) == ['video_id', 'view_count_final']
+
+
+def test_load_raw_data_applies_compact_dtype_plan(tmp_path, make_videos):
+    path = str(tmp_path / 'raw.csv')
+    make_videos(40).to_csv(path, index=False)
+    plain = load_raw_data(path, compact=False)
+    compact = load_raw_data(path)
+
+    assert isinstance(compact['channel_id'].dtype, pd.CategoricalDtype)
+    assert str(compact['view_count_final'].dtype) == 'Int64'
+    assert str(compact['like_count_initial'].dtype) == 'Int32'
+    report = memory_report(plain, compact)
+    assert report.loc['total', 'mb_after'] < report.loc['total', 'mb_before']
+
+    # Same engineered features either way
+    features = YouTubeFeatureEngineer().process_all_features(compact)
+    expected = YouTubeFeatureEngineer().process_all_features(plain)
+    for col in ['channel_avg_views', 'avg_view_diff_per_category', 'relative_views_to_category']:
+        assert features[col].to_numpy(dtype=float) == pytest.approx(expected[col].to_numpy(dtype=float), nan_ok=True)
@@ -0,0 +1,132 @@
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+import requests
+from youtube_first_hour.data_loader import download_export, export_to_parquet, stream_export
+
+LAST_MODIFIED = 'Fri, 01 Aug 2025 16:00:00 GMT'
+
+
+class _ExportServer(BaseHTTPRequestHandler):
+    """
+    /export-csv stand-in with Range, conditional GET and gzip; can drop the first response halfway,
+    leave out its validators or answer a Range request from the wrong offset
+    """
+
+    protocol_version = "HTTP/1.1"
+    export = b''
+    drop_next = False
+    validators = True
+    range_shift = 0
+    requests_seen = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.requests_seen.append(dict(self.headers))
+        if self.headers.get('If-None-Match') == '"v1"' or self.headers.get('If-Modified-Since') == LAST_MODIFIED:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body, status = self.export, 200
+        range_header = self.headers.get('Range')
+        if range_header and self.headers.get('If-Range') in (None, '"v1"'):
+            start = int(range_header.split('=')[1].rstrip('-')) + self.range_shift
+            body, status = self.export[start:], 206
+        gzipped = status == 200 and 'gzip' in self.headers.get('Accept-Encoding', '')
+        if gzipped:
+            body = gzip.compress(body)
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/csv')
+        if self.validators:
+            self.send_header('ETag', '"v1"')
+            self.send_header('Last-Modified', LAST_MODIFIED)
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{len(self.export) - 1}/{len(self.export)}')
+        self.send_header('Content-Length', str(len(body)))
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        if type(self).drop_next:
+            type(self).drop_next = False
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def export(make_videos):
+    lines = make_videos(400).to_csv(index=False).splitlines(keepends=True)
+    # One malformed row (too many fields) in the middle of the export
+    return ''.join(lines[:200] + [','.join(['bad'] * (lines[0].count(',') + 4)) + '\n'] + lines[200:]).encode()
+
+
+@pytest.fixture
+def export_url(export):
+    _ExportServer.export = export
+    _ExportServer.validators, _ExportServer.range_shift = True, 0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _ExportServer)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    _ExportServer.requests_seen.clear()
+    yield f"http://127.0.0.1:{server.server_port}/export-csv"
+    server.shutdown()
+    server.server_close()
+
+
+def test_download_resumes_and_skips_unchanged_export(tmp_path, export, export_url):
+    path = str(tmp_path / 'latest_data.csv')
+    _ExportServer.drop_next = True
+    with pytest.raises(requests.exceptions.RequestException):
+        download_export(export_url, path, chunk_size=1024)
+    partial = (tmp_path / 'latest_data.csv.part').stat().st_size
+    assert 0 < partial < len(export)
+
+    assert download_export(export_url, path, chunk_size=1024)
+    assert _ExportServer.requests_seen[-1]['Range'] == f'bytes={partial}-'
+    assert open(path, 'rb').read() == export
+
+    assert not download_export(export_url, path)
+    assert open(path, 'rb').read() == export
+
+
+def test_resume_restarts_when_the_partial_file_cannot_be_validated(tmp_path, export, export_url):
+    path = str(tmp_path / 'latest_data.csv')
+    # No ETag or Last-Modified: the partial file is dropped, not resumed
+    _ExportServer.validators, _ExportServer.drop_next = False, True
+    with pytest.raises(requests.exceptions.RequestException):
+        download_export(export_url, path, chunk_size=1024)
+    assert download_export(export_url, path, chunk_size=1024)
+    assert 'Range' not in _ExportServer.requests_seen[-1]
+    assert open(path, 'rb').read() == export
+
+    # A 206 that does not continue at the partial file's end is not appended
+    _ExportServer.validators, _ExportServer.drop_next, _ExportServer.range_shift = True, True, 10
+    with pytest.raises(requests.exceptions.RequestException):
+        download_export(export_url, path + '.2', chunk_size=1024)
+    assert download_export(export_url, path + '.2', chunk_size=1024)
+    assert 'Range' in _ExportServer.requests_seen[-2] and 'Range' not in _ExportServer.requests_seen[-1]
+    assert open(path + '.2', 'rb').read() == export
+
+
+def test_streamed_parse_matches_file(tmp_path, export, export_url):
+    pytest.importorskip("pyarrow")
+    (tmp_path / 'export.csv').write_bytes(export)
+    expected = pd.read_csv(tmp_path / 'export.csv', on_bad_lines='skip')
+    assert len(expected) == 400
+
+    chunks = list(stream_export(export_url, chunksize=150))
+    assert [len(c) for c in chunks] == [150, 150, 100]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), expected)
+
+    path = str(tmp_path / 'latest_data.parquet')
+    assert export_to_parquet(export_url, path, block_size=4096)
+    assert 'gzip' in _ExportServer.requests_seen[-1]['Accept-Encoding']
+    pd.testing.assert_frame_equal(pd.read_parquet(path), expected, check_dtype=False)
+    assert not export_to_parquet(export_url, path)
@@ -1,6 +1,11 @@
+import numpy as np
 import pandas as pd
 import pytest
-from youtube_first_hour.features import YouTubeFeatureEngineer
+from youtube_first_hour.features import (
+    YouTubeFeatureEngineer, process_youtube_data, stream_youtube_data
+)
+from youtube_first_hour.synthetic import synthetic_videos
+
 
 def test_feature_engineering():
     """Test the complete feature engineering pipeline"""
@@ -47,10 +52,13 @@ def test_feature_engineering():
     assert 'published_year' in result.columns
     assert 'published_month' in result.columns
     assert 'published_day_of_week' in result.columns
-    assert 'published_time' in result.columns
+    assert 'published_hour' in result.columns
+    assert 'published_minute' in result.columns
     assert result['published_year'].iloc[0] == 2025
     assert result['published_month'].iloc[0] == 8
-    assert result['published_day_of_week'].iloc[0] == 'Friday'
+    assert result['published_day_of_week'].iloc[0] == 4  # Friday
+    assert result['published_hour'].iloc[0] == 14
+    assert result['published_minute'].iloc[0] == 30
     
     # Test category features
     assert 'avg_view_diff_per_category' in result.columns
@@ -69,5 +77,74 @@ def test_feature_engineering():
     
     print("All tests passed!")
 
+def _assert_group_means(raw, engineered):
+    """Category and channel columns against a plain groupby over the whole raw frame"""
+    views = raw['view_count_final'] - raw['view_count_initial']
+    likes = (raw['like_count_final'] - raw['like_count_initial']).astype(float)
+    for column, expected in [
+        ('avg_view_diff_per_category', views.groupby(raw['category_id']).transform('mean')),
+        ('avg_likes_diff_per_category', likes.groupby(raw['category_id']).transform('mean')),
+        ('channel_avg_views', views.groupby(raw['channel_id']).transform('mean').fillna(0.0)),
+    ]:
+        np.testing.assert_allclose(engineered[column], expected, rtol=1e-12)
+
+def test_streaming_matches_in_memory(tmp_path, make_videos):
+    """Chunked two-pass processing writes the same file as the in-memory path"""
+    raw = make_videos(11)
+    # A missing count in one chunk only must not change that column's dtype
+    raw.loc[9, 'like_count_final'] = np.nan
+    raw['like_count_final'] = raw['like_count_final'].astype('Int64')
+    input_file = tmp_path / 'raw.csv'
+    raw.to_csv(input_file, index=False)
+
+    process_youtube_data(str(input_file), str(tmp_path / 'in_memory.csv'))
+    rows = stream_youtube_data(str(input_file), str(tmp_path / 'streamed.csv'), chunksize=3)
+
+    assert rows == len(raw)
+    assert (tmp_path / 'streamed.csv').read_bytes() == (tmp_path / 'in_memory.csv').read_bytes()
+    # Both paths share GroupStatsAccumulator: check the means independently of it
+    _assert_group_means(raw, pd.read_csv(tmp_path / 'streamed.csv'))
+
+    # Skewed channels and categories spread over many chunks: still byte for byte
+    raw = synthetic_videos(3000, seed=1, n_channels=200)
+    raw.to_csv(input_file, index=False)
+    process_youtube_data(str(input_file), str(tmp_path / 'in_memory.csv'))
+    stream_youtube_data(str(input_file), str(tmp_path / 'streamed.csv'), chunksize=700)
+    assert (tmp_path / 'streamed.csv').read_bytes() == (tmp_path / 'in_memory.csv').read_bytes()
+    _assert_group_means(raw, pd.read_csv(tmp_path / 'streamed.csv'))
+
+def test_fit_transform_uses_saved_lookup_tables(tmp_path, make_videos):
+    """Scoring rows only need the fitted tables; unseen groups get the fallback"""
+    train = make_videos(12)
+    fe = YouTubeFeatureEngineer().fit(train)
+    fe.save(str(tmp_path / 'tables.npz'))
+    loaded = YouTubeFeatureEngineer.load(str(tmp_path / 'tables.npz'))
+
+    new = make_videos(2).drop(columns=['view_count_final', 'like_count_final'])
+    new.loc[1, ['channel_id', 'category_id']] = ['UC_new', 99.0]
+    result = loaded.transform(new)
+
+    assert 'view_count_difference' not in result.columns
+    assert result['channel_avg_views'].iloc[0] == fe.channel_stats['UC0']['view_count_difference']
+    assert result['avg_view_diff_per_category'].iloc[0] == fe.category_view_stats[22.0]
+    assert result['channel_avg_views'].iloc[1] == YouTubeFeatureEngineer.UNSEEN_CHANNEL_VALUE
+    diffs = train['view_count_final'] - train['view_count_initial']
+    assert result['avg_view_diff_per_category'].iloc[1] == pytest.approx(diffs.mean())
+
+def test_header_only_input_gives_empty_output(tmp_path, make_videos):
+    """No rows to fit: empty tables and an empty output, in memory and streamed"""
+    input_file = tmp_path / 'raw.csv'
+    make_videos(3).head(0).to_csv(input_file, index=False)
+    df = process_youtube_data(str(input_file), str(tmp_path / 'in_memory.csv'))
+    assert len(df) == 0 and 'channel_avg_views' in df.columns
+    assert stream_youtube_data(str(input_file), str(tmp_path / 'streamed.csv')) == 0
+    assert (tmp_path / 'streamed.csv').read_bytes() == (tmp_path / 'in_memory.csv').read_bytes()
+
+    # Every group of later rows is unseen
+    fe = YouTubeFeatureEngineer().fit(pd.read_csv(input_file))
+    result = fe.transform(make_videos(2))
+    assert result['avg_view_diff_per_category'].isna().all()
+    assert (result['channel_avg_views'] == YouTubeFeatureEngineer.UNSEEN_CHANNEL_VALUE).all()
+
 if __name__ == "__main__":
     test_feature_engineering()
@@ -0,0 +1,59 @@
+import json
+import math
+import sys
+
+import pandas as pd
+from youtube_first_hour.features import YouTubeFeatureEngineer
+from youtube_first_hour.instrumentation import disable_tracing, enable_tracing, span
+from youtube_first_hour.preprocessing import YouTubePreprocessor
+
+
+def test_pipeline_spans_nest_and_record_rows(tmp_path, make_videos):
+    df = make_videos(50)
+    tracer = enable_tracing()
+    try:
+        with span('run') as run:
+            out = YouTubePreprocessor().preprocess(YouTubeFeatureEngineer().process_all_features(df),
+                                                   scaling=True, copy=False)
+            run.set(rows_out=len(out))
+    finally:
+        disable_tracing()
+
+    spans = {record['name']: record for record in tracer.spans}
+    assert {'run', 'features.fit', 'features.transform', 'features.time_features',
+            'preprocess', 'preprocess.scale'} <= set(spans)
+    assert spans['features.time_features']['parent'] == spans['features.transform']['id']
+    assert spans['features.fit']['parent'] == spans['run']['id']
+    assert spans['features.transform']['rows_in'] == spans['features.transform']['rows_out'] == 50
+    assert spans['run']['rows_out'] == 50
+    assert all(record['wall_seconds'] >= 0 and record['cpu_seconds'] >= 0 for record in tracer.spans)
+
+    tracer.save(str(tmp_path / "trace.json"))
+    tracer.save_chrome_trace(str(tmp_path / "chrome.json"))
+    trace = json.loads((tmp_path / "trace.json").read_text())
+    assert trace['totals']['features.transform']['calls'] == 1
+    events = json.loads((tmp_path / "chrome.json").read_text())['traceEvents']
+    assert len(events) == len(tracer.spans) and all(event['ph'] == 'X' for event in events)
+
+
+def test_disabled_tracing_records_nothing(make_videos):
+    tracer = enable_tracing()
+    disable_tracing()
+    df = make_videos(20)
+    with span('ignored') as s:
+        s.set(rows_out=1)
+        out = YouTubeFeatureEngineer().process_all_features(df)
+    assert tracer.spans == []
+    pd.testing.assert_frame_equal(out, YouTubeFeatureEngineer().process_all_features(df))
+
+
+def test_spans_work_without_the_resource_module(monkeypatch):
+    # Windows has no resource module: peak RSS is unknown, everything else is recorded
+    monkeypatch.setitem(sys.modules, 'resource', None)
+    tracer = enable_tracing()
+    try:
+        with span('stage'):
+            pass
+    finally:
+        disable_tracing()
+    assert math.isnan(tracer.spans[0]['peak_rss_delta_mb']) and tracer.spans[0]['wall_seconds'] >= 0
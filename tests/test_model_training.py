@@ -0,0 +1,113 @@
+import numpy as np
+import optuna
+import pandas as pd
+import pytest
+from optuna.trial import TrialState
+from youtube_first_hour.model_training import QuantileModelTrainer, TuningData, export_tree_arrays
+
+TARGETS = ['like_count_initial', 'like_count_final', 'view_count_initial', 'view_count_final']
+
+
+def _tuning_data(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n, 4)), columns=['a', 'b', 'c', 'd'])
+    signal = np.exp(2 + X['a'] + 0.5 * X['b'])
+    y = pd.DataFrame({col: signal * (i + 1) + rng.exponential(1, n) for i, col in enumerate(TARGETS)})
+    return X[:240], y[:240], X[240:], y[240:]
+
+
+def _finished(study):
+    return study.get_trials(deepcopy=False, states=(TrialState.COMPLETE, TrialState.PRUNED))
+
+
+def test_parallel_tuning_resumes_shared_study(tmp_path):
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    storage = f"sqlite:///{tmp_path / 'study.db'}"
+    trainer = QuantileModelTrainer(TARGETS, n_jobs=1)
+
+    study = trainer.tune(*_tuning_data(), n_trials=2, n_workers=2, storage=storage, study_name='s')
+    first = len(_finished(study))
+    # Workers stop once the budget is reached; one may finish the trial it had started
+    assert 2 <= first <= 3
+
+    # The budget counts the trials of the earlier run
+    study = trainer.tune(*_tuning_data(), n_trials=first + 2, n_workers=2, storage=storage, study_name='s')
+    assert first + 2 <= len(_finished(study)) <= first + 3
+    assert study.user_attrs['multi_strategy'] is None and study.user_attrs['feature_columns'] == list('abcd')
+
+    # A different strategy or feature set must not resume this study
+    with pytest.raises(ValueError, match='multi_strategy'):
+        QuantileModelTrainer(TARGETS, n_jobs=1, multi_strategy='one_output_per_tree').tune(
+            *_tuning_data(), n_trials=1, storage=storage, study_name='s')
+    X_train, y_train, X_valid, y_valid = _tuning_data()
+    with pytest.raises(ValueError, match='feature_columns'):
+        trainer.tune(X_train.drop(columns='d'), y_train, X_valid.drop(columns='d'), y_valid,
+                     n_trials=1, storage=storage, study_name='s')
+
+
+def test_refit_uses_each_targets_best_iteration(tmp_path, monkeypatch):
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    monkeypatch.chdir(tmp_path)
+    X_train, y_train, X_valid, y_valid = _tuning_data()
+    df = pd.concat([pd.concat([X_train, y_train], axis=1), pd.concat([X_valid, y_valid], axis=1)])
+    storage = f"sqlite:///{tmp_path / 'study.db'}"
+    trainer = QuantileModelTrainer(TARGETS, n_jobs=1)
+    trainer.tune_and_train(df, str(tmp_path / 'model.joblib'), n_trials=2, storage=storage, study_name='s')
+
+    best_iterations = optuna.load_study(study_name='s', storage=storage).best_trial.user_attrs['best_iterations']
+    rounds = [est.get_booster().num_boosted_rounds() for est in trainer.model.estimators_]
+    assert rounds == [iteration + 1 for iteration in best_iterations]
+    assert trainer.best_params['n_estimators'] == max(rounds)
+
+
+def test_pruned_trial_is_recorded_as_pruned():
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    trainer = QuantileModelTrainer(TARGETS, n_jobs=1)
+    data = TuningData(*_tuning_data(), multi_target=False)
+    # Any positive RMSE is above the threshold: the first report prunes
+    study = optuna.create_study(pruner=optuna.pruners.ThresholdPruner(upper=0.0))
+    study.optimize(lambda trial: trainer.optuna_objective(trial, data), n_trials=1)
+    trial = study.trials[0]
+    assert trial.state == TrialState.PRUNED
+    assert list(trial.intermediate_values) == [0]
+
+
+def test_tuning_native_multi_target_booster(tmp_path, monkeypatch):
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    monkeypatch.chdir(tmp_path)
+    X_train, y_train, X_valid, y_valid = _tuning_data()
+    df = pd.concat([pd.concat([X_train, y_train], axis=1), pd.concat([X_valid, y_valid], axis=1)])
+    trainer = QuantileModelTrainer(TARGETS, n_jobs=1, multi_strategy='one_output_per_tree')
+    study = trainer.tune(X_train, y_train, X_valid, y_valid, n_trials=2)
+
+    # One booster for all targets: a single best iteration per trial
+    assert all(len(t.user_attrs['best_iterations']) == 1 for t in _finished(study))
+    trainer.tune_and_train(df, str(tmp_path / 'model.joblib'), n_trials=2)
+    assert trainer.model.get_booster().num_boosted_rounds() == trainer.best_params['n_estimators']
+    assert trainer.model.predict(X_valid).shape == (len(X_valid), len(TARGETS))
+    # ... and it exports to tree arrays
+    np.testing.assert_allclose(export_tree_arrays(trainer.model).predict(X_valid.to_numpy(np.float32)),
+                               trainer.model.predict(X_valid), rtol=1e-4, atol=1e-4)
+
+
+def test_export_rejects_vector_leaf_models():
+    X_train, y_train, _, _ = _tuning_data()
+    trainer = QuantileModelTrainer(TARGETS, n_jobs=1, multi_strategy='multi_output_tree')
+    trainer.fit(X_train, y_train, {'n_estimators': 5, 'max_depth': 3})
+    with pytest.raises(ValueError, match='Vector-leaf'):
+        export_tree_arrays(trainer.model)
+
+
+def test_published_time_dtypes_match_across_formats():
+    text = pd.DataFrame({'published_time': ['07:30:00', '23:05:59']})
+    typed = pd.DataFrame({'published_time': pd.to_timedelta(text['published_time'])})
+    from_text = QuantileModelTrainer(TARGETS).prepare_features(text)
+    from_typed = QuantileModelTrainer(TARGETS).prepare_features(typed)
+    pd.testing.assert_frame_equal(from_text, from_typed)
+    assert (from_typed.dtypes == 'int64').all()
+    assert from_typed['published_minute'].tolist() == [30, 5]
+
+    # Missing times keep the integer dtype, as nullable integers
+    missing = pd.DataFrame({'published_time': pd.to_timedelta(['07:30:00', None])})
+    prepared = QuantileModelTrainer(TARGETS).prepare_features(missing)
+    assert (prepared.dtypes == 'Int64').all() and prepared['published_hour'].isna().tolist() == [False, True]
@@ -0,0 +1,36 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from youtube_first_hour import parallel_features
+from youtube_first_hour.features import YouTubeFeatureEngineer
+from youtube_first_hour.parallel_features import ParallelFeatureEngineer
+
+@pytest.mark.parametrize("channel_history", [False, True])
+def test_parallel_output_equals_serial(channel_history, make_videos):
+    pytest.importorskip("pyarrow")
+    df = make_videos(200)
+    df.loc[3, 'channel_id'] = np.nan
+    df.loc[4, 'published_at'] = 'not a date'
+    serial = YouTubeFeatureEngineer().process_all_features(df, channel_history=channel_history)
+    parallel = ParallelFeatureEngineer(n_workers=2).process_all_features(df, channel_history=channel_history)
+    pd.testing.assert_frame_equal(parallel, serial, check_exact=True)
+
+
+_partition_features = parallel_features._partition_features
+
+
+def _fail_one_partition(source, rows, tables, channel_history):
+    if 0 in rows:
+        raise ValueError("bad partition")
+    return _partition_features(source, rows, tables, channel_history)
+
+
+def test_failed_partition_releases_every_block(monkeypatch, make_videos):
+    pytest.importorskip("pyarrow")
+    before = set(os.listdir('/dev/shm'))
+    monkeypatch.setattr(parallel_features, '_partition_features', _fail_one_partition)
+    with pytest.raises(ValueError, match="bad partition"):
+        ParallelFeatureEngineer(n_workers=2).process_all_features(make_videos(200))
+    assert set(os.listdir('/dev/shm')) <= before
@@ -16,3 +16,33 @@ def test_scale_numeric():
     prep = YouTubePreprocessor()
     scaled_df = prep.scale_numeric(df, fit=True)
     assert abs(scaled_df["a"].mean()) < 1e-8
+
+def test_add_logged_hours_parses_api_timestamps():
+    df = pd.DataFrame({
+        "logged_at_initial": ["2025-08-01T15:01:29Z", "2025-08-01T15:01:29+02:00", "not a date"],
+    })
+    df_proc = YouTubePreprocessor().add_logged_hours(df)
+    assert df_proc["logged_at_initial_hour"].tolist() == [15, 13, 0]
+
+def test_planned_preprocess_matches_and_stays_near_one_output_copy():
+    import tracemalloc
+    import numpy as np
+
+    n = 100_000
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({f"n{i}": rng.integers(0, 1000, n) for i in range(20)})
+    df["logged_at_initial"] = pd.Timestamp("2025-08-01") + pd.to_timedelta(rng.integers(0, 86400, n), unit="s")
+    df["logged_at_final"] = df["logged_at_initial"] + pd.Timedelta(hours=6)
+    df["video_id"] = np.arange(n).astype(str).astype(object)
+
+    expected = YouTubePreprocessor().preprocess(df, scaling=True)
+    tracemalloc.start()
+    out = YouTubePreprocessor().preprocess(df, scaling=True, copy=False)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Chunked scaler statistics: equal to rounding, not bit for bit
+    pd.testing.assert_frame_equal(out, expected, rtol=1e-12, atol=1e-12)
+    assert peak < 1.25 * out.memory_usage(deep=True).sum()
+    pd.testing.assert_frame_equal(YouTubePreprocessor().preprocess(df, copy=False),
+                                  YouTubePreprocessor().preprocess(df), check_exact=True)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from youtube_first_hour import segment_training
+from youtube_first_hour.segment_training import QuantileSegments, SegmentTrainer, ZScoreSegments
+
+
+def test_target_segments_are_routed_by_classifier(targets, training_frame):
+    df = training_frame()
+    trainer = SegmentTrainer(targets, ZScoreSegments(targets, threshold=0.5), n_workers=2, n_trials=2)
+    ensemble = trainer.fit(df)
+
+    assert set(ensemble.models) == {'normal', 'outlier'}
+    assert ensemble.router is not None
+    X = df.drop(columns=targets)
+    segments = ensemble.route(X)
+    preds = ensemble.predict(X)
+    for idx, name in enumerate(ZScoreSegments.names):
+        rows = segments == idx
+        np.testing.assert_allclose(preds[rows], ensemble.models[name].predict(X[rows]))
+
+
+def test_feature_segments_route_by_rule(targets, training_frame):
+    df = training_frame()
+    rule = QuantileSegments('c_view_count_initial')
+    ensemble = SegmentTrainer(targets, rule, n_trials=1).fit(df)
+
+    assert ensemble.router is None
+    X = df.drop(columns=targets)
+    np.testing.assert_array_equal(ensemble.route(X), rule.assign(X))
+    assert ensemble.predict(X).shape == (len(X), len(targets))
+
+
+def test_empty_segment_falls_back_to_global_model(targets, training_frame):
+    df = training_frame()
+    # No row is this far from the mean: the outlier segment stays empty
+    ensemble = SegmentTrainer(targets, ZScoreSegments(targets, threshold=100.0), n_trials=1).fit(df)
+
+    assert set(ensemble.scores) == {'normal', 'global'}
+    assert ensemble.models['outlier'] is not ensemble.models['normal']
+    X = df.drop(columns=targets)
+    assert ensemble.predict(X).shape == (len(X), len(targets))
+
+
+@pytest.mark.parametrize("family", ['lightgbm', 'catboost'])
+def test_optional_families_fit_segments(monkeypatch, family, targets, training_frame):
+    pytest.importorskip(family)
+    monkeypatch.setattr(segment_training, 'MAX_BOOST_ROUNDS', 500)
+    df = training_frame()
+    rule = QuantileSegments('c_view_count_initial')
+    ensemble = SegmentTrainer(targets, rule, families=[family], n_trials=1).fit(df)
+
+    assert set(ensemble.models) == set(rule.names)
+    assert all(set(scores) == {family} for scores in ensemble.scores.values())
+    X = df.drop(columns=targets)
+    assert np.isfinite(ensemble.predict(X)).all()
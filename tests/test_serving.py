@@ -0,0 +1,52 @@
+import http.client
+import json
+import threading
+
+import numpy as np
+from youtube_first_hour.schema import VideoData
+from youtube_first_hour.serving import FirstHourPredictor, make_server
+
+
+def test_predictor_matches_training_pipeline(tmp_path, targets, trained):
+    raw, X, trainer, predictor = trained
+    records = [VideoData(**row) for row in raw.to_dict('records')]
+
+    np.testing.assert_array_equal(predictor.features(records), X.to_numpy(dtype=np.float32))
+    expected = np.expm1(trainer.model.predict(X))
+    np.testing.assert_allclose(predictor.predict_array(records), expected, rtol=1e-6)
+
+    # Scoring records have no final counts and may come from unseen channels
+    record = raw.iloc[0].to_dict()
+    for col in ['view_count_final', 'like_count_final', 'logged_at_final']:
+        record.pop(col)
+    record['channel_id'] = 'UC_new'
+    assert set(predictor.predict([record])[0]) == set(targets)
+
+    # Exported tree arrays serve the same forecasts without xgboost
+    trainer.export_trees(str(tmp_path / 'trees.npz'))
+    compiled = FirstHourPredictor.load(str(tmp_path / 'trees.npz'), str(tmp_path / 'tables.npz'))
+    np.testing.assert_allclose(compiled.predict_array(records), expected, rtol=1e-4)
+
+
+def test_http_service_single_and_batch(trained):
+    raw, _, _, predictor = trained
+    server = make_server(predictor, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        conn = http.client.HTTPConnection(*server.server_address)
+        records = raw.head(3).to_dict('records')
+        for body in (records[0], records):
+            conn.request("POST", "/predict", json.dumps(body), {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            assert response.status == 200
+            payload = json.loads(response.read())
+            expected = predictor.predict(records)
+            assert payload['predictions'] == (expected[0] if isinstance(body, dict) else expected)
+
+        conn.request("POST", "/predict", "not json")
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 400
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,70 @@
+import json
+import os
+
+import pandas as pd
+from youtube_first_hour.features import YouTubeFeatureEngineer
+from youtube_first_hour.model_training import QuantileModelTrainer
+from youtube_first_hour.preprocessing import YouTubePreprocessor
+from youtube_first_hour.stage_cache import StageCache, stage_dependencies
+
+
+def test_rerun_restores_output_and_state(tmp_path, monkeypatch, make_videos):
+    raw = make_videos(40)
+    cache = StageCache(str(tmp_path / 'cache'))
+    fe = YouTubeFeatureEngineer()
+    features = cache.run(fe, 'process_all_features', raw)
+
+    # Not recomputed: the method is never called on a hit
+    monkeypatch.setattr(YouTubeFeatureEngineer, 'process_all_features', None)
+    fresh = YouTubeFeatureEngineer()
+    cached = cache.run(fresh, 'process_all_features', raw)
+    pd.testing.assert_frame_equal(cached, features)
+    assert fresh.channel_stats == fe.channel_stats
+
+    # Different parameters are a different key
+    prep = YouTubePreprocessor()
+    scaled = cache.run(prep, 'preprocess', features, scaling=True)
+    assert prep.scaler is not None
+    assert not cache.run(YouTubePreprocessor(), 'preprocess', features).equals(scaled)
+
+
+def test_lru_eviction_keeps_recent_entries(tmp_path, make_videos):
+    raw = make_videos(40)
+    cache = StageCache(str(tmp_path / 'cache'))
+    cache.run(YouTubeFeatureEngineer(), 'process_all_features', raw)
+    first = {path for _, _, path in cache.entries()}
+    size = sum(size for _, size, _ in cache.entries())
+
+    cache.max_bytes = int(size * 1.5)
+    cache.run(YouTubeFeatureEngineer(), 'process_all_features', raw.head(30))
+    remaining = {path for _, _, path in cache.entries()}
+    assert sum(os.path.getsize(p) for p in remaining) <= cache.max_bytes
+    assert not first <= remaining
+
+
+def test_key_covers_dependencies_and_ignores_copy(tmp_path, make_videos):
+    raw = make_videos(40)
+    cache = StageCache(str(tmp_path / 'cache'))
+    fe = YouTubeFeatureEngineer()
+    key = cache.key(fe, 'process_all_features', raw, {})
+    assert cache.key(fe, 'process_all_features', raw, {'copy': False}) == key
+    assert cache.key(fe, 'process_all_features', raw, {'channel_history': True}) != key
+    # Helpers in other modules of the package are part of the stage's code
+    assert {'youtube_first_hour.channel_history', 'youtube_first_hour.time_features'} <= set(
+        stage_dependencies('youtube_first_hour.features'))
+
+
+def test_hit_rewrites_country_encoding(tmp_path, monkeypatch, make_videos, targets):
+    monkeypatch.chdir(tmp_path)
+    df = YouTubePreprocessor().preprocess(YouTubeFeatureEngineer().process_all_features(make_videos(40)))
+    cache = StageCache(str(tmp_path / 'cache'))
+    cache.run(QuantileModelTrainer(targets), 'prepare_features', df.copy())
+    with open('country_encoding.json') as f:
+        encoding = json.load(f)
+    os.remove('country_encoding.json')
+
+    trainer = QuantileModelTrainer(targets)
+    cache.run(trainer, 'prepare_features', df.copy())
+    assert trainer.country_encoding == encoding
+    with open('country_encoding.json') as f:
+        assert json.load(f) == encoding
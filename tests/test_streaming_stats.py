@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+from youtube_first_hour.model_training import QuantileModelTrainer
+from youtube_first_hour.streaming_stats import QuantileSketch, RunningMoments
+
+TARGETS = ['view_count_final', 'like_count_final']
+
+
+def _frame(n=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'view_count_final': np.floor(rng.lognormal(6, 2, n)),
+        'like_count_final': np.floor(rng.lognormal(3, 1.5, n)),
+    })
+    df.loc[::97, 'like_count_final'] = np.nan
+    return df
+
+
+def _chunks(df, size=3_000):
+    return [df.iloc[start:start + size] for start in range(0, len(df), size)]
+
+
+def test_streamed_outlier_filter_matches_full_zscore():
+    df = _frame()
+    trainer = QuantileModelTrainer(TARGETS)
+    # Two partitions, as if from two worker processes, merged
+    chunks = _chunks(df)
+    moments = trainer.target_moments(chunks[:3]).merge(RunningMoments.from_chunks(chunks[3:], TARGETS))
+
+    streamed = pd.concat([trainer.remove_outliers(chunk, moments=moments) for chunk in chunks])
+    pd.testing.assert_frame_equal(streamed, trainer.remove_outliers(df))
+
+
+def test_quantile_sketch_within_relative_accuracy():
+    df = _frame()
+    chunks = _chunks(df)
+    sketch = QuantileSketch.from_chunks(chunks[:4], 'view_count_final', 0.01)
+    sketch.merge(QuantileSketch.from_chunks(chunks[4:], 'view_count_final', 0.01))
+
+    ordered = np.sort(df['view_count_final'].to_numpy())
+    for q, approx in zip([0.25, 0.5, 0.75], sketch.quantiles([0.25, 0.5, 0.75])):
+        exact = ordered[int(np.floor(q * (len(ordered) - 1)))]
+        assert abs(approx - exact) <= 0.01 * exact
+
+    low, mid, high = QuantileModelTrainer(TARGETS).split_quantiles(df, 'view_count_final', sketch=sketch)
+    assert len(low) + len(mid) + len(high) == len(df)
@@ -0,0 +1,36 @@
+from dataclasses import fields
+
+import numpy as np
+import pandas as pd
+from youtube_first_hour.features import YouTubeFeatureEngineer
+from youtube_first_hour.schema import VideoData
+from youtube_first_hour.synthetic import SyntheticVideoGenerator, synthetic_videos
+
+
+def test_generator_is_seeded_and_matches_schema():
+    df = synthetic_videos(5000, seed=3)
+    pd.testing.assert_frame_equal(df, synthetic_videos(5000, seed=3))
+    assert not df.equals(synthetic_videos(5000, seed=4))
+    assert list(df.columns) == [field.name for field in fields(VideoData)]
+    assert (df['view_count_final'] >= df['view_count_initial']).all()
+    assert pd.to_datetime(df['published_at'], format='%Y-%m-%dT%H:%M:%SZ').notna().all()
+    assert pd.to_datetime(df['logged_at_initial'], format='%Y-%m-%d %H:%M:%S').notna().all()
+    # Skewed like real collections: heavy-tailed views, a few channels with many videos
+    views = df['view_count_final']
+    assert views.max() > 50 * views.median()
+    assert df['channel_id'].value_counts().iloc[0] > 20 * len(df) / df['channel_id'].nunique()
+    assert df['country'].nunique() > 20
+    YouTubeFeatureEngineer().process_all_features(df)
+
+
+def test_chunks_are_reproducible_and_written_whole(tmp_path):
+    generator = SyntheticVideoGenerator(seed=1, n_channels=500)
+    chunks = list(generator.iter_chunks(2500, chunk_rows=1000))
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 500]
+    pd.testing.assert_frame_equal(chunks[1], generator.sample(1000, chunk=1))
+    assert not np.array_equal(chunks[0]['view_count_final'], chunks[1]['view_count_final'])
+    path = str(tmp_path / "synthetic.csv")
+    generator.write(path, 2500, chunk_rows=1000)
+    written = pd.read_csv(path)
+    assert len(written) == 2500
+    assert written['video_id'].is_unique
@@ -0,0 +1,83 @@
+import json
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from youtube_first_hour import tag_features
+from youtube_first_hour.artifacts import load_bundle
+from youtube_first_hour.features import YouTubeFeatureEngineer
+from youtube_first_hour.model_training import QuantileModelTrainer
+from youtube_first_hour.preprocessing import YouTubePreprocessor
+from youtube_first_hour.serving import FirstHourPredictor
+from youtube_first_hour.tag_features import TagCounter, TagFeatureBuilder
+
+
+def test_sparse_tags_match_python_reference(monkeypatch):
+    tags = pd.Series(['Music, Live,music', '', None, 'gaming', 'news,politics,,World', 'music,gaming'] * 50)
+    builder = TagFeatureBuilder(max_tags=3, min_count=1, chunk_rows=70).fit(tags)
+    matrix = builder.transform(tags)
+
+    reference = [{t.strip().lower() for t in s.split(',') if t.strip()} if isinstance(s, str) else set()
+                 for s in tags]
+    assert builder.vocabulary == ['music', 'gaming', 'live']
+    expected = [[float(tag in row) for tag in builder.vocabulary] for row in reference]
+    assert sp.isspmatrix_csr(matrix) and matrix.nnz == sum(map(sum, expected))
+    np.testing.assert_array_equal(matrix.toarray(), expected)
+
+    # pandas fallback tokenizes the same way
+    monkeypatch.setattr(tag_features, '_has_pyarrow', lambda: False)
+    assert (builder.transform(tags) != matrix).nnz == 0
+
+    # Heavy hitters survive a counter far smaller than the vocabulary, and partitions merge
+    tokens = np.array(['hot'] * 300 + ['warm'] * 200 + [f'rare{i}' for i in range(500)], dtype=object)
+    left, right = TagCounter(capacity=10).update(tokens[::2]), TagCounter(capacity=10).update(tokens[1::2])
+    assert left.merge(right).most_common(2) == ['hot', 'warm']
+
+
+def test_trainer_fits_boosters_on_sparse_tags(tmp_path, monkeypatch, make_videos, targets):
+    monkeypatch.chdir(tmp_path)
+    raw = make_videos(120)
+    raw['tags'] = [f'topic{i % 5},common' if i % 4 else '' for i in range(len(raw))]
+    df = YouTubePreprocessor().preprocess(YouTubeFeatureEngineer().process_all_features(raw), keep_tags=True)
+    assert 'tags' in df.columns
+
+    trainer = QuantileModelTrainer(targets, n_jobs=1, tag_features=TagFeatureBuilder(max_tags=4, min_count=1))
+    trainer.tune_and_train(df, save_path=str(tmp_path / 'model.joblib'), n_trials=1)
+
+    builder = trainer.tag_features
+    assert len(builder.vocabulary) == 4
+    assert trainer.feature_columns[-4:] == ['tag_0', 'tag_1', 'tag_2', 'tag_3']
+    assert 'tag_mean_log_view_count_final' in trainer.feature_columns
+    with open(tmp_path / 'model_metadata.json') as f:
+        assert json.load(f)['tag_features']['vocabulary'] == builder.vocabulary
+
+    X = trainer.prepare_features(df.copy()).drop(columns=targets)
+    matrix = builder.transform_frame(X.drop(columns=['tags']), X['tags'])
+    assert matrix.shape[1] == len(trainer.feature_columns)
+    assert trainer.model.predict(matrix).shape == (len(X), len(targets))
+
+    # Serving rebuilds the tag columns from the metadata; absent tags are missing, as in the CSR matrix
+    fe = YouTubeFeatureEngineer()
+    fe.process_all_features(raw)
+    fe.save(str(tmp_path / 'tables.npz'))
+    predictor = FirstHourPredictor.load(str(tmp_path / 'model.joblib'), str(tmp_path / 'tables.npz'))
+    records = raw.loc[X.index].to_dict('records')
+    expected = matrix.toarray()
+    stored = np.zeros(expected.shape, dtype=bool)
+    stored[matrix.nonzero()] = True
+    stored[:, :-4] = True
+    expected[~stored] = np.nan
+    np.testing.assert_array_equal(predictor.features(records), expected.astype(np.float32))
+    np.testing.assert_allclose(predictor.predict_array(records), np.expm1(trainer.model.predict(matrix)),
+                               rtol=1e-5)
+
+    # Tree arrays and the memory-mapped bundle carry the feature names and the tag vocabulary
+    trainer.export_trees(str(tmp_path / 'trees.npz'))
+    compiled = FirstHourPredictor.load(str(tmp_path / 'trees.npz'), str(tmp_path / 'tables.npz'))
+    trainer.export_bundle(str(tmp_path / 'bundle'), fe)
+    bundled = load_bundle(str(tmp_path / 'bundle'))
+    assert bundled.tag_features.vocabulary == builder.vocabulary
+    np.testing.assert_array_equal(bundled.tag_features.tag_means, builder.tag_means)
+    for loaded in (compiled, bundled):
+        np.testing.assert_array_equal(loaded.features(records), predictor.features(records))
+        np.testing.assert_allclose(loaded.predict_array(records), predictor.predict_array(records), rtol=1e-4)
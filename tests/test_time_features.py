@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+from youtube_first_hour.time_features import time_components
+
+
+def test_fast_path_matches_pandas():
+    rng = np.random.default_rng(0)
+    stamps = pd.Timestamp('1990-01-01') + pd.to_timedelta(rng.integers(0, 60 * 365 * 86400, 2000), unit='s')
+    values = pd.Series(stamps.strftime('%Y-%m-%dT%H:%M:%SZ'))
+    values[::7] = stamps[::7].strftime('%Y-%m-%d %H:%M:%S')
+
+    parts = time_components(values)
+    assert parts['valid'].all()
+    for name, expected in [('year', stamps.year), ('month', stamps.month), ('day', stamps.day),
+                           ('hour', stamps.hour), ('minute', stamps.minute),
+                           ('weekday', stamps.dayofweek)]:
+        np.testing.assert_array_equal(parts[name], expected)
+
+
+def _pandas_reference(values):
+    return pd.to_datetime(pd.Series(values, dtype=object), errors='coerce', utc=True, format='mixed')
+
+
+def test_impossible_dates_are_invalid():
+    values = ['2025-02-30T10:00:00Z', '2025-04-31T10:00:00Z', '2023-02-29 10:00:00', '1900-02-29 10:00:00',
+              '2025-08-01T23:59:60Z', '2024-02-29T10:00:00Z', '2000-02-29 10:00:00', '2025-12-31T23:59:59Z']
+    parts = time_components(values)
+    expected = _pandas_reference(values)
+    np.testing.assert_array_equal(parts['valid'], expected.notna())
+    np.testing.assert_array_equal(parts['day'], expected.dt.day.fillna(0))
+    np.testing.assert_array_equal(parts['weekday'], expected.dt.dayofweek.fillna(0))
+
+
+def test_fallback_matches_pandas():
+    # Offsets, other layouts, missing values and garbage all take the pd.to_datetime path
+    values = ['2025-08-01T10:30:00+02:00', '2025-08-01T01:15:00-05:30', '08/01/2025 10:00', 'Aug 3, 2025 7:05 PM',
+              None, np.nan, 'not a date', '', '2025-08-01T10:30:00.123456789012345Z', '2025-08-02T11:00:00Z']
+    parts = time_components(pd.Series(values))
+    expected = _pandas_reference(values)
+    np.testing.assert_array_equal(parts['valid'], expected.notna())
+    for name, reference in [('year', expected.dt.year), ('month', expected.dt.month), ('day', expected.dt.day),
+                            ('hour', expected.dt.hour), ('minute', expected.dt.minute),
+                            ('weekday', expected.dt.dayofweek)]:
+        np.testing.assert_array_equal(parts[name], reference.fillna(0))
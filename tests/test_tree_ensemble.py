@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+from youtube_first_hour.model_training import QuantileModelTrainer, export_tree_arrays
+from youtube_first_hour.tree_ensemble import TreeEnsemble
+
+
+@pytest.mark.parametrize("multi_strategy", [None, 'one_output_per_tree'])
+def test_tree_arrays_match_xgboost(tmp_path, multi_strategy):
+    rng = np.random.default_rng(0)
+    X = rng.random((400, 6)).astype(np.float32)
+    X[rng.random(X.shape) < 0.1] = np.nan
+    y = np.column_stack([np.nan_to_num(X[:, 0]) * 3, np.nan_to_num(X[:, 1]) + rng.random(400)])
+
+    trainer = QuantileModelTrainer(['a', 'b'], n_jobs=1, multi_strategy=multi_strategy)
+    model = trainer.build_model({'n_estimators': 30, 'max_depth': 5, 'random_state': 0})
+    model.fit(X, y)
+
+    path = str(tmp_path / 'trees.npz')
+    export_tree_arrays(model).save(path)
+    ensemble = TreeEnsemble.load(path)
+    np.testing.assert_allclose(ensemble.predict(X), model.predict(X), rtol=1e-5, atol=1e-5)
+    np.testing.assert_allclose(ensemble.predict(X[:1]), model.predict(X[:1]), rtol=1e-5, atol=1e-5)